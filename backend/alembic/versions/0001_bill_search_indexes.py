@@ -0,0 +1,30 @@
+"""bill search indexes for keyset pagination
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bills_created_at_id', 'bills', ['created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_bills_type_created_at_id', 'bills', ['bill_type', 'created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_bills_customer_created_at_id', 'bills', ['customer_id', 'created_at', 'id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bills_customer_created_at_id', table_name='bills', if_exists=True)
+    op.drop_index('ix_bills_type_created_at_id', table_name='bills', if_exists=True)
+    op.drop_index('ix_bills_created_at_id', table_name='bills', if_exists=True)
@@ -0,0 +1,32 @@
+"""bill idempotency key
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases bootstrapped with create_all() already have the column
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('bills')}
+    if 'idempotency_key' not in columns:
+        op.add_column('bills', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    op.create_index('ix_bills_idempotency_key', 'bills', ['idempotency_key'], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bills_idempotency_key', table_name='bills')
+    with op.batch_alter_table('bills') as batch_op:
+        batch_op.drop_column('idempotency_key')
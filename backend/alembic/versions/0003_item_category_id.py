@@ -0,0 +1,41 @@
+"""item category id
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Items are linked to the categories table, which also takes over the
+    # running totals of stock_valuations, on the next startup. Databases
+    # bootstrapped with create_all() already have the column
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('items')}
+    if 'category_id' not in columns:
+        with op.batch_alter_table('items') as batch_op:
+            batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_items_category_id', 'categories', ['category_id'], ['id'])
+    op.create_index('ix_items_category_id', 'items', ['category_id'], if_not_exists=True)
+    op.execute('DROP TABLE IF EXISTS stock_valuations')
+
+
+def downgrade() -> None:
+    # The foreign key is unnamed when create_all() built the column
+    foreign_keys = {fk['name'] for fk in sa.inspect(op.get_bind()).get_foreign_keys('items')}
+    op.drop_index('ix_items_category_id', table_name='items', if_exists=True)
+    with op.batch_alter_table('items') as batch_op:
+        if 'fk_items_category_id' in foreign_keys:
+            batch_op.drop_constraint('fk_items_category_id', type_='foreignkey')
+        batch_op.drop_column('category_id')
@@ -0,0 +1,28 @@
+"""bill items foreign key indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bill_items_bill_id', 'bill_items', ['bill_id'], if_not_exists=True)
+    op.create_index('ix_bill_items_item_id', 'bill_items', ['item_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bill_items_item_id', table_name='bill_items', if_exists=True)
+    op.drop_index('ix_bill_items_bill_id', table_name='bill_items', if_exists=True)
@@ -5,6 +5,7 @@
 __all__ = [
     'auth',
     'billing',
+    'carts',
     'inventory',
     'accounts',
     'reports',
@@ -12,6 +12,7 @@ from app.schemas import (
     LedgerCreate, LedgerResponse
 )
 from app.utils.security import get_current_active_user
+from app.services.report_cache import report_cache
 
 router = APIRouter()
 
@@ -82,6 +83,7 @@ async def update_customer(
     for field, value in customer_update.dict(exclude_unset=True).items():
         setattr(customer, field, value)
     
+    report_cache.invalidate_reports_on_commit(db, ["customer-wise"])
     db.commit()
     db.refresh(customer)
     return customer
@@ -1,35 +1,65 @@
 # backend/app/api/billing.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, date
 
 from app.database import get_db
 from app.models import Bill, BillItem, Item, Customer, Supplier, User
-from app.schemas import BillCreate, BillUpdate, BillResponse, BillItemResponse
+from app.schemas import (
+    BillCreate, BillUpdate, BillResponse, BillItemResponse,
+    BillBulkCreate, BillBulkResult
+)
 from app.utils.security import get_current_active_user
 from app.services.billing_service import BillingService
 from app.services.inventory_service import InventoryService
+from app.services.bill_writer import bill_write_queue
+from app.services.bill_search_index import BillSearchIndex
+from app.services.idempotency_cache import idempotency_cache
+from app.services.sales_rollup_service import SalesRollupService
+from app.config import settings as app_settings
 
 router = APIRouter()
 
 @router.post("/create", response_model=BillResponse)
 async def create_bill(
     bill_data: BillCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=64),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Create a new bill"""
+    """Create a new bill; a retry with the same Idempotency-Key returns the original bill"""
     billing_service = BillingService(db)
     try:
-        bill = billing_service.create_bill(bill_data, current_user.id)
-        return billing_service.get_bill_response(bill)
+        if app_settings.BILL_WRITE_QUEUE_ENABLED:
+            return await asyncio.wrap_future(
+                bill_write_queue.submit(bill_data, current_user.id, idempotency_key)
+            )
+        return billing_service.create_bill(bill_data, current_user.id, idempotency_key)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating bill: {str(e)}")
 
+@router.post("/bulk", response_model=List[BillBulkResult])
+async def create_bills_bulk(
+    bulk_data: BillBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create many bills at once, e.g. when an offline counter syncs"""
+    billing_service = BillingService(db)
+    try:
+        return billing_service.create_bills_bulk(bulk_data.bills, current_user.id)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error creating bills: {str(e)}")
+
 @router.get("/retrieve/{bill_number}", response_model=BillResponse)
 async def retrieve_bill(
     bill_number: str,
@@ -56,13 +86,19 @@ async def update_bill(
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
     
-    # Update bill fields
+    # Update bill fields, moving the bill's totals in the daily rollups
+    rollups = SalesRollupService(db)
+    before = rollups.snapshot(bill)
     for field, value in bill_update.dict(exclude_unset=True).items():
         setattr(bill, field, value)
+    rollups.bill_changed(before, bill)
     
     bill.updated_at = datetime.utcnow()
+    db.flush()
+    BillSearchIndex(db).index_bills([bill.id])
     db.commit()
     db.refresh(bill)
+    idempotency_cache.discard(bill.idempotency_key)
     
     billing_service = BillingService(db)
     return billing_service.get_bill_response(bill)
@@ -82,6 +118,7 @@ async def hold_bill(
     
     bill.payment_status = "pending"
     db.commit()
+    idempotency_cache.discard(bill.idempotency_key)
     
     return {"message": "Bill held successfully", "bill_id": bill_id}
 
@@ -105,10 +142,11 @@ async def get_pending_bills(
     """Get all pending/held bills"""
     bills = db.query(Bill).filter(Bill.payment_status == "pending").all()
     billing_service = BillingService(db)
-    return [billing_service.get_bill_response(bill) for bill in bills]
+    return billing_service.get_bill_responses(bills)
 
 @router.get("/search", response_model=List[BillResponse])
 async def search_bills(
+    response: Response,
     q: Optional[str] = Query(None, description="Search query"),
     bill_type: Optional[str] = None,
     from_date: Optional[date] = None,
@@ -116,23 +154,19 @@ async def search_bills(
     customer_id: Optional[int] = None,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Search bills with filters"""
-    query = db.query(Bill)
-    
-    if q:
-        query = query.filter(Bill.bill_number.contains(q))
-    if bill_type:
-        query = query.filter(Bill.bill_type == bill_type)
-    if from_date:
-        query = query.filter(Bill.created_at >= from_date)
-    if to_date:
-        query = query.filter(Bill.created_at <= to_date)
-    if customer_id:
-        query = query.filter(Bill.customer_id == customer_id)
-    
-    bills = query.offset(offset).limit(limit).all()
+    """Search bills with filters, newest first"""
     billing_service = BillingService(db)
-    return [billing_service.get_bill_response(bill) for bill in bills]
\ No newline at end of file
+    try:
+        bills, next_cursor = billing_service.search_bills(
+            q, bill_type, from_date, to_date, customer_id, limit, offset, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return billing_service.get_bill_responses(bills)
@@ -0,0 +1,149 @@
+# backend/app/api/carts.py
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app.models import User
+from app.schemas import BillResponse, CartCreate, CartLineAdd, CartFinalize, CartResponse, CartStatus
+from app.utils.security import get_current_active_user
+from app.services.billing_service import BillingService
+from app.services.bill_writer import bill_write_queue
+from app.services.cart_store import cart_store
+from app.services.catalog_cache import catalog_cache
+from app.config import settings as app_settings
+
+router = APIRouter()
+
+def _cart_or_404(cart_id: str) -> CartResponse:
+    try:
+        return cart_store.get(cart_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Cart not found")
+
+@router.post("", response_model=CartResponse)
+async def create_cart(
+    cart_data: CartCreate,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Open a new draft cart"""
+    return cart_store.create(cart_data, current_user.id)
+
+@router.get("/held", response_model=List[CartResponse])
+async def get_held_carts(current_user: User = Depends(get_current_active_user)):
+    """Get all held carts"""
+    return cart_store.list_held()
+
+@router.get("/{cart_id}", response_model=CartResponse)
+async def get_cart(
+    cart_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get a draft cart"""
+    return _cart_or_404(cart_id)
+
+@router.post("/{cart_id}/lines", response_model=CartResponse)
+async def add_cart_line(
+    cart_id: str,
+    line: CartLineAdd,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Add an item to a cart"""
+    _cart_or_404(cart_id)
+    item = catalog_cache.get_by_codes(db, [line.item_code]).get(line.item_code)
+    if not item or not item.is_active:
+        raise HTTPException(status_code=404, detail=f"Item not found: {line.item_code}")
+    try:
+        return cart_store.add_line(cart_id, item, line.quantity, line.rate, line.mrp)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Cart not found")
+
+@router.delete("/{cart_id}/lines/{item_code}", response_model=CartResponse)
+async def remove_cart_line(
+    cart_id: str,
+    item_code: str,
+    quantity: Optional[float] = Query(None, gt=0, description="Remove only this much"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Remove an item from a cart"""
+    try:
+        return cart_store.remove_line(cart_id, item_code, quantity)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Cart not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/{cart_id}/hold", response_model=CartResponse)
+async def hold_cart(
+    cart_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Park a cart so the counter can serve the next customer"""
+    try:
+        return cart_store.set_status(cart_id, CartStatus.held)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Cart not found")
+
+@router.post("/{cart_id}/resume", response_model=CartResponse)
+async def resume_cart(
+    cart_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Resume a held cart"""
+    try:
+        return cart_store.set_status(cart_id, CartStatus.open)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Cart not found")
+
+@router.delete("/{cart_id}")
+async def discard_cart(
+    cart_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Discard a cart without billing it"""
+    try:
+        cart_store.discard(cart_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Cart not found")
+    return {"message": "Cart discarded", "cart_id": cart_id}
+
+@router.post("/{cart_id}/finalize", response_model=BillResponse)
+async def finalize_cart(
+    cart_id: str,
+    finalize: CartFinalize,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Turn a cart into a saved bill; the only cart operation that writes to the database.
+    
+    A retried finalize of a cart already billed returns that bill.
+    """
+    billing_service = BillingService(db)
+    idempotency_key = cart_store.idempotency_key(cart_id)
+    try:
+        cart = cart_store.checkout(cart_id)
+    except KeyError:
+        replay = billing_service.find_idempotent_bill(idempotency_key)
+        if replay is None:
+            raise HTTPException(status_code=404, detail="Cart not found")
+        return replay
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # A ValidationError from building the bill is a ValueError too, so the cart is restored
+        bill_data = cart_store.to_bill(cart, finalize)
+        if app_settings.BILL_WRITE_QUEUE_ENABLED:
+            return await asyncio.wrap_future(
+                bill_write_queue.submit(bill_data, current_user.id, idempotency_key)
+            )
+        return billing_service.create_bill(bill_data, current_user.id, idempotency_key)
+    except ValueError as e:
+        cart_store.restore(cart)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        cart_store.restore(cart)
+        raise HTTPException(status_code=500, detail=f"Error creating bill: {str(e)}")
@@ -1,14 +1,28 @@
 # backend/app/api/inventory.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 from app.database import get_db
-from app.models import Item, User
-from app.schemas import ItemCreate, ItemUpdate, ItemResponse, ItemSearch
+from app.models import Item, ItemBarcode, User
+from app.schemas import (
+    ItemCreate, ItemUpdate, ItemResponse, ItemSearch, ItemBarcodeCreate, BarcodeScanResponse,
+    StockMovementResponse, LowStockFeed, ItemLotCreate, ItemLotResponse, ExpiringLot,
+    CategoryResponse
+)
 from app.utils.security import get_current_active_user, check_permission
 from app.services.inventory_service import InventoryService
+from app.services.catalog_cache import catalog_cache
+from app.services.category_service import CategoryService
+from app.services.stock_journal import StockJournal
+from app.services.stock_valuation_service import StockValuationService
+from app.services.low_stock_watchlist import LowStockWatchlist
+from app.services.lot_service import LotService
+from app.services.item_transfer_service import (
+    ItemTransferService, XLSX_MEDIA_TYPE, load_openpyxl, read_item_rows
+)
 
 router = APIRouter()
 
@@ -17,6 +31,7 @@ async def get_items(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     category: Optional[str] = None,
+    category_id: Optional[int] = None,
     in_stock: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -24,14 +39,53 @@ async def get_items(
     """Get all items with optional filters"""
     query = db.query(Item)
     
-    if category:
-        query = query.filter(Item.category == category)
+    category_id = CategoryService(db).filter_id(category_id, category)
+    if category_id is not None:
+        query = query.filter(Item.category_id == category_id)
     if in_stock:
         query = query.filter(Item.current_stock > 0)
     
     items = query.offset(skip).limit(limit).all()
     return items
 
+@router.get("/items/export")
+async def export_items(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    category: Optional[str] = None,
+    active_only: bool = True,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Download the item catalog as CSV or XLSX"""
+    if format == "xlsx":
+        try:
+            load_openpyxl()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        content = ItemTransferService.export_xlsx(category, active_only)
+        media_type = XLSX_MEDIA_TYPE
+    else:
+        content = ItemTransferService.export_csv(category, active_only)
+        media_type = "text/csv"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'}
+    )
+
+@router.post("/items/import")
+async def import_items(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("admin"))
+):
+    """Create or update items from a CSV or XLSX file, reporting rejected rows (Admin only)"""
+    transfer_service = ItemTransferService(db)
+    try:
+        return transfer_service.import_rows(read_item_rows(file.file, file.filename), current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/items", response_model=ItemResponse)
 async def create_item(
     item: ItemCreate,
@@ -45,7 +99,21 @@ async def create_item(
         raise HTTPException(status_code=400, detail="Item code already exists")
     
     db_item = Item(**item.dict())
+    db_item.category_id = CategoryService(db).resolve_one(db_item.category)
     db.add(db_item)
+    db.flush()
+    if db_item.current_stock:
+        StockJournal(db).record([StockJournal.movement(
+            db_item.id, db_item.current_stock, db_item.current_stock, "Opening stock",
+            created_by=current_user.id
+        )])
+    if db_item.current_stock and db_item.expiry_date:
+        LotService(db).receive([{
+            "item_id": db_item.id, "quantity": db_item.current_stock, "expiry_date": db_item.expiry_date
+        }])
+    StockValuationService(db).item_changed(None, db_item)
+    LowStockWatchlist(db).refresh([db_item.id])
+    catalog_cache.invalidate_on_commit(db, [db_item.id])
     db.commit()
     db.refresh(db_item)
     return db_item
@@ -74,10 +142,30 @@ async def update_item(
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    for field, value in item_update.dict(exclude_unset=True).items():
+    changes = item_update.dict(exclude_unset=True)
+    new_stock = changes.pop("current_stock", None)
+    
+    # Stock edits go through the journal like any other adjustment
+    if new_stock is not None and new_stock != item.current_stock:
+        try:
+            InventoryService(db).adjust_stock(
+                item, new_stock - item.current_stock, "Item edit", user_id=current_user.id
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    valuation = StockValuationService(db)
+    before = valuation.snapshot(item)
+    for field, value in changes.items():
         setattr(item, field, value)
+    if "category" in changes:
+        item.category_id = CategoryService(db).resolve_one(item.category)
+    valuation.item_changed(before, item)
     
     item.updated_at = datetime.utcnow()
+    db.flush()
+    LowStockWatchlist(db).refresh([item.id])
+    catalog_cache.invalidate_on_commit(db, [item.id])
     db.commit()
     db.refresh(item)
     return item
@@ -94,11 +182,110 @@ async def delete_item(
         raise HTTPException(status_code=404, detail="Item not found")
     
     # Soft delete
+    valuation = StockValuationService(db)
+    before = valuation.snapshot(item)
     item.is_active = False
+    valuation.item_changed(before, item)
+    db.flush()
+    LowStockWatchlist(db).refresh([item.id])
+    catalog_cache.invalidate_on_commit(db, [item.id])
     db.commit()
     
     return {"message": "Item deleted successfully"}
 
+@router.get("/items/{item_id}/barcodes", response_model=List[str])
+async def get_item_barcodes(
+    item_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the additional barcodes of an item"""
+    rows = db.query(ItemBarcode.barcode).filter(ItemBarcode.item_id == item_id).order_by(ItemBarcode.id)
+    return [row.barcode for row in rows]
+
+@router.post("/items/{item_id}/barcodes", response_model=List[str])
+async def add_item_barcode(
+    item_id: int,
+    barcode_data: ItemBarcodeCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("admin"))
+):
+    """Add another barcode to an item (Admin only)"""
+    item = db.query(Item).filter(Item.id == item_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    barcode = barcode_data.barcode
+    in_use = (
+        db.query(Item.id).filter(Item.barcode == barcode, Item.id != item_id).first()
+        or db.query(ItemBarcode.id).filter(ItemBarcode.barcode == barcode).first()
+    )
+    if in_use or item.barcode == barcode:
+        raise HTTPException(status_code=400, detail="Barcode already in use")
+    
+    db.add(ItemBarcode(item_id=item_id, barcode=barcode))
+    catalog_cache.invalidate_on_commit(db, [item_id])
+    db.commit()
+    rows = db.query(ItemBarcode.barcode).filter(ItemBarcode.item_id == item_id).order_by(ItemBarcode.id)
+    return [row.barcode for row in rows]
+
+@router.delete("/items/{item_id}/barcodes/{barcode}")
+async def remove_item_barcode(
+    item_id: int,
+    barcode: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("admin"))
+):
+    """Remove an additional barcode from an item (Admin only)"""
+    item_barcode = db.query(ItemBarcode).filter(
+        ItemBarcode.item_id == item_id,
+        ItemBarcode.barcode == barcode
+    ).first()
+    if not item_barcode:
+        raise HTTPException(status_code=404, detail="Barcode not found")
+    
+    db.delete(item_barcode)
+    catalog_cache.invalidate_on_commit(db, [item_id])
+    db.commit()
+    return {"message": "Barcode removed successfully"}
+
+@router.get("/items/{item_id}/lots", response_model=List[ItemLotResponse])
+async def get_item_lots(
+    item_id: int,
+    include_empty: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the lots of an item, earliest expiry first"""
+    return LotService(db).get_lots(item_id, include_empty)
+
+@router.post("/items/{item_id}/lots", response_model=ItemLotResponse)
+async def add_item_lot(
+    item_id: int,
+    lot_data: ItemLotCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("manager"))
+):
+    """Record a batch for stock that is not in any lot yet (Manager only)"""
+    try:
+        return LotService(db).add_lot(item_id, lot_data.quantity, lot_data.batch_no, lot_data.expiry_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/barcode/{code}", response_model=BarcodeScanResponse)
+async def scan_barcode(
+    code: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Look up a scanned barcode for the billing screen"""
+    entry = catalog_cache.get_by_barcode(db, code)
+    if not entry or not entry.is_active:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    item = catalog_cache.get_items(db, [entry.id])[0]
+    return BarcodeScanResponse(**{**vars(item), "barcode": code})
+
 @router.post("/items/search", response_model=List[ItemResponse])
 async def search_items(
     search: ItemSearch,
@@ -126,28 +313,107 @@ async def update_stock(
     """Update stock levels (Manager/Admin only)"""
     inventory_service = InventoryService(db)
     try:
-        item = inventory_service.update_stock(item_id, quantity_change, reason)
-        return {"message": "Stock updated successfully", "new_stock": item.current_stock}
+        new_stock = inventory_service.update_stock(item_id, quantity_change, reason, current_user.id)
+        return {"message": "Stock updated successfully", "new_stock": new_stock}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/stock/movements/{item_id}", response_model=List[StockMovementResponse])
+async def get_stock_movements(
+    item_id: int,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the stock movement history of an item, newest first"""
+    return StockJournal(db).get_history(item_id, from_date, to_date, limit, offset)
+
+@router.post("/stock/checkpoints")
+async def create_stock_checkpoints(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("admin"))
+):
+    """Checkpoint current stock of all items (Admin only)"""
+    count = StockJournal(db).create_checkpoints()
+    return {"message": "Stock checkpoints created", "items": count}
+
+@router.post("/stock/rebuild")
+async def rebuild_stock(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("admin"))
+):
+    """Recompute current stock from checkpoints and the movement journal (Admin only)"""
+    drifted = StockJournal(db).rebuild()
+    return {"message": "Stock rebuilt from journal", "corrected": drifted}
+
 @router.get("/low-stock-alerts", response_model=List[ItemResponse])
 async def get_low_stock_alerts(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get items with low stock"""
-    items = db.query(Item).filter(
-        Item.current_stock <= Item.min_stock_alert,
-        Item.is_active == True
-    ).all()
+    """Get a page of items with low stock; the total is in X-Total-Count"""
+    items, total = LowStockWatchlist(db).get_items(skip, limit)
+    response.headers["X-Total-Count"] = str(total)
     return items
 
-@router.get("/categories")
+@router.get("/low-stock-alerts/changes", response_model=LowStockFeed)
+async def get_low_stock_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get low-stock watchlist changes after a sequence number"""
+    changes = LowStockWatchlist(db).get_changes(since, limit)
+    return {"changes": changes, "last_seq": changes[-1].seq if changes else since}
+
+@router.get("/expiry-alerts", response_model=List[ExpiringLot])
+async def get_expiry_alerts(
+    days_ahead: int = Query(30, ge=0, le=365),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get lots in stock that expire within the given number of days"""
+    return InventoryService(db).check_expiry_alerts(days_ahead)
+
+@router.get("/stock-value")
+async def get_stock_value(
+    category: Optional[str] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get stock value at purchase and selling price, overall and per category"""
+    inventory_service = InventoryService(db)
+    return inventory_service.get_stock_value(CategoryService(db).filter_id(category_id, category))
+
+@router.post("/stock-value/recompute")
+async def recompute_stock_value(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("admin"))
+):
+    """Recompute stock value totals from items (Admin only)"""
+    corrected = StockValuationService(db).recompute()
+    return {"message": "Stock value recomputed", "corrected": corrected}
+
+@router.get("/catalog-cache/stats")
+async def get_catalog_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get hit/miss counters of the item catalog cache"""
+    return catalog_cache.stats()
+
+@router.get("/categories", response_model=List[CategoryResponse])
 async def get_categories(
+    include_empty: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all unique categories"""
-    categories = db.query(Item.category).distinct().all()
-    return [cat[0] for cat in categories if cat[0]]
\ No newline at end of file
+    """Get categories with their active item count and stock value"""
+    return CategoryService(db).get_categories(include_empty)
\ No newline at end of file
@@ -1,5 +1,6 @@
 # backend/app/api/reports.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from typing import Optional
@@ -7,11 +8,24 @@ from datetime import date, datetime, timedelta
 
 from app.database import get_db
 from app.models import Bill, BillItem, Item, Customer, User
-from app.utils.security import get_current_active_user
+from app.utils.security import get_current_active_user, check_permission
 from app.services.report_service import ReportService
+from app.services.reorder_service import ReorderService
+from app.services.sales_rollup_service import SalesRollupService
+from app.services.report_cache import report_cache
+from app.services.sales_snapshot import sales_snapshot
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def export_response(report: str, format: str, from_date: date, to_date: date, *args) -> StreamingResponse:
+    return StreamingResponse(
+        ReportService.export_report(report, format, from_date, to_date, *args),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{report}_{from_date}_{to_date}.{format}"'}
+    )
+
 @router.get("/daily-sales")
 async def get_daily_sales_report(
     report_date: Optional[date] = Query(None, description="Date for report (default: today)"),
@@ -30,21 +44,28 @@ async def get_item_wise_report(
     from_date: date,
     to_date: date,
     category: Optional[str] = None,
+    category_id: Optional[int] = None,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Stream rows in item order as CSV or NDJSON"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get item-wise sales report"""
+    if format:
+        return export_response("item-wise", format, from_date, to_date, category, category_id)
     report_service = ReportService(db)
-    return report_service.get_item_wise_report(from_date, to_date, category)
+    return report_service.get_item_wise_report(from_date, to_date, category, category_id)
 
 @router.get("/customer-wise")
 async def get_customer_wise_report(
     from_date: date,
     to_date: date,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Stream rows in customer order as CSV or NDJSON"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get customer-wise sales report"""
+    if format:
+        return export_response("customer-wise", format, from_date, to_date)
     report_service = ReportService(db)
     return report_service.get_customer_wise_report(from_date, to_date)
 
@@ -74,9 +95,110 @@ async def get_profit_loss_report(
 async def get_stock_report(
     category: Optional[str] = None,
     low_stock_only: bool = False,
+    category_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get current stock report"""
     report_service = ReportService(db)
-    return report_service.get_stock_report(category, low_stock_only)
\ No newline at end of file
+    return report_service.get_stock_report(category, low_stock_only, category_id)
+
+@router.get("/reorder-suggestions")
+async def get_reorder_suggestions(
+    history_days: int = Query(365, ge=7, le=730),
+    lead_time_days: float = Query(7, gt=0, le=90),
+    review_days: float = Query(7, ge=0, le=90),
+    halflife_days: float = Query(14, gt=0, le=365),
+    service_z: float = Query(1.65, ge=0, le=4),
+    category_id: Optional[int] = None,
+    supplier_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get suggested reorder quantities from sales velocity, grouped by last supplier"""
+    reorder_service = ReorderService(db)
+    return reorder_service.get_suggestions(
+        history_days, lead_time_days, review_days, halflife_days, service_z, category_id, supplier_id
+    )
+
+@router.post("/rollups/rebuild")
+async def rebuild_sales_rollups(
+    from_date: Optional[date] = Query(None, description="First day to rebuild (default: all days)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("admin"))
+):
+    """Recompute the daily sales rollups from bills (Admin only)"""
+    counts = SalesRollupService(db).rebuild(from_date)
+    return {"message": "Sales rollups rebuilt", "rows": counts}
+
+@router.get("/cache/stats")
+async def get_report_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get hit/miss counters of the report cache, overall and per report"""
+    return report_cache.stats()
+
+@router.get("/analytics/snapshot")
+async def get_analytics_snapshot_status(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get when the analytics snapshot was last exported and how many lines it holds"""
+    return sales_snapshot.status()
+
+@router.post("/analytics/snapshot")
+async def export_analytics_snapshot(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_permission("manager"))
+):
+    """Append bill lines added since the last export to the analytics snapshot (Manager only)"""
+    return sales_snapshot.export(db)
+
+@router.get("/analytics/item-wise")
+async def get_analytics_item_wise(
+    from_date: date,
+    to_date: date,
+    category_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get item-wise sales from the analytics snapshot"""
+    try:
+        return sales_snapshot.get_item_wise(from_date, to_date, category_id, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/analytics/category-wise")
+async def get_analytics_category_wise(
+    from_date: date,
+    to_date: date,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get category-wise sales from the analytics snapshot"""
+    try:
+        return sales_snapshot.get_category_wise(from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/analytics/hourly-heatmap")
+async def get_analytics_hourly_heatmap(
+    from_date: date,
+    to_date: date,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get sales amount and bill count per weekday and hour from the analytics snapshot"""
+    try:
+        return sales_snapshot.get_hourly_heatmap(from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/analytics/profit-loss")
+async def get_analytics_profit_loss(
+    from_date: date,
+    to_date: date,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get profit and loss from the analytics snapshot"""
+    try:
+        return sales_snapshot.get_profit_loss(from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -5,8 +5,10 @@ from typing import Dict, Any
 
 from app.database import get_db
 from app.models import User
+from app.schemas import BillSeriesConfig
 from app.utils.security import get_current_active_user, check_permission
 from app.config import settings
+from app.services.billing_service import BillingService
 
 router = APIRouter()
 
@@ -66,25 +68,27 @@ async def get_print_formats(
 
 @router.get("/bill-series")
 async def get_bill_series(
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get bill number series configuration"""
-    return {
-        "series": {
-            "sale_challan": {"prefix": "SC", "next_number": 1},
-            "gst_invoice": {"prefix": "INV", "next_number": 1},
-            "quotation": {"prefix": "QT", "next_number": 1},
-            "purchase": {"prefix": "PUR", "next_number": 1}
-        }
-    }
+    billing_service = BillingService(db)
+    return {"series": billing_service.get_bill_series()}
 
 @router.put("/bill-series")
 async def update_bill_series(
-    series_data: Dict[str, Any],
+    series_data: BillSeriesConfig,
+    db: Session = Depends(get_db),
     current_user: User = Depends(check_permission("admin"))
 ):
     """Update bill number series (Admin only)"""
-    return {"message": "Bill series updated", "data": series_data}
+    billing_service = BillingService(db)
+    try:
+        series = billing_service.update_bill_series(series_data)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": "Bill series updated", "series": series}
 
 @router.get("/remote-access")
 async def get_remote_access_settings(
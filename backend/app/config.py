@@ -17,6 +17,35 @@ class Settings(BaseSettings):
     NGROK_AUTH_TOKEN: Optional[str] = None
     AUTHENTICATION_REQUIRED: bool = True
     
+    # Billing write queue (group commit of bills by a single writer)
+    BILL_WRITE_QUEUE_ENABLED: bool = False
+    BILL_WRITE_BATCH_SIZE: int = 20
+    BILL_WRITE_MAX_WAIT_MS: int = 5
+    
+    # Responses kept in memory for replaying retried bill creates
+    IDEMPOTENCY_CACHE_SIZE: int = 2048
+    
+    # Stock journal checkpoints (0 disables the periodic run)
+    STOCK_CHECKPOINT_INTERVAL_HOURS: int = 24
+    
+    # Reports read daily sales rollups for ranges of whole days
+    REPORT_ROLLUPS_ENABLED: bool = True
+    
+    # Report results cached in memory; reports covering today expire after the TTL
+    REPORT_CACHE_ENABLED: bool = True
+    REPORT_CACHE_SIZE: int = 512
+    REPORT_CACHE_TTL_SECONDS: int = 60
+    
+    # Columnar sales snapshot for long-range analytics (0 disables the periodic export)
+    ANALYTICS_SNAPSHOT_DIR: str = "./analytics_snapshot"
+    ANALYTICS_SNAPSHOT_INTERVAL_MINUTES: int = 60
+    # Store time zone as minutes ahead of UTC (IST by default) for the analytics heatmap; report days are UTC
+    STORE_UTC_OFFSET_MINUTES: int = 330
+    
+    # Draft carts (held in memory until finalized)
+    CART_TTL_MINUTES: int = 240
+    CART_SNAPSHOT_PATH: Optional[str] = None
+    
     # Application Settings
     COMPANY_NAME: str = "Kirana Store"
     FINANCIAL_YEAR: str = "2024-2025"
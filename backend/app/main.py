@@ -1,10 +1,50 @@
 # backend/app/main.py
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.database import engine, Base
-from app.api import auth, billing, inventory, accounts, reports, settings
+from app.database import engine, Base, SessionLocal
+from app.api import auth, billing, carts, inventory, accounts, reports, settings
 from app.config import settings as app_settings
+from app.services.bill_writer import bill_write_queue
+from app.services.bill_search_index import BillSearchIndex
+from app.services.cart_store import cart_store
+from app.services.stock_journal import StockJournal
+from app.services.stock_valuation_service import StockValuationService
+from app.services.low_stock_watchlist import LowStockWatchlist
+from app.services.lot_service import LotService
+from app.services.sales_rollup_service import SalesRollupService
+from app.services.sales_snapshot import sales_snapshot
+
+def checkpoint_stock() -> None:
+    db = SessionLocal()
+    try:
+        StockJournal(db).create_checkpoints()
+    finally:
+        db.close()
+
+async def checkpoint_stock_periodically(interval_hours: int):
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            await asyncio.to_thread(checkpoint_stock)
+        except Exception as e:
+            print(f"Stock checkpoint error: {e}")
+
+def export_sales_snapshot() -> None:
+    db = SessionLocal()
+    try:
+        sales_snapshot.export(db)
+    finally:
+        db.close()
+
+async def export_sales_snapshot_periodically(interval_minutes: int):
+    while True:
+        try:
+            await asyncio.to_thread(export_sales_snapshot)
+        except Exception as e:
+            print(f"Sales snapshot error: {e}")
+        await asyncio.sleep(interval_minutes * 60)
 
 # Create tables on startup
 @asynccontextmanager
@@ -12,13 +52,38 @@ async def lifespan(app: FastAPI):
     # Startup
     try:
         Base.metadata.create_all(bind=engine)
+        BillSearchIndex.ensure_schema(engine)
+        StockJournal.ensure_opening_balances(engine)
+        StockValuationService.ensure_totals(engine)
+        LowStockWatchlist.ensure_watchlist(engine)
+        LotService.ensure_lots(engine)
+        SalesRollupService.ensure_rollups(engine)
         # Create default admin user if not exists
         from scripts.create_admin import create_admin_user
         create_admin_user()
     except Exception as e:
         print(f"Startup error: {e}")
+    if app_settings.BILL_WRITE_QUEUE_ENABLED:
+        bill_write_queue.start()
+    cart_store.load_snapshot()
+    checkpoint_task = None
+    if app_settings.STOCK_CHECKPOINT_INTERVAL_HOURS > 0:
+        checkpoint_task = asyncio.create_task(
+            checkpoint_stock_periodically(app_settings.STOCK_CHECKPOINT_INTERVAL_HOURS)
+        )
+    snapshot_task = None
+    if app_settings.ANALYTICS_SNAPSHOT_INTERVAL_MINUTES > 0:
+        snapshot_task = asyncio.create_task(
+            export_sales_snapshot_periodically(app_settings.ANALYTICS_SNAPSHOT_INTERVAL_MINUTES)
+        )
     yield
     # Shutdown
+    if checkpoint_task:
+        checkpoint_task.cancel()
+    if snapshot_task:
+        snapshot_task.cancel()
+    bill_write_queue.stop()
+    cart_store.save_snapshot()
 
 app = FastAPI(
     title="Kirana ERP API",
@@ -33,11 +98,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(billing.router, prefix="/api/v1/billing", tags=["Billing"])
+app.include_router(carts.router, prefix="/api/v1/carts", tags=["Carts"])
 app.include_router(inventory.router, prefix="/api/v1/inventory", tags=["Inventory"])
 app.include_router(accounts.router, prefix="/api/v1/accounts", tags=["Accounts"])
 app.include_router(reports.router, prefix="/api/v1/reports", tags=["Reports"])
@@ -1,8 +1,14 @@
 # backend/app/models/__init__.py
 from app.database import Base
 from app.models.user import User
-from app.models.item import Item
+from app.models.category import Category
+from app.models.item import Item, ItemBarcode
+from app.models.item_lot import ItemLot
 from app.models.bill import Bill, BillItem
+from app.models.bill_series import BillSeries
+from app.models.stock_movement import StockMovement, StockCheckpoint
+from app.models.low_stock import LowStockItem, LowStockEvent
+from app.models.sales_rollup import DailyItemSales, DailyPaymentSales, DailyGstSales
 from app.models.customer import Customer
 from app.models.supplier import Supplier
 from app.models.ledger import Ledger, LedgerEntry
@@ -10,9 +16,20 @@ from app.models.ledger import Ledger, LedgerEntry
 __all__ = [
     'Base',
     'User',
+    'Category',
     'Item',
+    'ItemBarcode',
+    'ItemLot',
     'Bill',
     'BillItem',
+    'BillSeries',
+    'StockMovement',
+    'StockCheckpoint',
+    'LowStockItem',
+    'LowStockEvent',
+    'DailyItemSales',
+    'DailyPaymentSales',
+    'DailyGstSales',
     'Customer',
     'Supplier',
     'Ledger',
@@ -1,5 +1,5 @@
 # backend/app/models/bill.py
-from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -18,6 +18,12 @@ class PaymentStatus(enum.Enum):
 
 class Bill(Base):
     __tablename__ = "bills"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), optionally narrowed by type or customer
+        Index("ix_bills_created_at_id", "created_at", "id"),
+        Index("ix_bills_type_created_at_id", "bill_type", "created_at", "id"),
+        Index("ix_bills_customer_created_at_id", "customer_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     bill_number = Column(String(20), nullable=False, index=True)
@@ -31,6 +37,7 @@ class Bill(Base):
     payment_method = Column(String(50))
     payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.paid)
     created_by = Column(Integer, ForeignKey("users.id"))
+    idempotency_key = Column(String(64), unique=True, index=True, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -44,8 +51,8 @@ class BillItem(Base):
     __tablename__ = "bill_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    bill_id = Column(Integer, ForeignKey("bills.id"), nullable=False)
-    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    bill_id = Column(Integer, ForeignKey("bills.id"), nullable=False, index=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False, index=True)
     quantity = Column(Float(precision=3))
     rate = Column(Float(precision=2))
     mrp = Column(Float(precision=2))
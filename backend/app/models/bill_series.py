@@ -0,0 +1,18 @@
+# backend/app/models/bill_series.py
+from sqlalchemy import Column, Integer, String, Enum, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.bill import BillType
+
+class BillSeries(Base):
+    __tablename__ = "bill_series"
+    __table_args__ = (
+        UniqueConstraint("bill_type", "financial_year", name="uq_bill_series_type_year"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bill_type = Column(Enum(BillType), nullable=False)
+    financial_year = Column(String(7), nullable=False)  # e.g. 2025-26
+    prefix = Column(String(10), nullable=False)
+    next_number = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,17 @@
+# backend/app/models/category.py
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Category(Base):
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)  # "" for uncategorized items
+    # Running totals over active items, kept by StockValuationService
+    item_count = Column(Integer, nullable=False, default=0)
+    stock_quantity = Column(Float(precision=3), nullable=False, default=0)
+    purchase_value = Column(Float(precision=2), nullable=False, default=0)
+    selling_value = Column(Float(precision=2), nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
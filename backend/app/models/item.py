@@ -1,5 +1,5 @@
 # backend/app/models/item.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date, ForeignKey
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -11,6 +11,7 @@ class Item(Base):
     barcode = Column(String(100), index=True)
     name = Column(String(200), nullable=False, index=True)
     category = Column(String(100), index=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
     size = Column(String(50))
     unit = Column(String(20))
     purchase_price = Column(Float(precision=2))
@@ -22,4 +23,12 @@ class Item(Base):
     expiry_date = Column(Date, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ItemBarcode(Base):
+    __tablename__ = "item_barcodes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False, index=True)
+    barcode = Column(String(100), unique=True, nullable=False, index=True)  # besides items.barcode
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
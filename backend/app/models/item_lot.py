@@ -0,0 +1,23 @@
+# backend/app/models/item_lot.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ItemLot(Base):
+    __tablename__ = "item_lots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    batch_no = Column(String(50))
+    expiry_date = Column(Date, nullable=True)
+    received_quantity = Column(Float(precision=3), nullable=False)
+    quantity = Column(Float(precision=3), nullable=False)  # still in stock
+    bill_id = Column(Integer, ForeignKey("bills.id"), nullable=True)  # purchase that brought the lot in
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Only lots still in stock are indexed: expiry alerts scan by date,
+        # FEFO allocation reads an item's lots in expiry order
+        Index("ix_item_lots_open_expiry", "expiry_date", "item_id", sqlite_where=text("quantity > 0")),
+        Index("ix_item_lots_open_item", "item_id", "expiry_date", sqlite_where=text("quantity > 0")),
+    )
@@ -0,0 +1,23 @@
+# backend/app/models/low_stock.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+class LowStockItem(Base):
+    __tablename__ = "low_stock_items"
+
+    item_id = Column(Integer, ForeignKey("items.id"), primary_key=True)
+    current_stock = Column(Float(precision=3))
+    min_stock_alert = Column(Float(precision=3))
+    since = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class LowStockEvent(Base):
+    __tablename__ = "low_stock_events"
+
+    id = Column(Integer, primary_key=True)  # sequence number of the change feed
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    event = Column(String(10), nullable=False)  # entered, left
+    current_stock = Column(Float(precision=3))
+    min_stock_alert = Column(Float(precision=3))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
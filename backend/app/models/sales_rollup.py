@@ -0,0 +1,44 @@
+# backend/app/models/sales_rollup.py
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index
+from app.database import Base
+
+# Per-day totals of bills and bill lines, kept by SalesRollupService in the
+# same transaction as the bills they summarize. day is the date of
+# bills.created_at; bill_type is the BillType value.
+
+class DailyItemSales(Base):
+    __tablename__ = "daily_item_sales"
+
+    day = Column(Date, primary_key=True)
+    bill_type = Column(String(20), primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), primary_key=True)
+    quantity = Column(Float(precision=3), nullable=False, default=0)
+    amount = Column(Float(precision=2), nullable=False, default=0)  # quantity x rate
+    gst_amount = Column(Float(precision=2), nullable=False, default=0)
+    total_amount = Column(Float(precision=2), nullable=False, default=0)
+    line_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_daily_item_sales_item_day", "item_id", "day"),
+    )
+
+class DailyPaymentSales(Base):
+    __tablename__ = "daily_payment_sales"
+
+    day = Column(Date, primary_key=True)
+    bill_type = Column(String(20), primary_key=True)
+    payment_method = Column(String(50), primary_key=True)  # "cash" when not given
+    bill_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float(precision=2), nullable=False, default=0)
+    gst_amount = Column(Float(precision=2), nullable=False, default=0)
+    discount_amount = Column(Float(precision=2), nullable=False, default=0)
+    net_amount = Column(Float(precision=2), nullable=False, default=0)
+
+class DailyGstSales(Base):
+    __tablename__ = "daily_gst_sales"
+
+    day = Column(Date, primary_key=True)
+    bill_type = Column(String(20), primary_key=True)
+    gst_percentage = Column(Float(precision=2), primary_key=True)
+    taxable_amount = Column(Float(precision=2), nullable=False, default=0)  # line total less GST
+    gst_amount = Column(Float(precision=2), nullable=False, default=0)
@@ -0,0 +1,37 @@
+# backend/app/models/stock_movement.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        # Movement history of one item over a date range
+        Index("ix_stock_movements_item_created_at", "item_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    quantity_change = Column(Float(precision=3), nullable=False)
+    balance_after = Column(Float(precision=3))
+    reason = Column(String(200))
+    bill_id = Column(Integer, ForeignKey("bills.id"), nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    item = relationship("Item")
+    bill = relationship("Bill")
+
+class StockCheckpoint(Base):
+    __tablename__ = "stock_checkpoints"
+    __table_args__ = (
+        Index("ix_stock_checkpoints_item_id_id", "item_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    stock = Column(Float(precision=3), nullable=False)
+    movement_id = Column(Integer, nullable=False, default=0)  # last movement included in stock
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
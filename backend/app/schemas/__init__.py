@@ -1,7 +1,15 @@
 # backend/app/schemas/__init__.py
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserLogin, Token
-from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse, ItemSearch
-from app.schemas.bill import BillCreate, BillUpdate, BillResponse, BillItemCreate, BillItemResponse
+from app.schemas.item import (
+    ItemCreate, ItemUpdate, ItemResponse, ItemSearch, ItemBarcodeCreate, BarcodeScanResponse,
+    StockMovementResponse, LowStockChange, LowStockFeed, ItemLotCreate, ItemLotResponse, ExpiringLot,
+    CategoryResponse
+)
+from app.schemas.bill import (
+    BillCreate, BillUpdate, BillResponse, BillItemCreate, BillItemResponse,
+    BillBulkEntry, BillBulkCreate, BillBulkResult, BillSeriesUpdate, BillSeriesConfig
+)
+from app.schemas.cart import CartCreate, CartLineAdd, CartLine, CartFinalize, CartResponse, CartStatus
 from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
 from app.schemas.supplier import SupplierCreate, SupplierUpdate, SupplierResponse
 from app.schemas.ledger import LedgerCreate, LedgerResponse, LedgerEntryCreate, LedgerEntryResponse
@@ -18,12 +26,33 @@ __all__ = [
     'ItemUpdate',
     'ItemResponse',
     'ItemSearch',
+    'ItemBarcodeCreate',
+    'BarcodeScanResponse',
+    'StockMovementResponse',
+    'LowStockChange',
+    'LowStockFeed',
+    'ItemLotCreate',
+    'ItemLotResponse',
+    'ExpiringLot',
+    'CategoryResponse',
     # Bill schemas
     'BillCreate',
     'BillUpdate',
     'BillResponse',
     'BillItemCreate',
     'BillItemResponse',
+    'BillBulkEntry',
+    'BillBulkCreate',
+    'BillBulkResult',
+    'BillSeriesUpdate',
+    'BillSeriesConfig',
+    # Cart schemas
+    'CartCreate',
+    'CartLineAdd',
+    'CartLine',
+    'CartFinalize',
+    'CartResponse',
+    'CartStatus',
     # Customer schemas
     'CustomerCreate',
     'CustomerUpdate',
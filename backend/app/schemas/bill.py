@@ -1,7 +1,7 @@
 # backend/app/schemas/bill.py
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Dict
+from datetime import date, datetime
 from enum import Enum
 
 class BillType(str, Enum):
@@ -20,6 +20,9 @@ class BillItemCreate(BaseModel):
     quantity: float = Field(..., gt=0)
     rate: float = Field(..., ge=0)
     mrp: Optional[float] = None
+    # Lot of a purchased line; sales draw lots first-expiry-first-out
+    batch_no: Optional[str] = Field(None, max_length=50)
+    expiry_date: Optional[date] = None
     
     @validator('quantity')
     def validate_quantity(cls, v):
@@ -57,6 +60,23 @@ class BillCreate(BaseModel):
                 raise ValueError('Supplier is required for purchase bills')
         return v
 
+class BillBulkEntry(BillCreate):
+    # Time the bill was taken on the offline counter; naive times are the server's local time
+    created_at: Optional[datetime] = None
+    # Same role as the Idempotency-Key header of /create: a resent entry returns its bill
+    idempotency_key: Optional[str] = Field(None, max_length=64)
+
+class BillBulkCreate(BaseModel):
+    bills: List[BillBulkEntry] = Field(..., min_length=1, max_length=5000)
+
+class BillBulkResult(BaseModel):
+    index: int
+    success: bool
+    bill_id: Optional[int] = None
+    bill_number: Optional[str] = None
+    net_amount: Optional[float] = None
+    error: Optional[str] = None
+
 class BillUpdate(BaseModel):
     customer_id: Optional[int] = None
     supplier_id: Optional[int] = None
@@ -84,4 +104,12 @@ class BillResponse(BaseModel):
     items: List[BillItemResponse] = []
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class BillSeriesUpdate(BaseModel):
+    prefix: Optional[str] = Field(None, min_length=1, max_length=10)
+    next_number: Optional[int] = Field(None, ge=1)
+
+class BillSeriesConfig(BaseModel):
+    series: Dict[BillType, BillSeriesUpdate]
@@ -0,0 +1,56 @@
+# backend/app/schemas/cart.py
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List
+from datetime import datetime
+from enum import Enum
+
+from app.schemas.bill import BillType, PaymentStatus
+
+class CartStatus(str, Enum):
+    open = "open"
+    held = "held"
+
+class CartCreate(BaseModel):
+    bill_type: BillType = BillType.sale_challan
+    customer_id: Optional[int] = None
+    supplier_id: Optional[int] = None
+    
+    @validator('supplier_id', always=True)
+    def validate_supplier(cls, v, values):
+        if values.get('bill_type') == BillType.purchase and not v:
+            raise ValueError('Supplier is required for purchase bills')
+        return v
+
+class CartLineAdd(BaseModel):
+    item_code: str
+    quantity: float = Field(1, gt=0)
+    rate: Optional[float] = Field(None, ge=0)
+    mrp: Optional[float] = Field(None, ge=0)
+
+class CartLine(BaseModel):
+    item_id: int
+    item_code: str
+    item_name: str
+    size: Optional[str] = None
+    quantity: float
+    rate: float
+    mrp: float
+    gst_percentage: float
+
+class CartFinalize(BaseModel):
+    discount_amount: float = Field(0, ge=0)
+    payment_method: Optional[str] = "cash"
+    payment_status: PaymentStatus = PaymentStatus.paid
+
+class CartResponse(BaseModel):
+    id: str
+    bill_type: BillType
+    customer_id: Optional[int] = None
+    supplier_id: Optional[int] = None
+    status: CartStatus = CartStatus.open
+    lines: List[CartLine] = []
+    total_amount: float = 0
+    gst_amount: float = 0
+    created_by: int
+    created_at: datetime
+    updated_at: datetime
@@ -1,6 +1,6 @@
 # backend/app/schemas/item.py
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, date
 
 class ItemBase(BaseModel):
@@ -45,6 +45,7 @@ class ItemUpdate(BaseModel):
 
 class ItemResponse(ItemBase):
     id: int
+    category_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -56,3 +57,91 @@ class ItemSearch(BaseModel):
     category: Optional[str] = None
     in_stock_only: bool = False
     limit: int = Field(10, ge=1, le=50)
+
+
+class ItemBarcodeCreate(BaseModel):
+    barcode: str = Field(..., min_length=1, max_length=100)
+
+class BarcodeScanResponse(BaseModel):
+    id: int
+    item_code: str
+    barcode: str
+    name: str
+    size: Optional[str] = None
+    unit: Optional[str] = None
+    selling_price: float
+    mrp: float
+    gst_percentage: float
+    current_stock: float
+
+class StockMovementResponse(BaseModel):
+    id: int
+    item_id: int
+    quantity_change: float
+    balance_after: Optional[float] = None
+    reason: Optional[str] = None
+    bill_id: Optional[int] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class LowStockChange(BaseModel):
+    seq: int
+    item_id: int
+    item_code: str
+    name: str
+    event: str
+    current_stock: Optional[float] = None
+    min_stock_alert: Optional[float] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class LowStockFeed(BaseModel):
+    changes: List[LowStockChange]
+    last_seq: int
+
+
+class ItemLotCreate(BaseModel):
+    quantity: float = Field(..., gt=0)
+    batch_no: Optional[str] = Field(None, max_length=50)
+    expiry_date: Optional[date] = None
+
+class ItemLotResponse(BaseModel):
+    id: int
+    item_id: int
+    batch_no: Optional[str] = None
+    expiry_date: Optional[date] = None
+    received_quantity: float
+    quantity: float
+    bill_id: Optional[int] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ExpiringLot(ItemResponse):
+    # The item's fields as expiry alerts returned them before lots, with
+    # expiry_date the lot's and one row per expiring lot
+    item_id: int
+    lot_id: int
+    batch_no: Optional[str] = None
+    expiry_date: date
+    quantity: float
+    bill_id: Optional[int] = None
+
+
+class CategoryResponse(BaseModel):
+    id: int
+    name: str
+    item_count: int
+    stock_quantity: float
+    purchase_value: float
+    selling_value: float
+    
+    class Config:
+        from_attributes = True
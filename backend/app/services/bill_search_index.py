@@ -0,0 +1,134 @@
+# backend/app/services/bill_search_index.py
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from app.models import Bill, BillItem, Item, Customer, Supplier
+
+bill_search = table("bill_search", column("rowid"), column("bill_search"))
+
+class BillSearchIndex:
+    """SQLite FTS5 index over bill number, party name and item names"""
+    
+    BATCH_SIZE = 500
+    # bm25 column weights: bill number, party name, item names
+    RANK_WEIGHTS = (10.0, 5.0, 1.0)
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @staticmethod
+    def ensure_schema(engine: Engine) -> None:
+        """Create the FTS table and backfill it when bills exist but are not indexed"""
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS bill_search "
+                "USING fts5(bill_number, party_name, item_names)"
+            )
+            indexed = conn.exec_driver_sql("SELECT count(*) FROM bill_search").scalar()
+            has_bills = conn.exec_driver_sql("SELECT 1 FROM bills LIMIT 1").first()
+        
+        if not indexed and has_bills:
+            with Session(engine) as db:
+                BillSearchIndex(db).rebuild()
+                db.commit()
+    
+    @staticmethod
+    def number_terms(bill_number: str) -> str:
+        """Index the bare sequence as well, so '42' finds INV2600042"""
+        terms = [bill_number]
+        match = re.search(r"(\d{3,})$", bill_number)
+        if match:
+            digits = match.group(1)
+            terms.append(digits)
+            terms.append(str(int(digits[2:])))
+        return " ".join(terms)
+    
+    @staticmethod
+    def match_expression(q: str) -> Optional[str]:
+        """Turn free text into an FTS5 query where every word is a prefix term"""
+        words = re.findall(r"\w+", q.lower())
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+    
+    def add_bill(self, bill_id: int, bill_number: str, party_name: Optional[str], item_names: List[str]) -> None:
+        """Index a new bill from values already in memory"""
+        self.db.execute(
+            text(
+                "INSERT INTO bill_search (rowid, bill_number, party_name, item_names) "
+                "VALUES (:id, :bill_number, :party_name, :item_names)"
+            ),
+            {
+                "id": bill_id,
+                "bill_number": self.number_terms(bill_number),
+                "party_name": party_name or "",
+                "item_names": " ".join(item_names)
+            }
+        )
+    
+    def index_bills(self, bill_ids: List[int]) -> None:
+        """(Re)index the given bills inside the current transaction"""
+        for start in range(0, len(bill_ids), self.BATCH_SIZE):
+            self._index_chunk(bill_ids[start:start + self.BATCH_SIZE])
+    
+    def _index_chunk(self, bill_ids: List[int]) -> None:
+        if not bill_ids:
+            return
+        
+        bills = self.db.query(
+            Bill.id, Bill.bill_number, Customer.name.label("customer_name"), Supplier.name.label("supplier_name")
+        ).outerjoin(
+            Customer, Bill.customer_id == Customer.id
+        ).outerjoin(
+            Supplier, Bill.supplier_id == Supplier.id
+        ).filter(Bill.id.in_(bill_ids)).all()
+        
+        item_names: Dict[int, List[str]] = {}
+        lines = self.db.query(BillItem.bill_id, Item.name).join(
+            Item, BillItem.item_id == Item.id
+        ).filter(BillItem.bill_id.in_(bill_ids)).all()
+        for line in lines:
+            item_names.setdefault(line.bill_id, []).append(line.name)
+        
+        self.db.execute(
+            bill_search.delete().where(bill_search.c.rowid.in_(bill_ids))
+        )
+        self.db.execute(
+            text(
+                "INSERT INTO bill_search (rowid, bill_number, party_name, item_names) "
+                "VALUES (:id, :bill_number, :party_name, :item_names)"
+            ),
+            [
+                {
+                    "id": bill.id,
+                    "bill_number": self.number_terms(bill.bill_number),
+                    "party_name": bill.customer_name or bill.supplier_name or "",
+                    "item_names": " ".join(item_names.get(bill.id, []))
+                }
+                for bill in bills
+            ]
+        )
+    
+    def rebuild(self) -> int:
+        """Reindex every bill, e.g. after restoring a backup"""
+        self.db.execute(bill_search.delete())
+        bill_ids = [row.id for row in self.db.query(Bill.id).order_by(Bill.id)]
+        self.index_bills(bill_ids)
+        return len(bill_ids)
+    
+    def apply(self, query: Query, q: str) -> Optional[Query]:
+        """Restrict a bill query to full-text matches, best ranked first"""
+        match = self.match_expression(q)
+        if not match:
+            return None
+        return query.join(
+            bill_search, bill_search.c.rowid == Bill.id
+        ).filter(
+            bill_search.c.bill_search.op("MATCH")(match)
+        ).order_by(
+            func.bm25(literal_column("bill_search"), *self.RANK_WEIGHTS)
+        )
@@ -0,0 +1,149 @@
+# backend/app/services/bill_writer.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.schemas import BillCreate, BillResponse
+from app.services.billing_service import BillingService
+from app.services.idempotency_cache import idempotency_cache
+
+class _BillWriteRequest:
+    def __init__(self, bill_data: BillCreate, user_id: int, idempotency_key: Optional[str] = None):
+        self.bill_data = bill_data
+        self.user_id = user_id
+        self.idempotency_key = idempotency_key
+        self.future: Future = Future()
+
+def create_writer_session_factory() -> sessionmaker:
+    """Build a session factory for the single writer connection"""
+    if "sqlite" not in settings.DATABASE_URL:
+        return sessionmaker(autocommit=False, autoflush=False, bind=create_engine(settings.DATABASE_URL))
+    
+    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
+    
+    # pysqlite defers BEGIN and breaks SAVEPOINT; take over transaction
+    # control and grab the write lock up front
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class BillWriteQueue:
+    """Queue bill writes for one writer thread that commits them in small groups"""
+    
+    def __init__(self, batch_size: int = 20, max_wait_ms: int = 5):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Optional[_BillWriteRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._session_factory: Optional[sessionmaker] = None
+        self._lock = threading.Lock()
+    
+    def start(self) -> None:
+        """Start the writer thread if it is not running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            if self._session_factory is None:
+                self._session_factory = create_writer_session_factory()
+            self._thread = threading.Thread(target=self._run, name="bill-writer", daemon=True)
+            self._thread.start()
+    
+    def stop(self) -> None:
+        """Flush queued bills and stop the writer thread"""
+        with self._lock:
+            if not self._thread:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+    
+    def submit(
+        self, bill_data: BillCreate, user_id: int, idempotency_key: Optional[str] = None
+    ) -> "Future[BillResponse]":
+        """Queue a bill and return a future for its response or error"""
+        self.start()
+        request = _BillWriteRequest(bill_data, user_id, idempotency_key)
+        self._queue.put(request)
+        return request.future
+    
+    def _run(self) -> None:
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            
+            # Gather a small group, waiting briefly for more cashiers
+            batch = [request]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    request = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            
+            self._flush(batch)
+            if stopping:
+                return
+    
+    def _flush(self, batch: List[_BillWriteRequest]) -> None:
+        """Write a group of bills in one transaction, isolating each in a savepoint"""
+        db = self._session_factory()
+        outcomes = []
+        try:
+            billing_service = BillingService(db)
+            staged_keys = {}
+            for request in batch:
+                key = request.idempotency_key
+                if key:
+                    # Retries of a bill already written, possibly earlier in this group
+                    replay = staged_keys.get(key) or billing_service.find_idempotent_bill(key)
+                    if replay is not None:
+                        outcomes.append((request, replay, None))
+                        continue
+                
+                savepoint = db.begin_nested()
+                try:
+                    response = billing_service.stage_bill(request.bill_data, request.user_id, key)
+                    savepoint.commit()
+                    if key:
+                        staged_keys[key] = response
+                    outcomes.append((request, response, None))
+                except Exception as e:
+                    savepoint.rollback()
+                    # Drop unflushed changes the failed bill left on loaded items
+                    db.expire_all()
+                    outcomes.append((request, None, e))
+            db.commit()
+            for key, response in staged_keys.items():
+                idempotency_cache.put(key, response)
+        except Exception as e:
+            db.rollback()
+            outcomes = [(request, None, e) for request in batch]
+        finally:
+            db.close()
+        
+        # Only answer callers once the group is durable
+        for request, response, error in outcomes:
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(response)
+
+bill_write_queue = BillWriteQueue(settings.BILL_WRITE_BATCH_SIZE, settings.BILL_WRITE_MAX_WAIT_MS)
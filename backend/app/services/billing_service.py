@@ -1,48 +1,249 @@
 # backend/app/services/billing_service.py
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import Integer, String, cast, func, insert, tuple_, type_coerce, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
 
-from app.models import Bill, BillItem, Item, Customer, Supplier
-from app.schemas import BillCreate, BillItemCreate, BillResponse, BillItemResponse
-from app.services.inventory_service import InventoryService
+from app.models import Bill, BillItem, BillSeries, Item, Customer, Supplier
+from app.models.bill import BillType, PaymentStatus
+from app.schemas import (
+    BillCreate, BillItemCreate, BillResponse, BillItemResponse, BillSeriesConfig,
+    BillBulkEntry, BillBulkResult
+)
+from app.services.inventory_service import InsufficientStockError, InventoryService
+from app.services.bill_search_index import BillSearchIndex
+from app.services.catalog_cache import catalog_cache
+from app.services.idempotency_cache import idempotency_cache
+from app.services.stock_journal import StockJournal
+from app.services.lot_service import LotService
+from app.services.sales_rollup_service import SalesRollupService
 
 class BillingService:
     def __init__(self, db: Session):
         self.db = db
         self.inventory_service = InventoryService(db)
     
+    PREFIX_MAP = {
+        "sale_challan": "SC",
+        "gst_invoice": "INV",
+        "quotation": "QT",
+        "purchase": "PUR"
+    }
+    
+    @staticmethod
+    def get_financial_year(on_date: Optional[date] = None) -> str:
+        """Return the April-March financial year for a date, e.g. 2025-26"""
+        on_date = on_date or date.today()
+        start_year = on_date.year if on_date.month >= 4 else on_date.year - 1
+        return f"{start_year}-{(start_year + 1) % 100:02d}"
+    
+    def _ensure_series(self, bill_type: str, financial_year: str) -> None:
+        """Create the series row for a bill type and financial year if missing"""
+        exists = self.db.query(BillSeries.id).filter(
+            BillSeries.bill_type == bill_type,
+            BillSeries.financial_year == financial_year
+        ).first()
+        if exists:
+            return
+        
+        # Keep the prefix of the previous year's series, and carry numbering
+        # forward from bills issued before the series existed
+        start_year = int(financial_year[:4]) - 1
+        previous = self.db.query(BillSeries.prefix).filter(
+            BillSeries.bill_type == bill_type,
+            BillSeries.financial_year == f"{start_year}-{(start_year + 1) % 100:02d}"
+        ).first()
+        prefix = previous.prefix if previous else self.PREFIX_MAP.get(bill_type, "BILL")
+        next_number = self.highest_issued_number(prefix, financial_year) + 1
+        
+        self.db.execute(
+            sqlite_insert(BillSeries).values(
+                bill_type=bill_type,
+                financial_year=financial_year,
+                prefix=prefix,
+                next_number=next_number
+            ).on_conflict_do_nothing(index_elements=["bill_type", "financial_year"])
+        )
+    
+    def highest_issued_number(self, prefix: str, financial_year: str) -> int:
+        """Return the highest sequence number already issued under a prefix in a financial year, 0 if none"""
+        head = f"{prefix}{financial_year[2:4]}"
+        highest = self.db.query(
+            func.max(cast(func.substr(Bill.bill_number, len(head) + 1), Integer))
+        ).filter(Bill.bill_number.startswith(head, autoescape=True)).scalar()
+        return highest or 0
+    
+    def allocate_bill_numbers(self, bill_type: str, count: int = 1) -> List[str]:
+        """Atomically reserve a block of consecutive bill numbers"""
+        financial_year = self.get_financial_year()
+        self._ensure_series(bill_type, financial_year)
+        
+        # Single UPDATE ... RETURNING, so concurrent counters never share a number
+        next_number, prefix = self.db.execute(
+            update(BillSeries)
+            .where(
+                BillSeries.bill_type == bill_type,
+                BillSeries.financial_year == financial_year
+            )
+            .values(next_number=BillSeries.next_number + count)
+            .returning(BillSeries.next_number, BillSeries.prefix)
+        ).one()
+        
+        year = financial_year[2:4]
+        first = next_number - count
+        return [f"{prefix}{year}{sequence:05d}" for sequence in range(first, next_number)]
+    
     def generate_bill_number(self, bill_type: str) -> str:
         """Generate unique bill number based on type and sequence"""
-        prefix_map = {
-            "sale_challan": "SC",
-            "gst_invoice": "INV",
-            "quotation": "QT",
-            "purchase": "PUR"
+        return self.allocate_bill_numbers(bill_type, 1)[0]
+    
+    def get_bill_series(self) -> Dict[str, Dict[str, Any]]:
+        """Return the numbering series of every bill type for the current financial year"""
+        financial_year = self.get_financial_year()
+        for bill_type in self.PREFIX_MAP:
+            self._ensure_series(bill_type, financial_year)
+        self.db.commit()
+        
+        rows = self.db.query(BillSeries).filter(BillSeries.financial_year == financial_year).all()
+        return {
+            row.bill_type.value: {
+                "prefix": row.prefix,
+                "next_number": row.next_number,
+                "financial_year": row.financial_year
+            }
+            for row in rows
         }
+    
+    def update_bill_series(self, config: BillSeriesConfig) -> Dict[str, Dict[str, Any]]:
+        """Change prefixes or next numbers of the current financial year's series"""
+        financial_year = self.get_financial_year()
+        for bill_type, series_update in config.series.items():
+            self._ensure_series(bill_type.value, financial_year)
+            series = self.db.query(BillSeries).filter(
+                BillSeries.bill_type == bill_type.value,
+                BillSeries.financial_year == financial_year
+            ).first()
+            
+            if series_update.prefix is not None:
+                series.prefix = series_update.prefix
+            if series_update.next_number is not None:
+                series.next_number = series_update.next_number
+            
+            # Whatever changed, the series must not reissue a number of its prefix
+            highest = self.highest_issued_number(series.prefix, financial_year)
+            if series.next_number <= highest:
+                raise ValueError(
+                    f"Next number for {bill_type.value} must be above {highest}, "
+                    f"already issued as {series.prefix}{financial_year[2:4]}{highest:05d}"
+                )
         
-        prefix = prefix_map.get(bill_type, "BILL")
-        year = datetime.now().strftime("%y")
+        self.db.commit()
+        return self.get_bill_series()
+    
+    BULK_CHUNK_SIZE = 500
+    # Slack for counter clocks running ahead of the server
+    CLOCK_SKEW = timedelta(minutes=5)
+    
+    def resolve_items(self, item_codes: List[str]) -> Dict[str, Item]:
+        """Load every item referenced by one or more bills in as few queries as possible"""
+        codes = list(set(item_codes))
+        items_by_code = {}
+        for start in range(0, len(codes), self.BULK_CHUNK_SIZE):
+            chunk = codes[start:start + self.BULK_CHUNK_SIZE]
+            for item in self.db.query(Item).filter(Item.item_code.in_(chunk)):
+                items_by_code[item.item_code] = item
+        return items_by_code
+    
+    def price_line(self, item: Item, item_data: BillItemCreate) -> Dict[str, float]:
+        """Calculate the stored values of a bill line"""
+        rate = item_data.rate if item_data.rate else item.selling_price
+        mrp = item_data.mrp if item_data.mrp else item.mrp
+        item_total = item_data.quantity * rate
+        gst_amount = (item_total * item.gst_percentage) / 100
         
-        # Get the last bill number for this type
-        last_bill = self.db.query(Bill).filter(
-            Bill.bill_type == bill_type,
-            Bill.bill_number.like(f"{prefix}{year}%")
-        ).order_by(Bill.id.desc()).first()
+        return {
+            "item_id": item.id,
+            "quantity": item_data.quantity,
+            "rate": rate,
+            "mrp": mrp,
+            "gst_percentage": item.gst_percentage,
+            "gst_amount": gst_amount,
+            "total_amount": item_total + gst_amount
+        }
+    
+    def get_stock_direction(self, bill_type: str) -> int:
+        """Return -1 for bills that sell stock, 1 for purchases and 0 otherwise"""
+        if bill_type in ("sale_challan", "gst_invoice"):
+            return -1
+        if bill_type == "purchase":
+            return 1
+        return 0
+    
+    def get_purchase_lots(
+        self, lines: List[BillItemCreate], items_by_code: Dict[str, Any], bill_id: int
+    ) -> List[Dict[str, Any]]:
+        """Return the lots brought in by purchase lines that carry a batch or expiry"""
+        return [
+            {
+                "item_id": items_by_code[line.item_code].id,
+                "quantity": line.quantity,
+                "batch_no": line.batch_no,
+                "expiry_date": line.expiry_date,
+                "bill_id": bill_id
+            }
+            for line in lines if line.batch_no or line.expiry_date
+        ]
+    
+    def create_bill(
+        self, bill_data: BillCreate, user_id: int, idempotency_key: Optional[str] = None
+    ) -> BillResponse:
+        """Create a new bill with items and return its response"""
+        if idempotency_key:
+            replay = self.find_idempotent_bill(idempotency_key)
+            if replay is not None:
+                return replay
         
-        if last_bill:
-            # Extract sequence number and increment
-            last_sequence = int(last_bill.bill_number[len(prefix) + 2:])
-            sequence = last_sequence + 1
-        else:
-            sequence = 1
+        try:
+            response = self.stage_bill(bill_data, user_id, idempotency_key)
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent retry with the same key committed first; nothing
+            # of this attempt (stock, bill number) was kept
+            self.db.rollback()
+            replay = self.find_idempotent_bill(idempotency_key) if idempotency_key else None
+            if replay is None:
+                raise
+            return replay
         
-        return f"{prefix}{year}{sequence:05d}"
+        if idempotency_key:
+            idempotency_cache.put(idempotency_key, response)
+        return response
     
-    def create_bill(self, bill_data: BillCreate, user_id: int) -> Bill:
-        """Create a new bill with items"""
+    def find_idempotent_bill(self, idempotency_key: str) -> Optional[BillResponse]:
+        """Return the response of the bill already created under an idempotency key"""
+        response = idempotency_cache.get(idempotency_key)
+        if response is None:
+            bill = self.db.query(Bill).filter(Bill.idempotency_key == idempotency_key).first()
+            if bill:
+                response = self.get_bill_response(bill)
+                idempotency_cache.put(idempotency_key, response)
+        return response
+    
+    def stage_bill(
+        self, bill_data: BillCreate, user_id: int, idempotency_key: Optional[str] = None
+    ) -> BillResponse:
+        """Write a bill and its stock changes to the session without committing"""
+        bill_type = bill_data.bill_type.value
+        
+        # Resolve all items of the bill up front from the catalog cache
+        items_by_code = catalog_cache.get_by_codes(self.db, [line.item_code for line in bill_data.items])
+        
         # Generate bill number
-        bill_number = self.generate_bill_number(bill_data.bill_type.value)
+        bill_number = self.generate_bill_number(bill_type)
         
         # Create bill
         bill = Bill(
@@ -53,76 +254,429 @@ class BillingService:
             discount_amount=bill_data.discount_amount,
             payment_method=bill_data.payment_method,
             payment_status=bill_data.payment_status,
-            created_by=user_id
+            created_by=user_id,
+            idempotency_key=idempotency_key,
+            created_at=datetime.utcnow()
         )
         
         # Process bill items
         total_amount = 0
         total_gst = 0
+        stock_changes = {}
+        direction = self.get_stock_direction(bill_type)
         
         for item_data in bill_data.items:
-            # Get item details
-            item = self.db.query(Item).filter(Item.item_code == item_data.item_code).first()
+            item = items_by_code.get(item_data.item_code)
             if not item:
                 raise ValueError(f"Item not found: {item_data.item_code}")
             
-            # Calculate amounts
-            rate = item_data.rate if item_data.rate else item.selling_price
-            mrp = item_data.mrp if item_data.mrp else item.mrp
-            item_total = item_data.quantity * rate
-            gst_amount = (item_total * item.gst_percentage) / 100
-            
             # Create bill item
-            bill_item = BillItem(
-                item_id=item.id,
-                quantity=item_data.quantity,
-                rate=rate,
-                mrp=mrp,
-                gst_percentage=item.gst_percentage,
-                gst_amount=gst_amount,
-                total_amount=item_total + gst_amount
-            )
+            line = self.price_line(item, item_data)
+            bill.items.append(BillItem(**line))
+            total_amount += line["quantity"] * line["rate"]
+            total_gst += line["gst_amount"]
             
-            bill.items.append(bill_item)
-            total_amount += item_total
-            total_gst += gst_amount
-            
-            # Update inventory for sales
-            if bill_data.bill_type in ["sale_challan", "gst_invoice"]:
-                self.inventory_service.update_stock(item.id, -item_data.quantity, f"Sale: {bill_number}")
-            elif bill_data.bill_type == "purchase":
-                self.inventory_service.update_stock(item.id, item_data.quantity, f"Purchase: {bill_number}")
+            # Collect inventory changes, merging repeated lines of the same item
+            if direction:
+                stock_changes[item.id] = stock_changes.get(item.id, 0) + direction * item_data.quantity
         
         # Set bill totals
         bill.total_amount = total_amount
         bill.gst_amount = total_gst
         bill.net_amount = total_amount + total_gst - bill.discount_amount
-        
-        # Save bill
         self.db.add(bill)
+        self.db.flush()
+        SalesRollupService(self.db).bills_added([(bill, bill.items)])
+        
+        # Update and journal inventory in the same transaction as the bill
+        if stock_changes:
+            self.inventory_service.adjust_stocks(
+                stock_changes,
+                f"{'Purchase' if direction > 0 else 'Sale'}: {bill_number}",
+                bill.id,
+                user_id
+            )
+            if direction > 0:
+                LotService(self.db).receive(self.get_purchase_lots(bill_data.items, items_by_code, bill.id))
+        
+        # Build the response from the in-memory objects before a commit expires them
+        response = self.build_bill_response(
+            bill,
+            bill.items,
+            {item.id: item for item in items_by_code.values()},
+            self._get_party_name(Customer, bill.customer_id),
+            self._get_party_name(Supplier, bill.supplier_id)
+        )
+        
+        BillSearchIndex(self.db).add_bill(
+            response.id,
+            response.bill_number,
+            response.customer_name or response.supplier_name,
+            [line.item_name for line in response.items]
+        )
+        return response
+    
+    @staticmethod
+    def normalize_bill_time(value: Optional[datetime], now: datetime) -> datetime:
+        """Convert a counter's bill time to the naive UTC stored on bills; naive times are local time"""
+        if value is None:
+            return now
+        if value.tzinfo is None:
+            value = value.astimezone()
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        if value > now + BillingService.CLOCK_SKEW:
+            raise ValueError(f"Bill time {value.isoformat()} UTC is in the future")
+        return value
+    
+    def create_bills_bulk(self, entries: List[BillBulkEntry], user_id: int) -> List[BillBulkResult]:
+        """Validate and insert a batch of bills with bulk statements and one commit.
+        
+        If a sale committed since validation takes stock the batch counted
+        on, the batch is rolled back and validated again against the new
+        stock. From the second retry on, bills with the contended items are
+        rejected so the rest of the batch still goes through.
+        """
+        blocked = set()
+        key_conflicts = 0
+        for attempt in itertools.count():
+            try:
+                return self._create_bills_bulk(entries, user_id, blocked)
+            except InsufficientStockError as e:
+                self.db.rollback()
+                if attempt >= 1:
+                    blocked.update([item["item_id"] for item in e.items] + e.missing)
+            except IntegrityError:
+                # A concurrent sync committed one of the batch's idempotency
+                # keys first; the next attempt replays it
+                self.db.rollback()
+                key_conflicts += 1
+                if key_conflicts > 1:
+                    raise
+    
+    def _find_bulk_replays(self, keys: List[str]) -> Dict[str, Bill]:
+        replays = {}
+        for start in range(0, len(keys), self.BULK_CHUNK_SIZE):
+            chunk = keys[start:start + self.BULK_CHUNK_SIZE]
+            replays.update(
+                (row.idempotency_key, row)
+                for row in self.db.query(Bill.id, Bill.bill_number, Bill.net_amount, Bill.idempotency_key)
+                .filter(Bill.idempotency_key.in_(chunk))
+            )
+        return replays
+    
+    def _create_bills_bulk(self, entries: List[BillBulkEntry], user_id: int, blocked: set) -> List[BillBulkResult]:
+        results = [BillBulkResult(index=index, success=False) for index in range(len(entries))]
+        now = datetime.utcnow()
+        
+        # Bills already written under their idempotency key, by an earlier sync or in this batch
+        replays = self._find_bulk_replays(list({entry.idempotency_key for entry in entries if entry.idempotency_key}))
+        first_by_key = {}
+        duplicates = {}
+        created_at = {}
+        
+        # Resolve items and parties for the whole batch
+        items_by_code = self.resolve_items(
+            [line.item_code for entry in entries for line in entry.items]
+        )
+        customer_ids = self._get_party_names(Customer, {entry.customer_id for entry in entries})
+        supplier_ids = self._get_party_names(Supplier, {entry.supplier_id for entry in entries})
+        
+        # Validate bills in order against a running view of stock
+        stock = {item.id: item.current_stock for item in items_by_code.values()}
+        stock_changes = {}
+        movements = {}
+        accepted = []
+        
+        for index, entry in enumerate(entries):
+            key = entry.idempotency_key
+            if key in replays:
+                replay = replays[key]
+                results[index] = BillBulkResult(
+                    index=index, success=True, bill_id=replay.id,
+                    bill_number=replay.bill_number, net_amount=replay.net_amount
+                )
+                continue
+            if key in first_by_key:
+                duplicates[index] = first_by_key[key]
+                continue
+            
+            try:
+                created_at[index] = self.normalize_bill_time(entry.created_at, now)
+            except ValueError as e:
+                results[index].error = str(e)
+                continue
+            missing = [line.item_code for line in entry.items if line.item_code not in items_by_code]
+            if missing:
+                results[index].error = f"Item not found: {', '.join(missing)}"
+                continue
+            if entry.customer_id and entry.customer_id not in customer_ids:
+                results[index].error = f"Customer not found: {entry.customer_id}"
+                continue
+            if entry.supplier_id and entry.supplier_id not in supplier_ids:
+                results[index].error = f"Supplier not found: {entry.supplier_id}"
+                continue
+            
+            direction = self.get_stock_direction(entry.bill_type.value)
+            changes = {}
+            for line in entry.items:
+                item_id = items_by_code[line.item_code].id
+                changes[item_id] = changes.get(item_id, 0) + direction * line.quantity
+            
+            short = {
+                line.item_code for line in entry.items
+                if stock[items_by_code[line.item_code].id] + changes[items_by_code[line.item_code].id] < 0
+            }
+            if short:
+                results[index].error = f"Insufficient stock for {', '.join(sorted(short))}"
+                continue
+            contended = sorted(
+                line.item_code for line in entry.items if items_by_code[line.item_code].id in blocked
+            )
+            if contended:
+                results[index].error = f"Stock of {', '.join(contended)} changed during sync; retry this bill"
+                continue
+            
+            movements[index] = []
+            for item_id, quantity_change in changes.items():
+                if quantity_change:
+                    stock[item_id] += quantity_change
+                    stock_changes[item_id] = stock_changes.get(item_id, 0) + quantity_change
+                    movements[index].append((item_id, quantity_change, stock[item_id]))
+            accepted.append(index)
+            if key:
+                first_by_key[key] = index
+        
+        if not accepted:
+            return self._fill_duplicates(results, duplicates)
+        
+        # Allocate bill numbers in one block per bill type
+        numbers = {}
+        by_type = {}
+        for index in accepted:
+            by_type.setdefault(entries[index].bill_type.value, []).append(index)
+        for bill_type, indexes in by_type.items():
+            numbers.update(zip(indexes, self.allocate_bill_numbers(bill_type, len(indexes))))
+        
+        # Build bill and line rows
+        bill_rows = []
+        line_rows = []
+        for index in accepted:
+            entry = entries[index]
+            lines = [self.price_line(items_by_code[line.item_code], line) for line in entry.items]
+            total_amount = sum(line["quantity"] * line["rate"] for line in lines)
+            total_gst = sum(line["gst_amount"] for line in lines)
+            bill_rows.append({
+                "bill_number": numbers[index],
+                "bill_type": BillType[entry.bill_type.value],
+                "customer_id": entry.customer_id,
+                "supplier_id": entry.supplier_id,
+                "total_amount": total_amount,
+                "gst_amount": total_gst,
+                "discount_amount": entry.discount_amount,
+                "net_amount": total_amount + total_gst - entry.discount_amount,
+                "payment_method": entry.payment_method,
+                "payment_status": PaymentStatus[entry.payment_status.value],
+                "created_by": user_id,
+                "idempotency_key": entry.idempotency_key,
+                "created_at": created_at[index]
+            })
+            line_rows.append(lines)
+        
+        # Insert bills, lines and stock changes with executemany statements
+        bill_ids = []
+        for start in range(0, len(bill_rows), self.BULK_CHUNK_SIZE):
+            bill_ids.extend(self.db.scalars(
+                insert(Bill).returning(Bill.id, sort_by_parameter_order=True),
+                bill_rows[start:start + self.BULK_CHUNK_SIZE]
+            ).all())
+        
+        item_rows = []
+        for bill_id, lines in zip(bill_ids, line_rows):
+            for line in lines:
+                item_rows.append(dict(line, bill_id=bill_id))
+        self.db.execute(insert(BillItem), item_rows)
+        BillSearchIndex(self.db).index_bills(bill_ids)
+        SalesRollupService(self.db).bills_added(
+            (SimpleNamespace(**row), [SimpleNamespace(**line) for line in lines])
+            for row, lines in zip(bill_rows, line_rows)
+        )
+        
+        if stock_changes:
+            # Guarded against sales committed since the items were read; any
+            # such sales shift the journaled balances by the same amount
+            balances = self.inventory_service.apply_stock_changes(stock_changes)
+            # Items the batch sold and bought back in equal amounts are not updated
+            unchanged = [item_id for item_id in stock_changes if item_id not in balances]
+            for start in range(0, len(unchanged), self.BULK_CHUNK_SIZE):
+                chunk = unchanged[start:start + self.BULK_CHUNK_SIZE]
+                balances.update(self.db.query(Item.id, Item.current_stock).filter(Item.id.in_(chunk)).all())
+            drift = {item_id: balance - stock[item_id] for item_id, balance in balances.items()}
+            StockJournal(self.db).record([
+                StockJournal.movement(
+                    item_id,
+                    quantity_change,
+                    balance_after + drift[item_id],
+                    f"{'Purchase' if quantity_change > 0 else 'Sale'}: {row['bill_number']}",
+                    bill_id,
+                    user_id,
+                    row["created_at"]
+                )
+                for index, bill_id, row in zip(accepted, bill_ids, bill_rows)
+                for item_id, quantity_change, balance_after in movements[index]
+            ])
+            
+            # Receive the batch's purchased lots before drawing its sales from them
+            lots = LotService(self.db)
+            sold = {}
+            received = []
+            for index, bill_id in zip(accepted, bill_ids):
+                entry = entries[index]
+                direction = self.get_stock_direction(entry.bill_type.value)
+                if direction > 0:
+                    received.extend(self.get_purchase_lots(entry.items, items_by_code, bill_id))
+                elif direction < 0:
+                    for line in entry.items:
+                        item_id = items_by_code[line.item_code].id
+                        sold[item_id] = sold.get(item_id, 0) + line.quantity
+            lots.receive(received)
+            lots.allocate(sold)
+        
         self.db.commit()
-        self.db.refresh(bill)
         
-        return bill
+        for index, bill_id, row in zip(accepted, bill_ids, bill_rows):
+            results[index].success = True
+            results[index].bill_id = bill_id
+            results[index].bill_number = row["bill_number"]
+            results[index].net_amount = row["net_amount"]
+        
+        return self._fill_duplicates(results, duplicates)
+    
+    @staticmethod
+    def _fill_duplicates(results: List[BillBulkResult], duplicates: Dict[int, int]) -> List[BillBulkResult]:
+        """Give entries repeating an idempotency key earlier in the batch the outcome of the first"""
+        for index, first in duplicates.items():
+            results[index] = results[first].model_copy(update={"index": index})
+        return results
+    
+    def search_bills(
+        self,
+        q: Optional[str] = None,
+        bill_type: Optional[str] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        customer_id: Optional[int] = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Bill], Optional[str]]:
+        """Search bills newest first, paging by offset or by a keyset cursor.
+        
+        A text query searches bill numbers, party names and item names and
+        returns the best matches first; such results are paged by offset.
+        """
+        query = self.db.query(Bill)
+        
+        ranked = BillSearchIndex(self.db).apply(query, q) if q else None
+        if ranked is not None:
+            query = ranked
+            cursor = None
+        if bill_type:
+            query = query.filter(Bill.bill_type == bill_type)
+        if from_date:
+            query = query.filter(Bill.created_at >= from_date)
+        if to_date:
+            query = query.filter(Bill.created_at <= to_date)
+        if customer_id:
+            query = query.filter(Bill.customer_id == customer_id)
+        
+        if cursor:
+            # The cursor is the id of the last bill on the previous page; seek
+            # past its stored (created_at, id) so the composite index is used
+            try:
+                cursor_id = int(cursor)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+            created_at = type_coerce(Bill.created_at, String)
+            anchor = self.db.query(created_at).filter(Bill.id == cursor_id).scalar()
+            if anchor is None:
+                raise ValueError("Invalid cursor")
+            query = query.filter(tuple_(created_at, Bill.id) < tuple_(anchor, cursor_id))
+            offset = 0
+        
+        bills = query.order_by(
+            Bill.created_at.desc(), Bill.id.desc()
+        ).offset(offset).limit(limit).all()
+        next_cursor = str(bills[-1].id) if len(bills) == limit and ranked is None else None
+        return bills, next_cursor
+    
+    def _get_party_name(self, model, party_id: Optional[int]) -> Optional[str]:
+        """Look up a customer or supplier name by primary key"""
+        if not party_id:
+            return None
+        party = self.db.get(model, party_id)
+        return party.name if party else None
     
     def get_bill_response(self, bill: Bill) -> BillResponse:
         """Convert bill model to response schema"""
-        # Load related data
-        bill = self.db.query(Bill).options(
-            joinedload(Bill.items).joinedload(BillItem.item),
-            joinedload(Bill.customer),
-            joinedload(Bill.supplier)
-        ).filter(Bill.id == bill.id).first()
+        return self.get_bill_responses([bill])[0]
+    
+    def get_bill_responses(self, bills: List[Bill]) -> List[BillResponse]:
+        """Convert a page of bills to responses with a fixed number of queries"""
+        if not bills:
+            return []
+        
+        # Load lines, products and parties for the whole page at once
+        bill_items = self.db.query(BillItem).filter(
+            BillItem.bill_id.in_([bill.id for bill in bills])
+        ).order_by(BillItem.id).all()
+        
+        items_by_id = catalog_cache.get_by_ids(self.db, {bill_item.item_id for bill_item in bill_items})
+        
+        customer_names = self._get_party_names(Customer, {bill.customer_id for bill in bills})
+        supplier_names = self._get_party_names(Supplier, {bill.supplier_id for bill in bills})
         
+        lines_by_bill = {}
+        for bill_item in bill_items:
+            lines_by_bill.setdefault(bill_item.bill_id, []).append(bill_item)
+        
+        return [
+            self.build_bill_response(
+                bill,
+                lines_by_bill.get(bill.id, []),
+                items_by_id,
+                customer_names.get(bill.customer_id),
+                supplier_names.get(bill.supplier_id)
+            )
+            for bill in bills
+        ]
+    
+    def _get_party_names(self, model, party_ids: set) -> Dict[int, str]:
+        """Map customer or supplier ids to names in one query"""
+        party_ids.discard(None)
+        if not party_ids:
+            return {}
+        rows = self.db.query(model.id, model.name).filter(model.id.in_(party_ids)).all()
+        return {row.id: row.name for row in rows}
+    
+    def build_bill_response(
+        self,
+        bill: Bill,
+        bill_items: List[BillItem],
+        items_by_id: Dict[int, Any],
+        customer_name: Optional[str],
+        supplier_name: Optional[str]
+    ) -> BillResponse:
+        """Assemble a bill response from already loaded rows"""
         # Prepare items response
         items = []
-        for bill_item in bill.items:
+        for bill_item in bill_items:
+            item = items_by_id[bill_item.item_id]
             item_response = BillItemResponse(
                 id=bill_item.id,
                 item_id=bill_item.item_id,
-                item_code=bill_item.item.item_code,
-                item_name=bill_item.item.name,
-                size=bill_item.item.size,
+                item_code=item.item_code,
+                item_name=item.name,
+                size=item.size,
                 quantity=bill_item.quantity,
                 rate=bill_item.rate,
                 mrp=bill_item.mrp,
@@ -138,9 +692,9 @@ class BillingService:
             bill_number=bill.bill_number,
             bill_type=bill.bill_type,
             customer_id=bill.customer_id,
-            customer_name=bill.customer.name if bill.customer else None,
+            customer_name=customer_name,
             supplier_id=bill.supplier_id,
-            supplier_name=bill.supplier.name if bill.supplier else None,
+            supplier_name=supplier_name,
             total_amount=bill.total_amount,
             gst_amount=bill.gst_amount,
             discount_amount=bill.discount_amount,
@@ -151,4 +705,4 @@ class BillingService:
             created_at=bill.created_at,
             updated_at=bill.updated_at,
             items=items
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,216 @@
+# backend/app/services/cart_store.py
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.schemas import (
+    BillCreate, BillItemCreate, CartCreate, CartFinalize, CartLine, CartResponse, CartStatus
+)
+from app.services.catalog_cache import CatalogEntry
+
+class CartStore:
+    """In-memory draft carts with TTL eviction and an optional JSON snapshot"""
+    
+    def __init__(self, ttl_minutes: int = 240, snapshot_path: Optional[str] = None):
+        self.ttl = ttl_minutes * 60
+        self.snapshot_path = snapshot_path
+        self._carts: Dict[str, CartResponse] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def _touch(self, cart: CartResponse) -> CartResponse:
+        cart.updated_at = datetime.utcnow()
+        self._expires[cart.id] = time.time() + self.ttl
+        return cart
+    
+    def _evict_expired(self) -> None:
+        now = time.time()
+        for cart_id in [cart_id for cart_id, expires in self._expires.items() if expires <= now]:
+            self._carts.pop(cart_id, None)
+            self._expires.pop(cart_id, None)
+    
+    def _get(self, cart_id: str) -> CartResponse:
+        self._evict_expired()
+        cart = self._carts.get(cart_id)
+        if not cart:
+            raise KeyError(cart_id)
+        return cart
+    
+    @staticmethod
+    def _recalculate(cart: CartResponse) -> None:
+        cart.total_amount = sum(line.quantity * line.rate for line in cart.lines)
+        cart.gst_amount = sum(
+            line.quantity * line.rate * line.gst_percentage / 100 for line in cart.lines
+        )
+    
+    def create(self, cart_data: CartCreate, user_id: int) -> CartResponse:
+        """Open a new empty cart"""
+        now = datetime.utcnow()
+        cart = CartResponse(
+            id=uuid.uuid4().hex,
+            bill_type=cart_data.bill_type,
+            customer_id=cart_data.customer_id,
+            supplier_id=cart_data.supplier_id,
+            created_by=user_id,
+            created_at=now,
+            updated_at=now
+        )
+        with self._lock:
+            self._evict_expired()
+            self._carts[cart.id] = cart
+            return self._touch(cart)
+    
+    def get(self, cart_id: str) -> CartResponse:
+        """Return a cart, raising KeyError if it does not exist or expired"""
+        with self._lock:
+            return self._get(cart_id)
+    
+    def list_held(self) -> List[CartResponse]:
+        """Return parked carts, oldest first"""
+        with self._lock:
+            self._evict_expired()
+            held = [cart for cart in self._carts.values() if cart.status == CartStatus.held]
+        return sorted(held, key=lambda cart: cart.updated_at)
+    
+    def add_line(self, cart_id: str, item: CatalogEntry, quantity: float,
+                 rate: Optional[float] = None, mrp: Optional[float] = None) -> CartResponse:
+        """Add an item to the cart, merging with an existing line for the same item.
+        
+        A rate or MRP given with a merged quantity replaces the line's, so
+        the whole line bills at the price last entered.
+        """
+        with self._lock:
+            cart = self._get(cart_id)
+            for line in cart.lines:
+                if line.item_code == item.item_code:
+                    line.quantity = round(line.quantity + quantity, 3)
+                    if rate is not None:
+                        line.rate = rate
+                    if mrp is not None:
+                        line.mrp = mrp
+                    break
+            else:
+                cart.lines.append(CartLine(
+                    item_id=item.id,
+                    item_code=item.item_code,
+                    item_name=item.name,
+                    size=item.size,
+                    quantity=round(quantity, 3),
+                    rate=rate if rate is not None else item.selling_price,
+                    mrp=mrp if mrp is not None else item.mrp,
+                    gst_percentage=item.gst_percentage or 0
+                ))
+            self._recalculate(cart)
+            return self._touch(cart)
+    
+    def remove_line(self, cart_id: str, item_code: str, quantity: Optional[float] = None) -> CartResponse:
+        """Remove a line, or only part of its quantity"""
+        with self._lock:
+            cart = self._get(cart_id)
+            for line in cart.lines:
+                if line.item_code == item_code:
+                    if quantity is not None and quantity < line.quantity:
+                        line.quantity = round(line.quantity - quantity, 3)
+                    else:
+                        cart.lines.remove(line)
+                    break
+            else:
+                raise ValueError(f"Item not in cart: {item_code}")
+            self._recalculate(cart)
+            return self._touch(cart)
+    
+    def set_status(self, cart_id: str, status: CartStatus) -> CartResponse:
+        """Hold or resume a cart"""
+        with self._lock:
+            cart = self._get(cart_id)
+            cart.status = status
+            self._touch(cart)
+        if status == CartStatus.held:
+            self.save_snapshot()
+        return cart
+    
+    def discard(self, cart_id: str) -> None:
+        """Drop a cart without billing it"""
+        with self._lock:
+            self._get(cart_id)
+            self._carts.pop(cart_id)
+            self._expires.pop(cart_id, None)
+    
+    def checkout(self, cart_id: str) -> CartResponse:
+        """Take a cart out of the store so it can be billed exactly once"""
+        with self._lock:
+            cart = self._get(cart_id)
+            if not cart.lines:
+                raise ValueError("Cart is empty")
+            self._carts.pop(cart_id)
+            self._expires.pop(cart_id, None)
+            return cart
+    
+    def restore(self, cart: CartResponse) -> None:
+        """Put a cart back after a failed finalize"""
+        with self._lock:
+            self._carts[cart.id] = cart
+            self._touch(cart)
+    
+    @staticmethod
+    def idempotency_key(cart_id: str) -> str:
+        """Key the cart's bill is created under, so a retried finalize returns it"""
+        return f"cart-{cart_id}"
+    
+    @staticmethod
+    def to_bill(cart: CartResponse, finalize: CartFinalize) -> BillCreate:
+        """Build the bill payload for a cart"""
+        return BillCreate(
+            bill_type=cart.bill_type,
+            customer_id=cart.customer_id,
+            supplier_id=cart.supplier_id,
+            items=[
+                BillItemCreate(
+                    item_code=line.item_code,
+                    quantity=line.quantity,
+                    rate=line.rate,
+                    mrp=line.mrp
+                )
+                for line in cart.lines
+            ],
+            discount_amount=finalize.discount_amount,
+            payment_method=finalize.payment_method,
+            payment_status=finalize.payment_status
+        )
+    
+    def save_snapshot(self) -> None:
+        """Write all live carts to the snapshot file, if one is configured"""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            self._evict_expired()
+            data = [
+                {"cart": json.loads(cart.model_dump_json()), "expires": self._expires[cart.id]}
+                for cart in self._carts.values()
+            ]
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.snapshot_path)
+    
+    def load_snapshot(self) -> int:
+        """Restore unexpired carts from the snapshot file"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        with open(self.snapshot_path) as f:
+            data = json.load(f)
+        now = time.time()
+        with self._lock:
+            for entry in data:
+                if entry["expires"] > now:
+                    cart = CartResponse(**entry["cart"])
+                    self._carts[cart.id] = cart
+                    self._expires[cart.id] = entry["expires"]
+            return len(self._carts)
+
+cart_store = CartStore(settings.CART_TTL_MINUTES, settings.CART_SNAPSHOT_PATH)
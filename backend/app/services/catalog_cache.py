@@ -0,0 +1,232 @@
+# backend/app/services/catalog_cache.py
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Item, ItemBarcode
+
+class CatalogEntry:
+    """Snapshot of an item's catalog columns"""
+    
+    FIELDS = [column.name for column in Item.__table__.columns if column.name != "current_stock"]
+    
+    def __init__(self, **values):
+        self.__dict__.update(values)
+    
+    def with_stock(self, current_stock: float) -> "CatalogEntry":
+        """Return a copy carrying the given stock level"""
+        return CatalogEntry(**self.__dict__, current_stock=current_stock)
+
+class CatalogCache:
+    """In-process item catalog keyed by id, item_code and barcode.
+    
+    Catalog columns and stock levels are cached separately so a sale only
+    drops the stock of the items it touched while their prices stay cached.
+    Invalidations are queued on the session and applied after it commits.
+    Each worker process has its own cache.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[int, CatalogEntry] = {}
+        self._ids_by_code: Dict[str, int] = {}
+        self._ids_by_barcode: Dict[str, int] = {}
+        # Additional barcodes from item_barcodes that have been scanned
+        self._extra_barcodes: Dict[int, Set[str]] = {}
+        self._stock: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so a load that raced one is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._listeners: List[Callable[[List[int]], None]] = []
+    
+    def add_listener(self, callback: Callable[[List[int]], None]) -> None:
+        """Call back with item ids whenever their catalog columns are invalidated"""
+        self._listeners.append(callback)
+    
+    def _store(self, rows, generation: int) -> List[CatalogEntry]:
+        entries = []
+        with self._lock:
+            cacheable = generation == self._generation
+            for row in rows:
+                values = dict(row._mapping)
+                stock = values.pop("current_stock")
+                entry = CatalogEntry(**values)
+                entries.append(entry)
+                if not cacheable:
+                    continue
+                self._drop(entry.id)
+                self._entries[entry.id] = entry
+                self._ids_by_code[entry.item_code] = entry.id
+                if entry.barcode:
+                    self._ids_by_barcode[entry.barcode] = entry.id
+                self._stock[entry.id] = stock
+        return entries
+    
+    def _drop(self, item_id: int) -> None:
+        entry = self._entries.pop(item_id, None)
+        self._stock.pop(item_id, None)
+        if entry:
+            if self._ids_by_code.get(entry.item_code) == item_id:
+                del self._ids_by_code[entry.item_code]
+            if entry.barcode and self._ids_by_barcode.get(entry.barcode) == item_id:
+                del self._ids_by_barcode[entry.barcode]
+        for barcode in self._extra_barcodes.pop(item_id, ()):
+            if self._ids_by_barcode.get(barcode) == item_id:
+                del self._ids_by_barcode[barcode]
+    
+    def _load(self, db: Session, *criteria) -> List[CatalogEntry]:
+        generation = self._generation
+        return self._store(db.query(*Item.__table__.columns).filter(*criteria).all(), generation)
+    
+    def _count(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+    
+    def get_by_codes(self, db: Session, item_codes: Iterable[str]) -> Dict[str, CatalogEntry]:
+        """Resolve item codes, loading all misses with one query"""
+        found = {}
+        missing = []
+        with self._lock:
+            for code in set(item_codes):
+                item_id = self._ids_by_code.get(code)
+                if item_id is not None:
+                    found[code] = self._entries[item_id]
+                else:
+                    missing.append(code)
+        self._count(len(found), len(missing))
+        
+        if missing:
+            for entry in self._load(db, Item.item_code.in_(missing)):
+                found[entry.item_code] = entry
+        return found
+    
+    def get_by_ids(self, db: Session, item_ids: Iterable[int]) -> Dict[int, CatalogEntry]:
+        """Resolve item ids, loading all misses with one query"""
+        found = {}
+        missing = []
+        with self._lock:
+            for item_id in set(item_ids):
+                entry = self._entries.get(item_id)
+                if entry is not None:
+                    found[item_id] = entry
+                else:
+                    missing.append(item_id)
+        self._count(len(found), len(missing))
+        
+        if missing:
+            for entry in self._load(db, Item.id.in_(missing)):
+                found[entry.id] = entry
+        return found
+    
+    def get_by_barcode(self, db: Session, barcode: str) -> Optional[CatalogEntry]:
+        """Resolve a scanned barcode, either an item's own or one from item_barcodes"""
+        with self._lock:
+            item_id = self._ids_by_barcode.get(barcode)
+            entry = self._entries.get(item_id) if item_id is not None else None
+        self._count(1 if entry else 0, 0 if entry else 1)
+        if entry is not None:
+            return entry
+        
+        generation = self._generation
+        loaded = self._load(db, or_(
+            Item.barcode == barcode,
+            Item.id.in_(select(ItemBarcode.item_id).where(ItemBarcode.barcode == barcode))
+        ))
+        if not loaded:
+            return None
+        
+        # Prefer the item printed with this barcode over an additional one
+        entry = next((entry for entry in loaded if entry.barcode == barcode), loaded[0])
+        if entry.barcode != barcode:
+            with self._lock:
+                if generation == self._generation and entry.id in self._entries:
+                    self._ids_by_barcode[barcode] = entry.id
+                    self._extra_barcodes.setdefault(entry.id, set()).add(barcode)
+        return entry
+    
+    def get_items(self, db: Session, item_ids: List[int]) -> List[CatalogEntry]:
+        """Return full items with stock, in the given order"""
+        entries = self.get_by_ids(db, item_ids)
+        with self._lock:
+            stock = {item_id: self._stock[item_id] for item_id in item_ids if item_id in self._stock}
+        missing = [item_id for item_id in item_ids if item_id not in stock and item_id in entries]
+        self._count(len(item_ids) - len(missing), len(missing))
+        
+        if missing:
+            generation = self._generation
+            rows = db.query(Item.id, Item.current_stock).filter(Item.id.in_(missing)).all()
+            with self._lock:
+                for row in rows:
+                    if row.id in self._entries and generation == self._generation:
+                        self._stock[row.id] = row.current_stock
+                    stock[row.id] = row.current_stock
+        return [
+            entries[item_id].with_stock(stock[item_id])
+            for item_id in item_ids if item_id in entries and item_id in stock
+        ]
+    
+    def invalidate(self, item_ids: Iterable[int]) -> None:
+        """Forget everything cached about these items"""
+        item_ids = list(item_ids)
+        if not item_ids:
+            return
+        with self._lock:
+            self._generation += 1
+            for item_id in item_ids:
+                self._drop(item_id)
+        for callback in self._listeners:
+            callback(item_ids)
+    
+    def invalidate_stock(self, item_ids: Iterable[int]) -> None:
+        """Forget the cached stock of these items, keeping their catalog columns"""
+        item_ids = list(item_ids)
+        if not item_ids:
+            return
+        with self._lock:
+            self._generation += 1
+            for item_id in item_ids:
+                self._stock.pop(item_id, None)
+    
+    def invalidate_on_commit(self, db: Session, item_ids: Iterable[int]) -> None:
+        """Invalidate items once the session's transaction commits"""
+        db.info.setdefault("catalog_invalidate", set()).update(item_ids)
+    
+    def invalidate_stock_on_commit(self, db: Session, item_ids: Iterable[int]) -> None:
+        """Invalidate stock levels once the session's transaction commits"""
+        db.info.setdefault("catalog_invalidate_stock", set()).update(item_ids)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._ids_by_code.clear()
+            self._ids_by_barcode.clear()
+            self._extra_barcodes.clear()
+            self._stock.clear()
+    
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "items": len(self._entries),
+                "stock_levels": len(self._stock),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+catalog_cache = CatalogCache()
+
+@event.listens_for(Session, "after_commit")
+def _apply_catalog_invalidations(session: Session) -> None:
+    catalog_cache.invalidate(session.info.pop("catalog_invalidate", ()))
+    catalog_cache.invalidate_stock(session.info.pop("catalog_invalidate_stock", ()))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_invalidations(session: Session) -> None:
+    session.info.pop("catalog_invalidate", None)
+    session.info.pop("catalog_invalidate_stock", None)
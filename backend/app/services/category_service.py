@@ -0,0 +1,75 @@
+# backend/app/services/category_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+
+from app.models import Category, Item
+
+class CategoryService:
+    """Category dimension giving the category names items carry integer keys.
+    
+    Items keep their category string for display and search, alongside a
+    category_id that filters use. Each category row also holds the running
+    stock totals maintained by StockValuationService.
+    """
+    
+    CHUNK_SIZE = 500
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def _lookup(self, names: List[str]) -> Dict[str, int]:
+        ids = {}
+        for start in range(0, len(names), self.CHUNK_SIZE):
+            chunk = names[start:start + self.CHUNK_SIZE]
+            ids.update(
+                (row.name, row.id)
+                for row in self.db.query(Category.id, Category.name).filter(Category.name.in_(chunk))
+            )
+        return ids
+    
+    def resolve(self, names: Iterable[Optional[str]]) -> Dict[str, int]:
+        """Map category names to ids, adding categories seen for the first time"""
+        names = list({name or "" for name in names})
+        ids = self._lookup(names)
+        missing = [name for name in names if name not in ids]
+        if missing:
+            now = datetime.utcnow()
+            self.db.execute(
+                sqlite_insert(Category).on_conflict_do_nothing(index_elements=["name"]),
+                [{"name": name, "created_at": now, "updated_at": now} for name in missing]
+            )
+            ids.update(self._lookup(missing))
+        return ids
+    
+    def resolve_one(self, name: Optional[str]) -> int:
+        return self.resolve([name])[name or ""]
+    
+    def filter_id(self, category_id: Optional[int] = None, name: Optional[str] = None) -> Optional[int]:
+        """Category id to filter items by, given an id or a name; unknown names give 0, which matches nothing"""
+        if category_id is not None or not name:
+            return category_id
+        return self.db.query(Category.id).filter(Category.name == name).scalar() or 0
+    
+    def get_categories(self, include_empty: bool = False) -> List[Category]:
+        """Get named categories with their cached item counts and stock value"""
+        query = self.db.query(Category).filter(Category.name != "")
+        if not include_empty:
+            query = query.filter(Category.item_count > 0)
+        return query.order_by(Category.name).all()
+    
+    def link_items(self) -> int:
+        """Point every item at the category of its name, returning how many were relinked"""
+        category_name = func.coalesce(Item.category, "")
+        self.resolve(name for (name,) in self.db.query(category_name).distinct())
+        
+        category_id = select(Category.id).where(Category.name == category_name).scalar_subquery()
+        result = self.db.execute(
+            update(Item)
+            .where(or_(Item.category_id.is_(None), Item.category_id != category_id))
+            .values(category_id=category_id, updated_at=Item.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -0,0 +1,50 @@
+# backend/app/services/idempotency_cache.py
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import settings
+from app.schemas import BillResponse
+
+class IdempotencyCache:
+    """Bounded LRU of bill responses keyed by the client's Idempotency-Key.
+    
+    Only committed bills are stored, so a hit can be replayed as is. The
+    unique idempotency_key column on bills stays the source of truth for
+    keys that were evicted or created by another worker process.
+    """
+    
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._responses: "OrderedDict[str, BillResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[BillResponse]:
+        """Return the stored response for a key, marking it recently used"""
+        with self._lock:
+            response = self._responses.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return response
+    
+    def put(self, key: str, response: BillResponse) -> None:
+        """Store a committed bill's response, evicting the oldest if full"""
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+    
+    def discard(self, key: Optional[str]) -> None:
+        """Forget a key, e.g. after its bill was edited"""
+        if not key:
+            return
+        with self._lock:
+            self._responses.pop(key, None)
+
+idempotency_cache = IdempotencyCache(settings.IDEMPOTENCY_CACHE_SIZE)
@@ -1,12 +1,34 @@
 # backend/app/services/inventory_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Optional
+from sqlalchemy import case, update
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from app.models import Item
+from app.schemas import ExpiringLot, ItemResponse
+from app.services.catalog_cache import CatalogEntry, catalog_cache
+from app.services.item_search_index import item_search_index
+from app.services.stock_journal import StockJournal
+from app.services.stock_valuation_service import StockValuationService
+from app.services.low_stock_watchlist import LowStockWatchlist
+from app.services.lot_service import LotService
+
+class InsufficientStockError(ValueError):
+    """Raised when a stock update would take one or more items below zero"""
+    
+    def __init__(self, items: List[dict], failed_ids: List[int]):
+        self.items = items
+        found = {item["item_id"] for item in items}
+        self.missing = [item_id for item_id in failed_ids if item_id not in found]
+        super().__init__("; ".join(
+            [f"Insufficient stock for {item['item_code']}. Available: {item['available']}" for item in items]
+            + [f"Item not found: {item_id}" for item_id in self.missing]
+        ))
 
 class InventoryService:
+    STOCK_CHUNK_SIZE = 500
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -16,83 +38,147 @@ class InventoryService:
         category: Optional[str] = None,
         in_stock_only: bool = False,
         limit: int = 10
-    ) -> List[Item]:
+    ) -> List[CatalogEntry]:
         """Search items by code, name, or barcode"""
-        search_query = self.db.query(Item).filter(Item.is_active == True)
-        
-        # Search in multiple fields
-        if query:
-            search_filter = or_(
-                Item.item_code.ilike(f"%{query}%"),
-                Item.name.ilike(f"%{query}%"),
-                Item.barcode.ilike(f"%{query}%")
+        if not in_stock_only:
+            return catalog_cache.get_items(
+                self.db, item_search_index.search(self.db, query, category, limit)
             )
-            search_query = search_query.filter(search_filter)
-        
-        # Apply filters
-        if category:
-            search_query = search_query.filter(Item.category == category)
-        if in_stock_only:
-            search_query = search_query.filter(Item.current_stock > 0)
         
-        # Order by relevance (exact matches first)
-        search_query = search_query.order_by(
-            Item.item_code == query,
-            Item.barcode == query,
-            Item.name
-        )
-        
-        return search_query.limit(limit).all()
+        # Stock changes too often to index; check it in ranked batches
+        item_ids = item_search_index.search(self.db, query, category)
+        items = []
+        batch_size = limit * 4
+        for start in range(0, len(item_ids), batch_size):
+            batch = catalog_cache.get_items(self.db, item_ids[start:start + batch_size])
+            items.extend(item for item in batch if item.current_stock > 0)
+            if len(items) >= limit:
+                break
+        return items[:limit]
     
-    def update_stock(self, item_id: int, quantity_change: float, reason: str) -> Item:
-        """Update item stock with validation"""
-        item = self.db.query(Item).filter(Item.id == item_id).first()
-        if not item:
-            raise ValueError("Item not found")
+    def apply_stock_changes(self, changes: Dict[int, float]) -> Dict[int, float]:
+        """Apply stock deltas with one conditional UPDATE per chunk, returning new balances.
         
-        new_stock = item.current_stock + quantity_change
-        if new_stock < 0:
-            raise ValueError(f"Insufficient stock. Available: {item.current_stock}")
+        Rows whose stock would go negative are left untouched by the
+        statement itself; if any item fails, InsufficientStockError lists
+        the failed items and the caller must roll back the transaction (or
+        its savepoint) to undo the rows that did move.
+        """
+        changes = {item_id: delta for item_id, delta in changes.items() if delta}
+        if not changes:
+            return {}
         
-        item.current_stock = new_stock
-        item.updated_at = datetime.utcnow()
+        items = Item.__table__
+        now = datetime.utcnow()
+        valuation = StockValuationService(self.db)
+        watchlist = LowStockWatchlist(self.db)
+        balances = {}
+        item_ids = list(changes)
+        for start in range(0, len(item_ids), self.STOCK_CHUNK_SIZE):
+            chunk = item_ids[start:start + self.STOCK_CHUNK_SIZE]
+            delta = case({item_id: changes[item_id] for item_id in chunk}, value=items.c.id)
+            result = self.db.execute(
+                update(items)
+                .where(items.c.id.in_(chunk), items.c.current_stock + delta >= 0)
+                .values(current_stock=items.c.current_stock + delta, updated_at=now)
+                .returning(
+                    items.c.id, items.c.current_stock, items.c.category, items.c.purchase_price,
+                    items.c.selling_price, items.c.min_stock_alert, items.c.is_active
+                )
+            )
+            rows = result.all()
+            balances.update((row.id, row.current_stock) for row in rows)
+            valuation.stock_moved(rows, changes)
+            watchlist.stock_moved(rows, changes)
         
-        # TODO: Add stock movement logging here
-        
-        self.db.commit()
-        self.db.refresh(item)
+        failed = [item_id for item_id in item_ids if item_id not in balances]
+        if failed:
+            raise InsufficientStockError([
+                {
+                    "item_id": row.id,
+                    "item_code": row.item_code,
+                    "available": row.current_stock,
+                    "quantity_change": changes[row.id]
+                }
+                for row in self.db.query(Item.id, Item.item_code, Item.current_stock)
+                .filter(Item.id.in_(failed))
+            ], failed)
         
+        catalog_cache.invalidate_stock_on_commit(self.db, balances)
+        return balances
+    
+    def adjust_stocks(
+        self,
+        changes: Dict[int, float],
+        reason: str,
+        bill_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> Dict[int, float]:
+        """Apply stock deltas, journal them and draw decreases from lots without committing"""
+        balances = self.apply_stock_changes(changes)
+        now = datetime.utcnow()
+        StockJournal(self.db).record([
+            StockJournal.movement(item_id, changes[item_id], balance, reason, bill_id, user_id, now)
+            for item_id, balance in balances.items()
+        ])
+        # Sales, write-offs and corrections alike leave lots first-expiry-first-out
+        LotService(self.db).allocate({item_id: -delta for item_id, delta in changes.items() if delta < 0})
+        return balances
+    
+    def adjust_stock(
+        self,
+        item: Item,
+        quantity_change: float,
+        reason: str,
+        bill_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> Item:
+        """Apply a stock change to a loaded item without committing"""
+        balances = self.adjust_stocks({item.id: quantity_change}, reason, bill_id, user_id)
+        if item.id in balances:
+            set_committed_value(item, "current_stock", balances[item.id])
         return item
     
-    def get_stock_value(self) -> dict:
-        """Calculate total stock value"""
-        items = self.db.query(Item).filter(Item.is_active == True).all()
+    def update_stock(
+        self, item_id: int, quantity_change: float, reason: str, user_id: Optional[int] = None
+    ) -> float:
+        """Update item stock with validation, returning the new stock"""
+        if not quantity_change:
+            stock = self.db.query(Item.current_stock).filter(Item.id == item_id).scalar()
+            if stock is None:
+                raise ValueError("Item not found")
+            return stock
         
-        total_purchase_value = sum(
-            item.current_stock * (item.purchase_price or 0) for item in items
-        )
-        total_selling_value = sum(
-            item.current_stock * item.selling_price for item in items
-        )
+        try:
+            balances = self.adjust_stocks({item_id: quantity_change}, reason, user_id=user_id)
+        except InsufficientStockError as e:
+            if e.missing:
+                raise ValueError("Item not found")
+            raise
         
-        return {
-            "total_items": len(items),
-            "total_purchase_value": total_purchase_value,
-            "total_selling_value": total_selling_value,
-            "potential_profit": total_selling_value - total_purchase_value
-        }
+        self.db.commit()
+        return balances[item_id]
     
-    def check_expiry_alerts(self, days_ahead: int = 30) -> List[Item]:
-        """Get items expiring within specified days"""
-        from datetime import date, timedelta
-        
-        expiry_date = date.today() + timedelta(days=days_ahead)
-        
-        items = self.db.query(Item).filter(
-            Item.expiry_date <= expiry_date,
-            Item.expiry_date >= date.today(),
-            Item.is_active == True
-        ).all()
-        
-        return items
+    def get_stock_value(self, category_id: Optional[int] = None) -> dict:
+        """Get stock value totals from the running valuation"""
+        return StockValuationService(self.db).get_totals(category_id)
     
+    def check_expiry_alerts(self, days_ahead: int = 30) -> List[ExpiringLot]:
+        """Get items with lots in stock expiring within specified days, one row per lot"""
+        lots = LotService(self.db).get_expiring(days_ahead)
+        items = {
+            item.id: ItemResponse.model_validate(item).model_dump()
+            for item in self.db.query(Item).filter(Item.id.in_({lot.item_id for lot in lots}))
+        }
+        return [
+            ExpiringLot(**{
+                **items[lot.item_id],
+                "item_id": lot.item_id,
+                "lot_id": lot.id,
+                "batch_no": lot.batch_no,
+                "expiry_date": lot.expiry_date,
+                "quantity": lot.quantity,
+                "bill_id": lot.bill_id
+            })
+            for lot in lots
+        ]
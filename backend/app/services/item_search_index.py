@@ -0,0 +1,199 @@
+# backend/app/services/item_search_index.py
+import heapq
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Item
+from app.services.catalog_cache import catalog_cache
+
+class ItemSearchIndex:
+    """In-memory trigram and word-prefix index of active items for typeahead.
+    
+    Word prefixes of code, barcode and name are looked up in a sorted
+    word list; queries of three or more characters also intersect trigram
+    postings and check them as substrings, like the ILIKE search they
+    replace. Shorter queries have no trigrams and scan every item for
+    substrings instead, with their results cached. Results rank exact
+    code/barcode, then prefix, then substring matches. The index is built
+    on first use; items invalidated in the catalog cache are re-read
+    before the next search.
+    """
+    
+    GRAM = 3
+    REBUILD_THRESHOLD = 500
+    WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+    
+    # Ranks, best first
+    RANK_EXACT = 0
+    RANK_CODE_PREFIX = 1
+    RANK_NAME_PREFIX = 2
+    RANK_WORD_PREFIX = 3
+    RANK_SUBSTRING = 4
+    
+    def __init__(self):
+        # item id -> (code, name, barcode, category), text fields lowercased
+        self._docs: Dict[int, Tuple[str, str, str, Optional[str]]] = {}
+        self._grams: Dict[str, Set[int]] = {}
+        self._words: List[Tuple[str, int, int]] = []
+        self._dirty: Set[int] = set()
+        # Ranked results of one- and two-character queries, which match
+        # large parts of the catalog; dropped whenever the index changes
+        self._short_results: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def grams(cls, text: str) -> Set[str]:
+        return {text[i:i + cls.GRAM] for i in range(len(text) - cls.GRAM + 1)}
+    
+    @classmethod
+    def words(cls, code: str, name: str, barcode: str) -> Set[Tuple[str, int]]:
+        """Indexed words with the rank of a prefix match on them"""
+        words = {(word, cls.RANK_CODE_PREFIX) for word in (code, barcode) if word}
+        for position, word in enumerate(word for word in cls.WORD_SPLIT.split(name) if word):
+            words.add((word, cls.RANK_NAME_PREFIX if position == 0 else cls.RANK_WORD_PREFIX))
+        return words
+    
+    def _add(
+        self, item_id: int, item_code: str, name: str, barcode: Optional[str], category: Optional[str],
+        keep_sorted: bool = True
+    ) -> None:
+        """Index an item; without keep_sorted its words are appended and the caller sorts the list once"""
+        doc = (item_code.lower(), name.lower(), (barcode or "").lower(), category)
+        self._docs[item_id] = doc
+        for gram in self.grams(doc[0]) | self.grams(doc[1]) | self.grams(doc[2]):
+            self._grams.setdefault(gram, set()).add(item_id)
+        for word, rank in self.words(*doc[:3]):
+            if keep_sorted:
+                insort(self._words, (word, item_id, rank))
+            else:
+                self._words.append((word, item_id, rank))
+    
+    def _remove(self, item_id: int) -> None:
+        doc = self._docs.pop(item_id, None)
+        if doc is None:
+            return
+        for gram in self.grams(doc[0]) | self.grams(doc[1]) | self.grams(doc[2]):
+            postings = self._grams.get(gram)
+            if postings is not None:
+                postings.discard(item_id)
+                if not postings:
+                    del self._grams[gram]
+        for word, rank in self.words(*doc[:3]):
+            position = bisect_left(self._words, (word, item_id, rank))
+            if position < len(self._words) and self._words[position] == (word, item_id, rank):
+                del self._words[position]
+    
+    def mark_dirty(self, item_ids: Iterable[int]) -> None:
+        """Queue items to be re-read before the next search"""
+        with self._lock:
+            self._dirty.update(item_ids)
+    
+    def _refresh(self, db: Session) -> None:
+        with self._lock:
+            loaded = self._loaded
+            dirty = self._dirty
+            self._dirty = set()
+        if loaded and not dirty:
+            return
+        if len(dirty) > self.REBUILD_THRESHOLD:
+            # e.g. after a catalog import; reloading everything is cheaper
+            loaded = False
+        
+        columns = (Item.id, Item.item_code, Item.name, Item.barcode, Item.category)
+        query = db.query(*columns).filter(Item.is_active == True)
+        if loaded:
+            query = query.filter(Item.id.in_(dirty))
+        rows = query.all()
+        
+        with self._lock:
+            self._short_results.clear()
+            if not loaded:
+                # Inserting each word in order would make a full build quadratic
+                self._docs.clear()
+                self._grams.clear()
+                self._words.clear()
+                for row in rows:
+                    self._add(*row, keep_sorted=False)
+                self._words.sort()
+                self._loaded = True
+                return
+            for item_id in dirty:
+                self._remove(item_id)
+            for row in rows:
+                self._remove(row.id)
+                self._add(*row)
+    
+    def _match(self, query: str) -> Dict[int, int]:
+        """Map matching item ids to their rank"""
+        ranks = {}
+        position = bisect_left(self._words, (query,))
+        while position < len(self._words) and self._words[position][0].startswith(query):
+            word, item_id, rank = self._words[position]
+            if word == query and rank == self.RANK_CODE_PREFIX:
+                rank = self.RANK_EXACT
+            ranks[item_id] = min(rank, ranks.get(item_id, rank))
+            position += 1
+        
+        if len(query) >= self.GRAM:
+            postings = sorted(
+                (self._grams.get(gram, set()) for gram in self.grams(query)), key=len
+            )
+            for item_id in set(postings[0]).intersection(*postings[1:]):
+                if item_id in ranks:
+                    continue
+                code, name, barcode, _ = self._docs[item_id]
+                if name.startswith(query):
+                    ranks[item_id] = self.RANK_NAME_PREFIX
+                elif query in name or query in code or query in barcode:
+                    ranks[item_id] = self.RANK_SUBSTRING
+        else:
+            for item_id, (code, name, barcode, _) in self._docs.items():
+                if item_id not in ranks and (query in name or query in code or query in barcode):
+                    ranks[item_id] = self.RANK_SUBSTRING
+        return ranks
+    
+    def search(
+        self, db: Session, query: str, category: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[int]:
+        """Return ids of matching active items, best matches first"""
+        self._refresh(db)
+        query = query.strip().lower()
+        
+        with self._lock:
+            cached = self._short_results.get((query, category))
+            if cached is not None:
+                return cached if limit is None else cached[:limit]
+            
+            if query:
+                ranks = self._match(query)
+            else:
+                ranks = dict.fromkeys(self._docs, self.RANK_SUBSTRING)
+            if category:
+                ranks = {
+                    item_id: rank for item_id, rank in ranks.items()
+                    if self._docs[item_id][3] == category
+                }
+            
+            def key(item_id: int) -> Tuple[int, str, int]:
+                return ranks[item_id], self._docs[item_id][1], item_id
+            
+            if len(query) < self.GRAM:
+                self._short_results[(query, category)] = sorted(ranks, key=key)
+                return self._short_results[(query, category)][:limit]
+            if limit is None:
+                return sorted(ranks, key=key)
+            return heapq.nsmallest(limit, ranks, key=key)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._loaded = False
+            self._dirty.clear()
+            self._short_results.clear()
+
+item_search_index = ItemSearchIndex()
+catalog_cache.add_listener(item_search_index.mark_dirty)
@@ -0,0 +1,328 @@
+# backend/app/services/item_transfer_service.py
+import csv
+import io
+import tempfile
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, insert, update
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.database import SessionLocal
+from app.models import Item
+from app.utils.validators import (
+    validate_item_code, validate_barcode, validate_price, validate_percentage
+)
+from app.services.catalog_cache import catalog_cache
+from app.services.category_service import CategoryService
+from app.services.inventory_service import InventoryService
+from app.services.stock_journal import StockJournal
+from app.services.stock_valuation_service import StockValuationService
+from app.services.low_stock_watchlist import LowStockWatchlist
+from app.services.lot_service import LotService
+
+# Columns of import and export files, in export order
+ITEM_COLUMNS = [
+    "item_code", "barcode", "name", "category", "size", "unit",
+    "purchase_price", "selling_price", "mrp", "gst_percentage",
+    "current_stock", "min_stock_alert", "expiry_date", "is_active"
+]
+TEXT_COLUMNS = {"item_code", "barcode", "name", "category", "size", "unit"}
+NUMBER_COLUMNS = {
+    "purchase_price", "selling_price", "mrp", "gst_percentage", "current_stock", "min_stock_alert"
+}
+NEW_ITEM_DEFAULTS = {"gst_percentage": 0, "current_stock": 0, "is_active": True}
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def load_openpyxl():
+    """Import openpyxl, which is only needed for XLSX files"""
+    try:
+        import openpyxl
+    except ImportError:
+        raise ValueError("XLSX files need the openpyxl package; use CSV or install openpyxl")
+    return openpyxl
+
+def normalize_header(name: Any) -> str:
+    return str(name or "").strip().lower().replace(" ", "_")
+
+def read_csv_rows(file: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Yield CSV rows one at a time, keyed by normalized header"""
+    reader = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    header = [normalize_header(name) for name in next(reader, [])]
+    for values in reader:
+        if any(values):
+            yield dict(zip(header, values))
+
+def read_xlsx_rows(file: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Yield rows of the first worksheet one at a time, keyed by normalized header"""
+    openpyxl = load_openpyxl()
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [normalize_header(name) for name in next(rows, ())]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+def read_item_rows(file: BinaryIO, filename: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """Pick the reader for an uploaded file by its extension"""
+    if (filename or "").lower().endswith(".xlsx"):
+        return read_xlsx_rows(file)
+    return read_csv_rows(file)
+
+class ItemTransferService:
+    """Bulk import and export of the item catalog"""
+    
+    CHUNK_SIZE = 1000
+    MAX_REPORTED_ERRORS = 1000
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @staticmethod
+    def parse_value(column: str, raw: Any) -> Any:
+        if column in TEXT_COLUMNS:
+            # Spreadsheets hand numeric codes and barcodes back as numbers
+            if isinstance(raw, float) and raw.is_integer():
+                raw = int(raw)
+            return str(raw).strip()
+        if column in NUMBER_COLUMNS:
+            return float(raw)
+        if column == "expiry_date":
+            if isinstance(raw, datetime):
+                return raw.date()
+            if isinstance(raw, date):
+                return raw
+            return date.fromisoformat(str(raw).strip())
+        if column == "is_active":
+            if isinstance(raw, bool):
+                return raw
+            return str(raw).strip().lower() in ("1", "true", "yes", "y")
+        return raw
+    
+    def parse_row(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """Convert and validate one file row; blank cells are left out"""
+        values = {}
+        errors = []
+        for column, raw in row.items():
+            if column not in ITEM_COLUMNS or raw is None or str(raw).strip() == "":
+                continue
+            try:
+                values[column] = self.parse_value(column, raw)
+            except (TypeError, ValueError):
+                errors.append(f"Invalid {column}: {raw}")
+        
+        if not validate_item_code(values.get("item_code", "")):
+            errors.append("Item code must be 3-50 letters or digits")
+        if not validate_barcode(values.get("barcode", "")):
+            errors.append("Invalid barcode")
+        if len(values.get("name", "")) > 200:
+            errors.append("Name is longer than 200 characters")
+        for column in NUMBER_COLUMNS - {"gst_percentage"}:
+            if column in values and not validate_price(values[column]):
+                errors.append(f"{column} cannot be negative")
+        if "gst_percentage" in values and not validate_percentage(values["gst_percentage"]):
+            errors.append("gst_percentage must be between 0 and 100")
+        return values, errors
+    
+    def import_rows(self, rows: Iterable[Dict[str, Any]], user_id: int) -> Dict[str, Any]:
+        """Validate rows as they stream in and upsert them by item_code in committed chunks"""
+        report = {"rows": 0, "created": 0, "updated": 0, "failed": 0, "errors": []}
+        chunk = []
+        # Row 1 of the file is the header
+        for row_number, row in enumerate(rows, start=2):
+            report["rows"] += 1
+            values, errors = self.parse_row(row)
+            if errors:
+                self._report_error(report, row_number, values.get("item_code"), errors)
+                continue
+            chunk.append((row_number, values))
+            if len(chunk) >= self.CHUNK_SIZE:
+                self._import_chunk(chunk, report, user_id)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk, report, user_id)
+        
+        report["errors_truncated"] = report["failed"] > len(report["errors"])
+        return report
+    
+    def _report_error(
+        self, report: Dict[str, Any], row_number: int, item_code: Optional[str], errors: List[str]
+    ) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < self.MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": row_number, "item_code": item_code, "errors": errors})
+    
+    def _import_chunk(
+        self, chunk: List[Tuple[int, Dict[str, Any]]], report: Dict[str, Any], user_id: int
+    ) -> None:
+        # Later rows for the same code win
+        rows_by_code = {}
+        for row_number, values in chunk:
+            rows_by_code[values["item_code"]] = (row_number, values)
+        existing = {
+            row.item_code: row
+            for row in self.db.query(*Item.__table__.columns).filter(Item.item_code.in_(rows_by_code))
+        }
+        
+        now = datetime.utcnow()
+        new_rows = []
+        updates = {}
+        valuation_changes = []
+        stock_changes = {}
+        counts = {"created": 0, "updated": 0}
+        accepted = []
+        for code, (row_number, values) in rows_by_code.items():
+            current = existing.get(code)
+            merged = {**(current._mapping if current else NEW_ITEM_DEFAULTS), **values}
+            missing = [column for column in ("name", "selling_price", "mrp") if merged.get(column) is None]
+            if missing:
+                self._report_error(report, row_number, code, [f"{', '.join(missing)} required for new items"])
+                continue
+            if merged["selling_price"] > merged["mrp"]:
+                self._report_error(report, row_number, code, ["Selling price cannot be greater than MRP"])
+                continue
+            
+            accepted.append((row_number, code))
+            if current is None:
+                new_rows.append({
+                    **{column: merged.get(column) for column in ITEM_COLUMNS},
+                    "created_at": now
+                })
+                counts["created"] += 1
+                continue
+            
+            # Columns are updated as given; stock moves through the journal
+            fields = {
+                column: value for column, value in values.items()
+                if column not in ("item_code", "current_stock")
+            }
+            if fields:
+                updates.setdefault(tuple(sorted(fields)), []).append(dict(fields, item_id=current.id))
+                valuation_changes.append((current, SimpleNamespace(**{**current._mapping, **fields})))
+            if "current_stock" in values and values["current_stock"] != current.current_stock:
+                stock_changes[current.id] = values["current_stock"] - (current.current_stock or 0)
+            counts["updated"] += 1
+        
+        try:
+            category_ids = CategoryService(self.db).resolve(
+                [row["category"] for row in new_rows]
+                + [fields["category"] for params in updates.values() for fields in params if "category" in fields]
+            )
+            for row in new_rows:
+                row["category_id"] = category_ids[row["category"] or ""]
+            
+            items = Item.__table__
+            for columns, params in updates.items():
+                if "category" in columns:
+                    columns += ("category_id",)
+                    for fields in params:
+                        fields["category_id"] = category_ids[fields["category"]]
+                self.db.execute(
+                    update(items)
+                    .where(items.c.id == bindparam("item_id"))
+                    .values(updated_at=now, **{column: bindparam(column) for column in columns}),
+                    params
+                )
+            
+            created = []
+            if new_rows:
+                created = self.db.execute(
+                    insert(Item).returning(Item.id, Item.current_stock, sort_by_parameter_order=True),
+                    new_rows
+                ).all()
+                StockJournal(self.db).record([
+                    StockJournal.movement(
+                        row.id, row.current_stock, row.current_stock, "Opening stock", created_by=user_id
+                    )
+                    for row in created if row.current_stock
+                ])
+                LotService(self.db).receive([
+                    {"item_id": row.id, "quantity": row.current_stock, "expiry_date": values["expiry_date"]}
+                    for row, values in zip(created, new_rows) if row.current_stock and values["expiry_date"]
+                ])
+            
+            valuation = StockValuationService(self.db)
+            valuation.items_changed(
+                valuation_changes + [(None, SimpleNamespace(**row)) for row in new_rows]
+            )
+            if stock_changes:
+                InventoryService(self.db).adjust_stocks(stock_changes, "Catalog import", user_id=user_id)
+            
+            item_ids = [row.id for row in created] + [current.id for current in existing.values()]
+            LowStockWatchlist(self.db).refresh(item_ids)
+            catalog_cache.invalidate_on_commit(self.db, item_ids)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            counts = {"created": 0, "updated": 0}
+            for row_number, code in accepted:
+                self._report_error(report, row_number, code, [f"Not saved: {e}"])
+        
+        report["created"] += counts["created"]
+        report["updated"] += counts["updated"]
+    
+    def iter_rows(
+        self, category: Optional[str] = None, active_only: bool = True
+    ) -> Iterator[List[Any]]:
+        """Yield catalog rows in id order, fetching a chunk at a time"""
+        columns = [getattr(Item, column) for column in ITEM_COLUMNS]
+        category_id = CategoryService(self.db).filter_id(name=category)
+        last_id = 0
+        while True:
+            query = self.db.query(Item.id, *columns).filter(Item.id > last_id)
+            if category_id is not None:
+                query = query.filter(Item.category_id == category_id)
+            if active_only:
+                query = query.filter(Item.is_active == True)
+            rows = query.order_by(Item.id).limit(self.CHUNK_SIZE).all()
+            if not rows:
+                return
+            for row in rows:
+                yield list(row[1:])
+            last_id = rows[-1].id
+    
+    @staticmethod
+    def export_csv(category: Optional[str] = None, active_only: bool = True) -> Iterator[str]:
+        """Stream the catalog as CSV text; opens its own session as it outlives the request"""
+        db = SessionLocal()
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(ITEM_COLUMNS)
+            for row in ItemTransferService(db).iter_rows(category, active_only):
+                writer.writerow(row)
+                if buffer.tell() > 65536:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def export_xlsx(category: Optional[str] = None, active_only: bool = True) -> Iterator[bytes]:
+        """Stream the catalog as an XLSX workbook built in write-only mode"""
+        openpyxl = load_openpyxl()
+        db = SessionLocal()
+        try:
+            workbook = openpyxl.Workbook(write_only=True)
+            sheet = workbook.create_sheet("Items")
+            sheet.append(ITEM_COLUMNS)
+            for row in ItemTransferService(db).iter_rows(category, active_only):
+                sheet.append(row)
+        finally:
+            db.close()
+        
+        # A zip archive can only be finished once every row is written
+        with tempfile.TemporaryFile() as output:
+            workbook.save(output)
+            output.seek(0)
+            while True:
+                data = output.read(65536)
+                if not data:
+                    return
+                yield data
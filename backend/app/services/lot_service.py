@@ -0,0 +1,164 @@
+# backend/app/services/lot_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, func, insert, literal, literal_column, select, update
+from sqlalchemy.engine import Engine
+from typing import Any, Dict, Iterable, List, Optional
+from datetime import date, datetime, timedelta
+
+from app.models import Item, ItemLot
+
+# Spelled as a literal so SQLite matches it to the partial lot indexes
+LOT_IS_OPEN = ItemLot.quantity > literal_column("0")
+
+class LotService:
+    """Batches of an item's stock, each with its own quantity and expiry.
+    
+    Purchases bring lots in and sales draw them down first-expiry-first-out.
+    Items.current_stock stays the stock of record; stock received before
+    lots were tracked is simply not allocated to any lot.
+    """
+    
+    CHUNK_SIZE = 500
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def receive(self, lots: Iterable[Dict[str, Any]]) -> None:
+        """Add lots (item_id, quantity, batch_no, expiry_date, bill_id) without committing"""
+        now = datetime.utcnow()
+        rows = [
+            {
+                "item_id": lot["item_id"],
+                "batch_no": lot.get("batch_no"),
+                "expiry_date": lot.get("expiry_date"),
+                "received_quantity": lot["quantity"],
+                "quantity": lot["quantity"],
+                "bill_id": lot.get("bill_id"),
+                "created_at": now
+            }
+            for lot in lots if lot["quantity"] > 0
+        ]
+        if rows:
+            self.db.execute(insert(ItemLot), rows)
+    
+    def allocate(self, quantities: Dict[int, float]) -> Dict[int, float]:
+        """Draw sold quantities from lots, earliest expiry first, without committing.
+        
+        One SELECT per chunk of items reads their open lots in FEFO order
+        and one executemany UPDATE writes back every draw. Returns the
+        quantity per item that no lot covered.
+        """
+        remaining = {item_id: quantity for item_id, quantity in quantities.items() if quantity > 0}
+        item_ids = list(remaining)
+        draws = []
+        for start in range(0, len(item_ids), self.CHUNK_SIZE):
+            chunk = item_ids[start:start + self.CHUNK_SIZE]
+            lots = self.db.query(ItemLot.id, ItemLot.item_id, ItemLot.quantity).filter(
+                ItemLot.item_id.in_(chunk), LOT_IS_OPEN
+            ).order_by(ItemLot.item_id, ItemLot.expiry_date.asc().nulls_last(), ItemLot.id)
+            for lot in lots:
+                needed = remaining[lot.item_id]
+                if needed <= 0:
+                    continue
+                taken = min(needed, lot.quantity)
+                remaining[lot.item_id] = round(needed - taken, 3)
+                draws.append({"lot_id": lot.id, "taken": taken})
+        
+        if draws:
+            lots = ItemLot.__table__
+            self.db.execute(
+                update(lots)
+                .where(lots.c.id == bindparam("lot_id"))
+                .values(quantity=func.round(lots.c.quantity - bindparam("taken"), 3)),
+                draws
+            )
+        return {item_id: quantity for item_id, quantity in remaining.items() if quantity > 0}
+    
+    def trim_to_stock(self, item_ids: Iterable[int]) -> Dict[int, float]:
+        """Draw down open lots that hold more than their item's stock, e.g. after stock was reset"""
+        item_ids = list(item_ids)
+        excess = {}
+        for start in range(0, len(item_ids), self.CHUNK_SIZE):
+            chunk = item_ids[start:start + self.CHUNK_SIZE]
+            rows = self.db.query(
+                ItemLot.item_id, func.sum(ItemLot.quantity) - func.max(func.coalesce(Item.current_stock, 0), 0)
+            ).join(Item, Item.id == ItemLot.item_id).filter(
+                ItemLot.item_id.in_(chunk), LOT_IS_OPEN
+            ).group_by(ItemLot.item_id)
+            excess.update((item_id, round(quantity, 3)) for item_id, quantity in rows if quantity > 0)
+        self.allocate(excess)
+        return excess
+    
+    def add_lot(
+        self,
+        item_id: int,
+        quantity: float,
+        batch_no: Optional[str] = None,
+        expiry_date: Optional[date] = None
+    ) -> ItemLot:
+        """Put part of an item's stock that no lot covers yet into a new lot"""
+        stock = self.db.query(Item.current_stock).filter(Item.id == item_id).scalar()
+        if stock is None:
+            raise ValueError("Item not found")
+        in_lots = self.db.query(func.coalesce(func.sum(ItemLot.quantity), 0)).filter(
+            ItemLot.item_id == item_id, LOT_IS_OPEN
+        ).scalar()
+        if quantity > (stock or 0) - in_lots:
+            raise ValueError(f"Only {max((stock or 0) - in_lots, 0)} of the stock is not in a lot")
+        
+        lot = ItemLot(
+            item_id=item_id,
+            batch_no=batch_no,
+            expiry_date=expiry_date,
+            received_quantity=quantity,
+            quantity=quantity,
+            created_at=datetime.utcnow()
+        )
+        self.db.add(lot)
+        self.db.commit()
+        self.db.refresh(lot)
+        return lot
+    
+    def get_lots(self, item_id: int, include_empty: bool = False) -> List[ItemLot]:
+        """Get an item's lots in FEFO order"""
+        query = self.db.query(ItemLot).filter(ItemLot.item_id == item_id)
+        if not include_empty:
+            query = query.filter(LOT_IS_OPEN)
+        return query.order_by(ItemLot.expiry_date.asc().nulls_last(), ItemLot.id).all()
+    
+    def get_expiring(self, days_ahead: int = 30, include_expired: bool = False) -> List[Any]:
+        """Get lots in stock expiring within the given days, soonest first"""
+        today = date.today()
+        query = (
+            self.db.query(
+                ItemLot.id,
+                ItemLot.item_id,
+                Item.item_code,
+                Item.name,
+                ItemLot.batch_no,
+                ItemLot.expiry_date,
+                ItemLot.quantity,
+                ItemLot.bill_id
+            )
+            .join(Item, Item.id == ItemLot.item_id)
+            .filter(LOT_IS_OPEN, ItemLot.expiry_date <= today + timedelta(days=days_ahead))
+            .filter(Item.is_active == True)
+        )
+        if not include_expired:
+            query = query.filter(ItemLot.expiry_date >= today)
+        return query.order_by(ItemLot.expiry_date, ItemLot.item_id).all()
+    
+    @staticmethod
+    def ensure_lots(engine: Engine) -> None:
+        """Open one lot per item from the single expiry date items carried before lots existed"""
+        with Session(engine) as db:
+            if db.query(ItemLot.id).first() is not None:
+                return
+            db.execute(insert(ItemLot).from_select(
+                ["item_id", "expiry_date", "received_quantity", "quantity", "created_at"],
+                select(
+                    Item.id, Item.expiry_date, Item.current_stock, Item.current_stock,
+                    literal(datetime.utcnow())
+                ).where(Item.expiry_date.is_not(None), Item.current_stock > 0)
+            ))
+            db.commit()
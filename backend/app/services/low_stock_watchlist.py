@@ -0,0 +1,168 @@
+# backend/app/services/low_stock_watchlist.py
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from typing import Any, Iterable, List, Optional, Tuple
+from datetime import datetime
+
+from app.models import Item, LowStockItem, LowStockEvent
+
+class LowStockWatchlist:
+    """Materialized set of active items at or below their stock alert level.
+    
+    Stock updates work out from the new balance and the applied change
+    whether an item crossed its threshold, so keeping the set current
+    needs no extra reads. Items entering or leaving the set are appended
+    to low_stock_events, whose id is the sequence number clients poll the
+    change feed by; stock moves of items that stay low only update their
+    watchlist row.
+    """
+    
+    CHUNK_SIZE = 500
+    ENTERED = "entered"
+    UPDATED = "updated"
+    LEFT = "left"
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @staticmethod
+    def is_low(current_stock: Optional[float], min_stock_alert: Optional[float], is_active: bool) -> bool:
+        return (
+            bool(is_active)
+            and min_stock_alert is not None
+            and current_stock is not None
+            and current_stock <= min_stock_alert
+        )
+    
+    def stock_moved(self, rows: Iterable[Any], changes: dict) -> None:
+        """Track threshold crossings of updated item rows (id, current_stock, min_stock_alert, is_active)"""
+        events = []
+        for row in rows:
+            low = self.is_low(row.current_stock, row.min_stock_alert, row.is_active)
+            was_low = self.is_low(row.current_stock - changes[row.id], row.min_stock_alert, row.is_active)
+            if low or was_low:
+                event = self.UPDATED if low and was_low else self.ENTERED if low else self.LEFT
+                events.append((row.id, event, row.current_stock, row.min_stock_alert))
+        self._apply(events)
+    
+    def refresh(self, item_ids: Iterable[int]) -> None:
+        """Re-evaluate items after edits to their threshold, activation or stock"""
+        item_ids = list(item_ids)
+        events = []
+        for start in range(0, len(item_ids), self.CHUNK_SIZE):
+            chunk = item_ids[start:start + self.CHUNK_SIZE]
+            listed = {
+                row.item_id: row
+                for row in self.db.query(LowStockItem).filter(LowStockItem.item_id.in_(chunk))
+            }
+            for row in self.db.query(
+                Item.id, Item.current_stock, Item.min_stock_alert, Item.is_active
+            ).filter(Item.id.in_(chunk)):
+                low = self.is_low(row.current_stock, row.min_stock_alert, row.is_active)
+                entry = listed.get(row.id)
+                if low and entry is None:
+                    events.append((row.id, self.ENTERED, row.current_stock, row.min_stock_alert))
+                elif entry is not None and not low:
+                    events.append((row.id, self.LEFT, row.current_stock, row.min_stock_alert))
+                elif low and (entry.current_stock, entry.min_stock_alert) != (row.current_stock, row.min_stock_alert):
+                    events.append((row.id, self.UPDATED, row.current_stock, row.min_stock_alert))
+        self._apply(events)
+    
+    def _apply(self, events: List[Tuple[int, str, float, float]]) -> None:
+        if not events:
+            return
+        
+        now = datetime.utcnow()
+        listed = [
+            {
+                "item_id": item_id,
+                "current_stock": stock,
+                "min_stock_alert": min_alert,
+                "since": now,
+                "updated_at": now
+            }
+            for item_id, event, stock, min_alert in events if event != self.LEFT
+        ]
+        if listed:
+            stmt = sqlite_insert(LowStockItem)
+            self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[LowStockItem.item_id],
+                    set_={
+                        "current_stock": stmt.excluded.current_stock,
+                        "min_stock_alert": stmt.excluded.min_stock_alert,
+                        "updated_at": stmt.excluded.updated_at
+                    }
+                ),
+                listed
+            )
+        left = [item_id for item_id, event, _, _ in events if event == self.LEFT]
+        if left:
+            self.db.execute(delete(LowStockItem).where(LowStockItem.item_id.in_(left)))
+        
+        changes = [
+            {
+                "item_id": item_id,
+                "event": event,
+                "current_stock": stock,
+                "min_stock_alert": min_alert,
+                "created_at": now
+            }
+            for item_id, event, stock, min_alert in events if event != self.UPDATED
+        ]
+        if changes:
+            self.db.execute(insert(LowStockEvent), changes)
+    
+    def rebuild(self) -> None:
+        """Re-evaluate every item that is low or listed as low"""
+        item_ids = {
+            row.id for row in self.db.query(Item.id).filter(
+                Item.is_active == True,
+                Item.current_stock <= Item.min_stock_alert
+            )
+        }
+        item_ids.update(row.item_id for row in self.db.query(LowStockItem.item_id))
+        self.refresh(sorted(item_ids))
+        self.db.commit()
+    
+    def get_items(self, skip: int = 0, limit: int = 100) -> Tuple[List[Item], int]:
+        """Get a page of low-stock items with the size of the watchlist"""
+        total = self.db.query(LowStockItem).count()
+        items = (
+            self.db.query(Item)
+            .join(LowStockItem, LowStockItem.item_id == Item.id)
+            .order_by(LowStockItem.item_id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return items, total
+    
+    def get_changes(self, since: int = 0, limit: int = 500) -> List[Any]:
+        """Get watchlist changes after a sequence number, oldest first"""
+        return (
+            self.db.query(
+                LowStockEvent.id.label("seq"),
+                LowStockEvent.item_id,
+                Item.item_code,
+                Item.name,
+                LowStockEvent.event,
+                LowStockEvent.current_stock,
+                LowStockEvent.min_stock_alert,
+                LowStockEvent.created_at
+            )
+            .join(Item, Item.id == LowStockEvent.item_id)
+            .filter(LowStockEvent.id > since)
+            .order_by(LowStockEvent.id)
+            .limit(limit)
+            .all()
+        )
+    
+    @staticmethod
+    def ensure_watchlist(engine: Engine) -> None:
+        """Fill the watchlist once for items that were low before it existed"""
+        with Session(engine) as db:
+            if db.query(LowStockEvent.id).first() is None and db.query(Item.id).first() is not None:
+                LowStockWatchlist(db).rebuild()
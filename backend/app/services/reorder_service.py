@@ -0,0 +1,242 @@
+# backend/app/services/reorder_service.py
+import itertools
+import math
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from typing import Any, Dict, List, Optional
+from datetime import date, timedelta
+
+from app.models import Bill, BillItem, Item, Supplier
+
+class ReorderService:
+    """Reorder suggestions for the whole catalog from daily sales history.
+    
+    Sales are summed per item and day in SQL and loaded into flat NumPy
+    arrays; velocity, variability, days of cover and order quantities
+    are then computed for every item at once with array operations.
+    """
+    
+    CHUNK_SIZE = 500
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def load_sales(self, start: date) -> Dict[str, np.ndarray]:
+        """Load (day offset from start, item_id, quantity) of every sale line since start as arrays"""
+        bills = Bill.__table__
+        lines = BillItem.__table__
+        day = func.julianday(bills.c.created_at) - func.julianday(start.isoformat())
+        stmt = select(day, lines.c.item_id, lines.c.quantity).join_from(
+            bills, lines, lines.c.bill_id == bills.c.id
+        ).where(
+            bills.c.bill_type.in_(["sale_challan", "gst_invoice"]),
+            bills.c.created_at >= start
+        )
+        
+        # Core rows straight into a flat array; no ORM rows or per-line objects
+        result = self.db.connection().execute(stmt)
+        data = np.fromiter(itertools.chain.from_iterable(result), dtype=np.float64).reshape(-1, 3)
+        return {
+            "day": np.floor(data[:, 0]).astype(np.int64),
+            "item_id": data[:, 1].astype(np.int64),
+            "quantity": np.nan_to_num(data[:, 2])
+        }
+    
+    def load_catalog(self, category_id: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Load stock columns of active items as arrays ordered by item id"""
+        items = Item.__table__
+        stmt = select(
+            items.c.id,
+            func.coalesce(items.c.current_stock, 0),
+            func.coalesce(items.c.min_stock_alert, 0),
+            func.coalesce(items.c.purchase_price, 0)
+        ).where(items.c.is_active == True)
+        if category_id is not None:
+            stmt = stmt.where(items.c.category_id == category_id)
+        
+        result = self.db.connection().execute(stmt.order_by(items.c.id))
+        data = np.fromiter(itertools.chain.from_iterable(result), dtype=np.float64).reshape(-1, 4)
+        return {
+            "item_id": data[:, 0].astype(np.int64),
+            "current_stock": data[:, 1],
+            "min_stock_alert": data[:, 2],
+            "purchase_price": data[:, 3]
+        }
+    
+    def get_last_suppliers(self) -> Dict[int, int]:
+        """Map each item to the supplier of its most recent purchase line"""
+        last_lines = self.db.query(func.max(BillItem.id)).join(
+            Bill, BillItem.bill_id == Bill.id
+        ).filter(
+            Bill.bill_type == "purchase",
+            Bill.supplier_id.isnot(None)
+        ).group_by(BillItem.item_id)
+        rows = self.db.query(BillItem.item_id, Bill.supplier_id).join(
+            Bill, BillItem.bill_id == Bill.id
+        ).filter(BillItem.id.in_(last_lines))
+        return dict(rows.all())
+    
+    @staticmethod
+    def compute(
+        catalog: Dict[str, np.ndarray],
+        sales: Dict[str, np.ndarray],
+        history_days: int,
+        lead_time_days: float,
+        review_days: float,
+        halflife_days: float,
+        service_z: float
+    ) -> Dict[str, np.ndarray]:
+        """Compute velocity, cover and order quantities for every catalog item at once"""
+        item_ids = catalog["item_id"]
+        count = len(item_ids)
+        
+        # Place each sales row on its item's position; rows of items not in
+        # the catalog (inactive or filtered out) are dropped
+        position = np.searchsorted(item_ids, sales["item_id"])
+        known = position < count
+        known[known] = item_ids[position[known]] == sales["item_id"][known]
+        
+        # Sum lines into one quantity per item and day
+        day = np.clip(sales["day"][known], 0, history_days - 1)
+        keys, inverse = np.unique(position[known] * history_days + day, return_inverse=True)
+        quantity = np.bincount(inverse.ravel(), weights=sales["quantity"][known], minlength=len(keys))
+        position = keys // history_days
+        day = keys % history_days
+        age = (history_days - 1) - day  # 0 for today
+        
+        # Days each item has been selling, from its first sale in the window
+        first_day = np.full(count, history_days, dtype=np.int64)
+        np.minimum.at(first_day, position, day)
+        active_days = np.maximum(history_days - first_day, 1)
+        
+        # Exponentially weighted moving average of daily quantity; days
+        # without sales count as zeros, normalized over the active days
+        decay = 0.5 ** (1.0 / halflife_days)
+        weighted = np.bincount(position, weights=quantity * decay ** age, minlength=count)
+        weight_total = (1 - decay ** active_days) / (1 - decay)
+        velocity = weighted / weight_total
+        
+        def window_average(days: int) -> np.ndarray:
+            recent = age < days
+            total = np.bincount(position[recent], weights=quantity[recent], minlength=count)
+            return total / np.minimum(active_days, days)
+        
+        # Daily standard deviation over the active days, zero days included
+        total = np.bincount(position, weights=quantity, minlength=count)
+        squares = np.bincount(position, weights=quantity * quantity, minlength=count)
+        mean = total / active_days
+        deviation = np.sqrt(np.maximum(squares / active_days - mean * mean, 0))
+        
+        stock = catalog["current_stock"]
+        safety_stock = service_z * deviation * math.sqrt(lead_time_days)
+        reorder_point = np.maximum(velocity * lead_time_days + safety_stock, catalog["min_stock_alert"])
+        order_up_to = reorder_point + velocity * review_days
+        suggested = np.where(stock <= reorder_point, np.ceil(np.maximum(order_up_to - stock, 0)), 0)
+        
+        with np.errstate(divide="ignore"):
+            days_of_cover = np.where(velocity > 0, stock / velocity, np.inf)
+        
+        return {
+            "velocity": velocity,
+            "velocity_7d": window_average(7),
+            "velocity_28d": window_average(28),
+            "days_of_cover": days_of_cover,
+            "safety_stock": safety_stock,
+            "reorder_point": reorder_point,
+            "suggested_quantity": suggested,
+            "estimated_cost": suggested * catalog["purchase_price"]
+        }
+    
+    def get_suggestions(
+        self,
+        history_days: int = 365,
+        lead_time_days: float = 7,
+        review_days: float = 7,
+        halflife_days: float = 14,
+        service_z: float = 1.65,
+        category_id: Optional[int] = None,
+        supplier_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Suggest reorder quantities grouped by the supplier each item was last bought from"""
+        today = date.today()
+        start = today - timedelta(days=history_days - 1)
+        catalog = self.load_catalog(category_id)
+        results = self.compute(
+            catalog, self.load_sales(start), history_days,
+            lead_time_days, review_days, halflife_days, service_z
+        )
+        
+        selected = np.flatnonzero(results["suggested_quantity"] > 0)
+        suppliers = self.get_last_suppliers()
+        item_ids = catalog["item_id"][selected].tolist()
+        if supplier_id is not None:
+            keep = [index for index, item_id in enumerate(item_ids) if suppliers.get(item_id) == supplier_id]
+            selected = selected[keep]
+            item_ids = [item_ids[index] for index in keep]
+        
+        items = {}
+        for start_index in range(0, len(item_ids), self.CHUNK_SIZE):
+            chunk = item_ids[start_index:start_index + self.CHUNK_SIZE]
+            items.update(
+                (row.id, row)
+                for row in self.db.query(Item.id, Item.item_code, Item.name, Item.unit).filter(Item.id.in_(chunk))
+            )
+        supplier_names = dict(
+            self.db.query(Supplier.id, Supplier.name).filter(Supplier.id.in_(set(suppliers.values()))).all()
+        ) if suppliers else {}
+        
+        columns = {name: values[selected].tolist() for name, values in results.items()}
+        columns["current_stock"] = catalog["current_stock"][selected].tolist()
+        columns["min_stock_alert"] = catalog["min_stock_alert"][selected].tolist()
+        
+        groups = {}
+        for index, item_id in enumerate(item_ids):
+            item = items[item_id]
+            group_supplier = suppliers.get(item_id)
+            group = groups.setdefault(group_supplier, {
+                "supplier_id": group_supplier,
+                "supplier_name": supplier_names.get(group_supplier),
+                "item_count": 0,
+                "estimated_cost": 0.0,
+                "items": []
+            })
+            days_of_cover = columns["days_of_cover"][index]
+            group["items"].append({
+                "item_id": item_id,
+                "item_code": item.item_code,
+                "name": item.name,
+                "unit": item.unit,
+                "current_stock": columns["current_stock"][index],
+                "min_stock_alert": columns["min_stock_alert"][index],
+                "velocity": round(columns["velocity"][index], 3),
+                "velocity_7d": round(columns["velocity_7d"][index], 3),
+                "velocity_28d": round(columns["velocity_28d"][index], 3),
+                "days_of_cover": round(days_of_cover, 1) if math.isfinite(days_of_cover) else None,
+                "reorder_point": round(columns["reorder_point"][index], 3),
+                "suggested_quantity": columns["suggested_quantity"][index],
+                "estimated_cost": round(columns["estimated_cost"][index], 2)
+            })
+            group["item_count"] += 1
+            group["estimated_cost"] += columns["estimated_cost"][index]
+        
+        for group in groups.values():
+            group["estimated_cost"] = round(group["estimated_cost"], 2)
+            group["items"].sort(key=lambda line: line["days_of_cover"] if line["days_of_cover"] is not None else math.inf)
+        
+        return {
+            "as_of": today.isoformat(),
+            "parameters": {
+                "history_days": history_days,
+                "lead_time_days": lead_time_days,
+                "review_days": review_days,
+                "halflife_days": halflife_days,
+                "service_z": service_z
+            },
+            "items_evaluated": len(catalog["item_id"]),
+            "items_to_reorder": len(item_ids),
+            "suppliers": sorted(
+                groups.values(),
+                key=lambda group: (group["supplier_id"] is None, -group["estimated_cost"])
+            )
+        }
@@ -0,0 +1,167 @@
+# backend/app/services/report_cache.py
+import functools
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.catalog_cache import catalog_cache
+
+# Reports showing item names, categories or purchase prices
+ITEM_REPORTS = ("daily-sales", "item-wise", "profit-loss")
+
+class ReportEntry:
+    """A computed report and the days it covers"""
+    
+    def __init__(self, value: Any, first_day: date, last_day: date, expires_at: Optional[float]):
+        self.value = value
+        self.first_day = first_day
+        self.last_day = last_day
+        # None for reports of closed days, which only change through invalidation
+        self.expires_at = expires_at
+
+class ReportCache:
+    """Bounded LRU of report results keyed by report type and arguments.
+    
+    Reports that end before today are kept until a bill write touches one of
+    their days; reports covering today expire after a short TTL instead of
+    being dropped by every new sale. Invalidations are queued on the session
+    and applied after it commits. Each worker process has its own cache.
+    """
+    
+    def __init__(self, max_entries: int = 512, ttl_seconds: int = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, ReportEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so a report computed across one is not stored
+        self._generation = 0
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+    
+    @staticmethod
+    def _day(value: date) -> date:
+        return value.date() if isinstance(value, datetime) else value
+    
+    def get_or_compute(self, report: str, args: Tuple, first_day: date, last_day: date, compute: Callable[[], Any]) -> Any:
+        """Return the cached report for these arguments, computing and storing it on a miss"""
+        key = (report, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits[report] = self.hits.get(report, 0) + 1
+                return entry.value
+            self.misses[report] = self.misses.get(report, 0) + 1
+            generation = self._generation
+        
+        value = compute()
+        first_day, last_day = self._day(first_day), self._day(last_day)
+        expires_at = time.monotonic() + self.ttl_seconds if last_day >= date.today() else None
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = ReportEntry(value, first_day, last_day, expires_at)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+    
+    def invalidate_days(self, days: Iterable[date]) -> None:
+        """Drop every report whose range covers one of these days"""
+        days = set(days)
+        if not days:
+            return
+        with self._lock:
+            self._generation += 1
+            for key in [
+                key for key, entry in self._entries.items()
+                if any(entry.first_day <= day <= entry.last_day for day in days)
+            ]:
+                del self._entries[key]
+    
+    def invalidate_reports(self, reports: Iterable[str]) -> None:
+        """Drop every cached result of these report types"""
+        reports = set(reports)
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key[0] in reports]:
+                del self._entries[key]
+    
+    def invalidate_days_on_commit(self, db: Session, days: Iterable[date]) -> None:
+        """Invalidate days once the session's transaction commits"""
+        db.info.setdefault("report_invalidate_days", set()).update(days)
+    
+    def invalidate_reports_on_commit(self, db: Session, reports: Iterable[str]) -> None:
+        """Invalidate report types once the session's transaction commits"""
+        db.info.setdefault("report_invalidate_reports", set()).update(reports)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            live = [entry for entry in self._entries.values() if entry.expires_at is None or entry.expires_at > now]
+            hits = sum(self.hits.values())
+            misses = sum(self.misses.values())
+            reports = {}
+            for report in sorted(set(self.hits) | set(self.misses)):
+                report_hits = self.hits.get(report, 0)
+                report_misses = self.misses.get(report, 0)
+                reports[report] = {
+                    "hits": report_hits,
+                    "misses": report_misses,
+                    "hit_ratio": report_hits / (report_hits + report_misses)
+                }
+            return {
+                "entries": len(live),
+                "closed_day_entries": sum(1 for entry in live if entry.expires_at is None),
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                "reports": reports
+            }
+
+report_cache = ReportCache(settings.REPORT_CACHE_SIZE, settings.REPORT_CACHE_TTL_SECONDS)
+
+def cached_report(report: str, single_day: bool = False):
+    """Serve a ReportService method from report_cache.
+    
+    The method takes its first day (and last day unless single_day) as the
+    leading positional arguments; all its arguments form the cache key.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            if not settings.REPORT_CACHE_ENABLED:
+                return method(self, *args)
+            first_day = args[0]
+            last_day = first_day if single_day else args[1]
+            return report_cache.get_or_compute(report, args, first_day, last_day, lambda: method(self, *args))
+        return wrapper
+    return decorator
+
+# Item edits change the names and prices shown in past reports
+catalog_cache.add_listener(lambda item_ids: report_cache.invalidate_reports(ITEM_REPORTS))
+
+@event.listens_for(Session, "after_commit")
+def _apply_report_invalidations(session: Session) -> None:
+    report_cache.invalidate_days(session.info.pop("report_invalidate_days", ()))
+    reports = session.info.pop("report_invalidate_reports", None)
+    if reports:
+        report_cache.invalidate_reports(reports)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_report_invalidations(session: Session) -> None:
+    session.info.pop("report_invalidate_days", None)
+    session.info.pop("report_invalidate_reports", None)
@@ -1,44 +1,84 @@
 # backend/app/services/report_service.py
+import csv
+import io
+import json
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, case
-from typing import Optional, List, Dict, Any
-from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+from datetime import date, datetime, time, timedelta
 
-from app.models import Bill, BillItem, Item, Customer, Supplier
+from app.config import settings
+from app.database import SessionLocal
+from app.models import (
+    Bill, BillItem, Item, Customer, Supplier, DailyItemSales, DailyPaymentSales, DailyGstSales
+)
+from app.services.category_service import CategoryService
+from app.services.report_cache import cached_report
+from app.services.stock_valuation_service import StockValuationService
+
+SALE_TYPES = ["sale_challan", "gst_invoice"]
+
+# Row iterator and columns of the reports that can be exported
+REPORT_EXPORTS = {
+    "item-wise": ("iter_item_wise_rows", [
+        "item_code", "name", "category", "quantity_sold", "total_amount",
+        "gst_amount", "transaction_count", "average_per_transaction"
+    ]),
+    "customer-wise": ("iter_customer_wise_rows", [
+        "customer_id", "name", "phone", "bill_count", "total_amount", "average_bill_value"
+    ])
+}
 
 class ReportService:
+    CHUNK_SIZE = 500
+    
     def __init__(self, db: Session):
         self.db = db
     
+    @staticmethod
+    def get_period(from_date: date, to_date: date) -> Tuple[datetime, datetime]:
+        """Half-open range from the start of from_date to the end of to_date; datetimes are taken as given.
+        
+        A date to_date includes its whole day. Reports before the rollups
+        compared created_at <= to_date, which stopped at its midnight.
+        """
+        start = from_date if isinstance(from_date, datetime) else datetime.combine(from_date, time.min)
+        end = to_date if isinstance(to_date, datetime) else datetime.combine(to_date + timedelta(days=1), time.min)
+        return start, end
+    
+    @staticmethod
+    def use_rollups(start: datetime, end: datetime) -> bool:
+        """Whether a range is made of whole days the daily rollups can answer"""
+        return settings.REPORT_ROLLUPS_ENABLED and start.time() == time.min and end.time() == time.min
+    
+    @staticmethod
+    def day_filter(rollup, start: datetime, end: datetime) -> list:
+        return [rollup.day >= start.date(), rollup.day < end.date()]
+    
+    @cached_report("daily-sales", single_day=True)
     def get_daily_sales_report(self, report_date: date) -> Dict[str, Any]:
         """Generate daily sales summary"""
-        start_datetime = datetime.combine(report_date, datetime.min.time())
-        end_datetime = datetime.combine(report_date, datetime.max.time())
-        
-        # Get sales bills for the day
-        sales_bills = self.db.query(Bill).filter(
-            and_(
-                Bill.bill_type.in_(["sale_challan", "gst_invoice"]),
-                Bill.created_at >= start_datetime,
-                Bill.created_at <= end_datetime
-            )
-        ).all()
+        start_datetime, end_datetime = self.get_period(report_date, report_date)
+        if self.use_rollups(start_datetime, end_datetime):
+            return self._get_daily_sales_from_rollups(report_date)
         
-        # Calculate totals
-        total_bills = len(sales_bills)
-        total_amount = sum(bill.total_amount for bill in sales_bills)
-        total_gst = sum(bill.gst_amount for bill in sales_bills)
-        total_discount = sum(bill.discount_amount for bill in sales_bills)
-        net_amount = sum(bill.net_amount for bill in sales_bills)
+        # Sales bills of the day, shared by the breakdown and top items
+        day_bills = and_(
+            Bill.bill_type.in_(SALE_TYPES),
+            Bill.created_at >= start_datetime,
+            Bill.created_at < end_datetime
+        )
         
-        # Payment method breakdown
-        payment_methods = {}
-        for bill in sales_bills:
-            method = bill.payment_method or "cash"
-            if method not in payment_methods:
-                payment_methods[method] = {"count": 0, "amount": 0}
-            payment_methods[method]["count"] += 1
-            payment_methods[method]["amount"] += bill.net_amount
+        # Payment method breakdown; the summary is the sum of its rows
+        payment_method = func.coalesce(Bill.payment_method, "cash")
+        payments = self.db.query(
+            payment_method.label("payment_method"),
+            func.count(Bill.id).label("bill_count"),
+            func.sum(func.coalesce(Bill.total_amount, 0)).label("total_amount"),
+            func.sum(func.coalesce(Bill.gst_amount, 0)).label("gst_amount"),
+            func.sum(func.coalesce(Bill.discount_amount, 0)).label("discount_amount"),
+            func.sum(func.coalesce(Bill.net_amount, 0)).label("net_amount")
+        ).filter(day_bills).group_by(payment_method).all()
         
         # Top selling items
         top_items = self.db.query(
@@ -50,24 +90,52 @@ class ReportService:
             BillItem, Item.id == BillItem.item_id
         ).join(
             Bill, BillItem.bill_id == Bill.id
+        ).filter(day_bills).group_by(Item.id).order_by(func.sum(BillItem.total_amount).desc()).limit(10).all()
+        
+        return self._daily_sales_response(report_date, payments, top_items)
+    
+    def _get_daily_sales_from_rollups(self, report_date: date) -> Dict[str, Any]:
+        payments = self.db.query(
+            DailyPaymentSales.payment_method,
+            func.sum(DailyPaymentSales.bill_count).label("bill_count"),
+            func.sum(DailyPaymentSales.total_amount).label("total_amount"),
+            func.sum(DailyPaymentSales.gst_amount).label("gst_amount"),
+            func.sum(DailyPaymentSales.discount_amount).label("discount_amount"),
+            func.sum(DailyPaymentSales.net_amount).label("net_amount")
         ).filter(
-            and_(
-                Bill.bill_type.in_(["sale_challan", "gst_invoice"]),
-                Bill.created_at >= start_datetime,
-                Bill.created_at <= end_datetime
-            )
-        ).group_by(Item.id).order_by(func.sum(BillItem.total_amount).desc()).limit(10).all()
+            DailyPaymentSales.day == report_date,
+            DailyPaymentSales.bill_type.in_(SALE_TYPES)
+        ).group_by(DailyPaymentSales.payment_method).all()
+        
+        top_items = self.db.query(
+            Item.name,
+            Item.item_code,
+            func.sum(DailyItemSales.quantity).label("total_quantity"),
+            func.sum(DailyItemSales.total_amount).label("total_amount")
+        ).join(
+            DailyItemSales, Item.id == DailyItemSales.item_id
+        ).filter(
+            DailyItemSales.day == report_date,
+            DailyItemSales.bill_type.in_(SALE_TYPES)
+        ).group_by(Item.id).order_by(func.sum(DailyItemSales.total_amount).desc()).limit(10).all()
         
+        return self._daily_sales_response(report_date, payments, top_items)
+    
+    def _daily_sales_response(self, report_date: date, payments: List[Any], top_items: List[Any]) -> Dict[str, Any]:
+        """Build the daily report from per payment method totals and top item rows"""
+        payments = [row for row in payments if row.bill_count]
         return {
             "date": report_date.isoformat(),
             "summary": {
-                "total_bills": total_bills,
-                "total_amount": float(total_amount),
-                "total_gst": float(total_gst),
-                "total_discount": float(total_discount),
-                "net_amount": float(net_amount)
+                "total_bills": sum(row.bill_count for row in payments),
+                "total_amount": float(sum(row.total_amount for row in payments)),
+                "total_gst": float(sum(row.gst_amount for row in payments)),
+                "total_discount": float(sum(row.discount_amount for row in payments)),
+                "net_amount": float(sum(row.net_amount for row in payments))
+            },
+            "payment_methods": {
+                row.payment_method: {"count": row.bill_count, "amount": row.net_amount} for row in payments
             },
-            "payment_methods": payment_methods,
             "top_selling_items": [
                 {
                     "name": item.name,
@@ -79,51 +147,91 @@ class ReportService:
             ]
         }
     
-    def get_item_wise_report(self, from_date: date, to_date: date, category: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Generate item-wise sales report"""
-        query = self.db.query(
-            Item.id,
-            Item.item_code,
-            Item.name,
-            Item.category,
-            func.sum(BillItem.quantity).label("total_quantity"),
-            func.sum(BillItem.total_amount - BillItem.gst_amount).label("total_amount"),
-            func.sum(BillItem.gst_amount).label("total_gst"),
-            func.count(BillItem.id).label("transaction_count")
-        ).join(
-            BillItem, Item.id == BillItem.item_id
-        ).join(
-            Bill, BillItem.bill_id == Bill.id
-        ).filter(
-            and_(
-                Bill.bill_type.in_(["sale_challan", "gst_invoice"]),
-                Bill.created_at >= from_date,
-                Bill.created_at <= to_date
+    def _item_wise_query(
+        self, from_date: date, to_date: date, category: Optional[str] = None, category_id: Optional[int] = None
+    ) -> Tuple[Any, Any]:
+        """Per item sales totals query, ungrouped, and the line table it sums"""
+        start, end = self.get_period(from_date, to_date)
+        if self.use_rollups(start, end):
+            lines = DailyItemSales
+            query = self.db.query(
+                Item.id,
+                Item.item_code,
+                Item.name,
+                Item.category,
+                func.sum(lines.quantity).label("total_quantity"),
+                func.sum(lines.total_amount - lines.gst_amount).label("total_amount"),
+                func.sum(lines.gst_amount).label("total_gst"),
+                func.sum(lines.line_count).label("transaction_count")
+            ).join(
+                lines, Item.id == lines.item_id
+            ).filter(
+                lines.bill_type.in_(SALE_TYPES), *self.day_filter(lines, start, end)
+            )
+        else:
+            lines = BillItem
+            query = self.db.query(
+                Item.id,
+                Item.item_code,
+                Item.name,
+                Item.category,
+                func.sum(BillItem.quantity).label("total_quantity"),
+                func.sum(BillItem.total_amount - BillItem.gst_amount).label("total_amount"),
+                func.sum(BillItem.gst_amount).label("total_gst"),
+                func.count(BillItem.id).label("transaction_count")
+            ).join(
+                BillItem, Item.id == BillItem.item_id
+            ).join(
+                Bill, BillItem.bill_id == Bill.id
+            ).filter(
+                and_(
+                    Bill.bill_type.in_(SALE_TYPES),
+                    Bill.created_at >= start,
+                    Bill.created_at < end
+                )
             )
-        )
-        
-        if category:
-            query = query.filter(Item.category == category)
-        
-        results = query.group_by(Item.id).order_by(func.sum(BillItem.total_amount).desc()).all()
         
-        return [
-            {
-                "item_code": result.item_code,
-                "name": result.name,
-                "category": result.category,
-                "quantity_sold": float(result.total_quantity),
-                "total_amount": float(result.total_amount),
-                "gst_amount": float(result.total_gst),
-                "transaction_count": result.transaction_count,
-                "average_per_transaction": float(result.total_amount / result.transaction_count) if result.transaction_count > 0 else 0
-            }
-            for result in results
-        ]
+        category_id = CategoryService(self.db).filter_id(category_id, category)
+        if category_id is not None:
+            query = query.filter(Item.category_id == category_id)
+        return query, lines
     
-    def get_customer_wise_report(self, from_date: date, to_date: date) -> List[Dict[str, Any]]:
-        """Generate customer-wise sales report"""
-        results = self.db.query(
+    @staticmethod
+    def _item_wise_row(result: Any) -> Dict[str, Any]:
+        return {
+            "item_code": result.item_code,
+            "name": result.name,
+            "category": result.category,
+            "quantity_sold": float(result.total_quantity),
+            "total_amount": float(result.total_amount),
+            "gst_amount": float(result.total_gst),
+            "transaction_count": result.transaction_count,
+            "average_per_transaction": float(result.total_amount / result.transaction_count) if result.transaction_count > 0 else 0
+        }
+    
+    @cached_report("item-wise")
+    def get_item_wise_report(
+        self, from_date: date, to_date: date, category: Optional[str] = None, category_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Generate item-wise sales report"""
+        query, lines = self._item_wise_query(from_date, to_date, category, category_id)
+        results = query.group_by(Item.id).order_by(func.sum(lines.total_amount).desc()).all()
+        return [self._item_wise_row(result) for result in results if result.transaction_count]
+    
+    def iter_item_wise_rows(
+        self, from_date: date, to_date: date, category: Optional[str] = None, category_id: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield item-wise report rows in the report's order, fetching a chunk of rows at a time"""
+        query, lines = self._item_wise_query(from_date, to_date, category, category_id)
+        query = query.group_by(Item.id).order_by(func.sum(lines.total_amount).desc())
+        for result in query.yield_per(self.CHUNK_SIZE):
+            if result.transaction_count:
+                yield self._item_wise_row(result)
+    
+    def _customer_wise_query(self, from_date: date, to_date: date) -> Any:
+        """Per customer sales totals query, ungrouped"""
+        start, end = self.get_period(from_date, to_date)
+        return self.db.query(
             Customer.id,
             Customer.name,
             Customer.phone,
@@ -134,64 +242,101 @@ class ReportService:
             Bill, Customer.id == Bill.customer_id
         ).filter(
             and_(
-                Bill.bill_type.in_(["sale_challan", "gst_invoice"]),
-                Bill.created_at >= from_date,
-                Bill.created_at <= to_date
+                Bill.bill_type.in_(SALE_TYPES),
+                Bill.created_at >= start,
+                Bill.created_at < end
             )
-        ).group_by(Customer.id).order_by(func.sum(Bill.net_amount).desc()).all()
-        
-        return [
-            {
-                "customer_id": result.id,
-                "name": result.name,
-                "phone": result.phone,
-                "bill_count": result.bill_count,
-                "total_amount": float(result.total_amount),
-                "average_bill_value": float(result.average_bill)
-            }
-            for result in results
-        ]
+        )
+    
+    @staticmethod
+    def _customer_wise_row(result: Any) -> Dict[str, Any]:
+        return {
+            "customer_id": result.id,
+            "name": result.name,
+            "phone": result.phone,
+            "bill_count": result.bill_count,
+            "total_amount": float(result.total_amount),
+            "average_bill_value": float(result.average_bill)
+        }
+    
+    @cached_report("customer-wise")
+    def get_customer_wise_report(self, from_date: date, to_date: date) -> List[Dict[str, Any]]:
+        """Generate customer-wise sales report"""
+        results = self._customer_wise_query(from_date, to_date).group_by(
+            Customer.id
+        ).order_by(func.sum(Bill.net_amount).desc()).all()
+        return [self._customer_wise_row(result) for result in results]
+    
+    def iter_customer_wise_rows(self, from_date: date, to_date: date) -> Iterator[Dict[str, Any]]:
+        """Yield customer-wise report rows in the report's order, fetching a chunk of rows at a time"""
+        query = self._customer_wise_query(from_date, to_date)
+        query = query.group_by(Customer.id).order_by(func.sum(Bill.net_amount).desc())
+        for result in query.yield_per(self.CHUNK_SIZE):
+            yield self._customer_wise_row(result)
     
+    @staticmethod
+    def export_report(report: str, format: str, *args) -> Iterator[str]:
+        """Stream a report's rows as CSV or NDJSON text; opens its own session as it outlives the request"""
+        rows_method, columns = REPORT_EXPORTS[report]
+        db = SessionLocal()
+        try:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=columns)
+            if format == "csv":
+                writer.writeheader()
+            for row in getattr(ReportService(db), rows_method)(*args):
+                if format == "csv":
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(row))
+                    buffer.write("\n")
+                if buffer.tell() > 65536:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        finally:
+            db.close()
+    
+    @cached_report("gst-summary")
     def get_gst_summary(self, from_date: date, to_date: date) -> Dict[str, Any]:
         """Generate GST summary report"""
+        start, end = self.get_period(from_date, to_date)
+        if self.use_rollups(start, end):
+            bills = DailyPaymentSales
+            period = self.day_filter(bills, start, end)
+            gst_breakup = self.db.query(
+                DailyGstSales.gst_percentage,
+                func.sum(DailyGstSales.taxable_amount).label("taxable_amount"),
+                func.sum(DailyGstSales.gst_amount).label("gst_amount")
+            ).filter(
+                DailyGstSales.bill_type == "gst_invoice", *self.day_filter(DailyGstSales, start, end)
+            ).group_by(DailyGstSales.gst_percentage).all()
+        else:
+            bills = Bill
+            period = [Bill.created_at >= start, Bill.created_at < end]
+            # GST rate wise breakup
+            gst_breakup = self.db.query(
+                BillItem.gst_percentage,
+                func.sum(BillItem.total_amount - BillItem.gst_amount).label("taxable_amount"),
+                func.sum(BillItem.gst_amount).label("gst_amount")
+            ).join(
+                Bill, BillItem.bill_id == Bill.id
+            ).filter(
+                Bill.bill_type == "gst_invoice", *period
+            ).group_by(BillItem.gst_percentage).all()
+        
         # Sales GST
         sales_gst = self.db.query(
-            func.sum(Bill.gst_amount).label("total_gst"),
-            func.sum(Bill.total_amount).label("taxable_amount")
-        ).filter(
-            and_(
-                Bill.bill_type.in_(["gst_invoice"]),
-                Bill.created_at >= from_date,
-                Bill.created_at <= to_date
-            )
-        ).first()
+            func.sum(bills.gst_amount).label("total_gst"),
+            func.sum(bills.total_amount).label("taxable_amount")
+        ).filter(bills.bill_type == "gst_invoice", *period).first()
         
         # Purchase GST
         purchase_gst = self.db.query(
-            func.sum(Bill.gst_amount).label("total_gst"),
-            func.sum(Bill.total_amount).label("taxable_amount")
-        ).filter(
-            and_(
-                Bill.bill_type == "purchase",
-                Bill.created_at >= from_date,
-                Bill.created_at <= to_date
-            )
-        ).first()
-        
-        # GST rate wise breakup
-        gst_breakup = self.db.query(
-            BillItem.gst_percentage,
-            func.sum(BillItem.total_amount - BillItem.gst_amount).label("taxable_amount"),
-            func.sum(BillItem.gst_amount).label("gst_amount")
-        ).join(
-            Bill, BillItem.bill_id == Bill.id
-        ).filter(
-            and_(
-                Bill.bill_type.in_(["gst_invoice"]),
-                Bill.created_at >= from_date,
-                Bill.created_at <= to_date
-            )
-        ).group_by(BillItem.gst_percentage).all()
+            func.sum(bills.gst_amount).label("total_gst"),
+            func.sum(bills.total_amount).label("taxable_amount")
+        ).filter(bills.bill_type == "purchase", *period).first()
         
         return {
             "period": {
@@ -214,37 +359,58 @@ class ReportService:
                     "gst_amount": float(item.gst_amount)
                 }
                 for item in gst_breakup
+                if item.taxable_amount or item.gst_amount
             ]
         }
     
+    @cached_report("profit-loss")
     def get_profit_loss_report(self, from_date: date, to_date: date) -> Dict[str, Any]:
         """Generate profit and loss statement"""
-        # Sales data
-        sales_data = self.db.query(
-            func.sum(BillItem.quantity * BillItem.rate).label("sales_amount"),
-            func.sum(BillItem.quantity * Item.purchase_price).label("cost_amount")
-        ).join(
-            Item, BillItem.item_id == Item.id
-        ).join(
-            Bill, BillItem.bill_id == Bill.id
-        ).filter(
-            and_(
-                Bill.bill_type.in_(["sale_challan", "gst_invoice"]),
-                Bill.created_at >= from_date,
-                Bill.created_at <= to_date
-            )
-        ).first()
-        
-        # Purchase data
-        purchase_data = self.db.query(
-            func.sum(Bill.net_amount).label("total_purchases")
-        ).filter(
-            and_(
-                Bill.bill_type == "purchase",
-                Bill.created_at >= from_date,
-                Bill.created_at <= to_date
-            )
-        ).first()
+        start, end = self.get_period(from_date, to_date)
+        if self.use_rollups(start, end):
+            # Sales data
+            sales_data = self.db.query(
+                func.sum(DailyItemSales.amount).label("sales_amount"),
+                func.sum(DailyItemSales.quantity * Item.purchase_price).label("cost_amount")
+            ).join(
+                Item, DailyItemSales.item_id == Item.id
+            ).filter(
+                DailyItemSales.bill_type.in_(SALE_TYPES), *self.day_filter(DailyItemSales, start, end)
+            ).first()
+            
+            # Purchase data
+            purchase_data = self.db.query(
+                func.sum(DailyPaymentSales.net_amount).label("total_purchases")
+            ).filter(
+                DailyPaymentSales.bill_type == "purchase", *self.day_filter(DailyPaymentSales, start, end)
+            ).first()
+        else:
+            # Sales data
+            sales_data = self.db.query(
+                func.sum(BillItem.quantity * BillItem.rate).label("sales_amount"),
+                func.sum(BillItem.quantity * Item.purchase_price).label("cost_amount")
+            ).join(
+                Item, BillItem.item_id == Item.id
+            ).join(
+                Bill, BillItem.bill_id == Bill.id
+            ).filter(
+                and_(
+                    Bill.bill_type.in_(SALE_TYPES),
+                    Bill.created_at >= start,
+                    Bill.created_at < end
+                )
+            ).first()
+            
+            # Purchase data
+            purchase_data = self.db.query(
+                func.sum(Bill.net_amount).label("total_purchases")
+            ).filter(
+                and_(
+                    Bill.bill_type == "purchase",
+                    Bill.created_at >= start,
+                    Bill.created_at < end
+                )
+            ).first()
         
         sales_amount = float(sales_data.sales_amount or 0)
         cost_of_goods = float(sales_data.cost_amount or 0)
@@ -268,20 +434,28 @@ class ReportService:
             "net_profit": gross_profit  # Simplified - add more expense categories as needed
         }
     
-    def get_stock_report(self, category: Optional[str] = None, low_stock_only: bool = False) -> List[Dict[str, Any]]:
+    def get_stock_report(
+        self, category: Optional[str] = None, low_stock_only: bool = False, category_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """Generate current stock report"""
         query = self.db.query(Item).filter(Item.is_active == True)
         
-        if category:
-            query = query.filter(Item.category == category)
+        category_id = CategoryService(self.db).filter_id(category_id, category)
+        if category_id is not None:
+            query = query.filter(Item.category_id == category_id)
         
         if low_stock_only:
             query = query.filter(Item.current_stock <= Item.min_stock_alert)
         
         items = query.order_by(Item.category, Item.name).all()
         
-        total_value_purchase = sum(item.current_stock * (item.purchase_price or 0) for item in items)
-        total_value_selling = sum(item.current_stock * item.selling_price for item in items)
+        if low_stock_only:
+            total_value_purchase = sum(item.current_stock * (item.purchase_price or 0) for item in items)
+            total_value_selling = sum(item.current_stock * item.selling_price for item in items)
+        else:
+            totals = StockValuationService(self.db).get_totals(category_id)
+            total_value_purchase = totals["total_purchase_value"]
+            total_value_selling = totals["total_selling_value"]
         
         return {
             "summary": {
@@ -0,0 +1,159 @@
+# backend/app/services/sales_rollup_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from typing import Any, Dict, Iterable, Optional, Tuple
+from datetime import date
+from types import SimpleNamespace
+
+from app.models import Bill, BillItem, DailyItemSales, DailyPaymentSales, DailyGstSales
+from app.services.report_cache import report_cache
+
+# Summed columns of each rollup, in insert order
+ITEM_TOTALS = ("quantity", "amount", "gst_amount", "total_amount", "line_count")
+PAYMENT_TOTALS = ("bill_count", "total_amount", "gst_amount", "discount_amount", "net_amount")
+GST_TOTALS = ("taxable_amount", "gst_amount")
+
+class SalesRollupService:
+    """Daily totals per item, payment method and GST rate.
+    
+    Bill writes add their totals here in the same transaction, so reports
+    over whole days read one row per day and key instead of every bill
+    line. rebuild() recomputes the rollups from bills.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @staticmethod
+    def bill_key(bill: Any) -> Tuple[date, str]:
+        """Day and bill type a bill (row, dict values or ORM object) is rolled up under"""
+        return bill.created_at.date(), getattr(bill.bill_type, "value", bill.bill_type)
+    
+    @staticmethod
+    def snapshot(bill: Bill) -> SimpleNamespace:
+        """Copy the columns a bill is rolled up by, before changing it"""
+        return SimpleNamespace(**{
+            name: getattr(bill, name)
+            for name in ("created_at", "bill_type", "payment_method", *PAYMENT_TOTALS[1:])
+        })
+    
+    @staticmethod
+    def _add_payment(deltas: Dict, bill: Any, day: date, bill_type: str, sign: int) -> None:
+        totals = deltas.setdefault(
+            (day, bill_type, bill.payment_method or "cash"), dict.fromkeys(PAYMENT_TOTALS, 0)
+        )
+        totals["bill_count"] += sign
+        totals["total_amount"] += sign * (bill.total_amount or 0)
+        totals["gst_amount"] += sign * (bill.gst_amount or 0)
+        totals["discount_amount"] += sign * (bill.discount_amount or 0)
+        totals["net_amount"] += sign * (bill.net_amount or 0)
+    
+    def bills_added(self, bills: Iterable[Tuple[Any, Iterable[Any]]], sign: int = 1) -> None:
+        """Add (bill, lines) pairs to the rollups with one upsert per rollup"""
+        items = {}
+        payments = {}
+        rates = {}
+        for bill, lines in bills:
+            day, bill_type = self.bill_key(bill)
+            self._add_payment(payments, bill, day, bill_type, sign)
+            for line in lines:
+                totals = items.setdefault((day, bill_type, line.item_id), dict.fromkeys(ITEM_TOTALS, 0))
+                totals["quantity"] += sign * line.quantity
+                totals["amount"] += sign * line.quantity * line.rate
+                totals["gst_amount"] += sign * line.gst_amount
+                totals["total_amount"] += sign * line.total_amount
+                totals["line_count"] += sign
+                
+                totals = rates.setdefault((day, bill_type, line.gst_percentage or 0), dict.fromkeys(GST_TOTALS, 0))
+                totals["taxable_amount"] += sign * (line.total_amount - line.gst_amount)
+                totals["gst_amount"] += sign * line.gst_amount
+        
+        self._apply(DailyItemSales, ("day", "bill_type", "item_id"), items)
+        self._apply(DailyPaymentSales, ("day", "bill_type", "payment_method"), payments)
+        self._apply(DailyGstSales, ("day", "bill_type", "gst_percentage"), rates)
+        
+        # Bills of today only reach cached reports through their TTL; backdated
+        # bills drop the cached reports of the closed days they land on
+        today = date.today()
+        report_cache.invalidate_days_on_commit(self.db, {key[0] for key in payments if key[0] < today})
+    
+    def bill_changed(self, before: Any, after: Any) -> None:
+        """Move a bill's header totals after an edit of its payment method or amounts"""
+        payments = {}
+        day, bill_type = self.bill_key(after)
+        self._add_payment(payments, before, day, bill_type, -1)
+        self._add_payment(payments, after, day, bill_type, 1)
+        self._apply(DailyPaymentSales, ("day", "bill_type", "payment_method"), payments)
+        report_cache.invalidate_days_on_commit(self.db, [day])
+    
+    def _apply(self, model, keys: Tuple[str, ...], deltas: Dict[Tuple, Dict[str, float]]) -> None:
+        rows = [dict(zip(keys, key), **values) for key, values in deltas.items() if any(values.values())]
+        if not rows:
+            return
+        
+        stmt = sqlite_insert(model)
+        self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in rows[0] if name not in keys}
+            ),
+            rows
+        )
+    
+    def rebuild(self, from_day: Optional[date] = None) -> Dict[str, int]:
+        """Recompute the rollups from bills, for every day or from a day on"""
+        day = func.date(Bill.created_at)
+        bill_type = Bill.bill_type
+        selects = {
+            DailyItemSales: select(
+                day, bill_type, BillItem.item_id,
+                func.sum(BillItem.quantity),
+                func.sum(BillItem.quantity * BillItem.rate),
+                func.sum(BillItem.gst_amount),
+                func.sum(BillItem.total_amount),
+                func.count(BillItem.id)
+            ).join_from(Bill, BillItem, BillItem.bill_id == Bill.id).group_by(day, bill_type, BillItem.item_id),
+            DailyPaymentSales: select(
+                day, bill_type, func.coalesce(Bill.payment_method, "cash"),
+                func.count(Bill.id),
+                func.sum(func.coalesce(Bill.total_amount, 0)),
+                func.sum(func.coalesce(Bill.gst_amount, 0)),
+                func.sum(func.coalesce(Bill.discount_amount, 0)),
+                func.sum(func.coalesce(Bill.net_amount, 0))
+            ).group_by(day, bill_type, func.coalesce(Bill.payment_method, "cash")),
+            DailyGstSales: select(
+                day, bill_type, func.coalesce(BillItem.gst_percentage, 0),
+                func.sum(BillItem.total_amount - BillItem.gst_amount),
+                func.sum(BillItem.gst_amount)
+            ).join_from(Bill, BillItem, BillItem.bill_id == Bill.id).group_by(
+                day, bill_type, func.coalesce(BillItem.gst_percentage, 0)
+            )
+        }
+        columns = {
+            DailyItemSales: ["day", "bill_type", "item_id", *ITEM_TOTALS],
+            DailyPaymentSales: ["day", "bill_type", "payment_method", *PAYMENT_TOTALS],
+            DailyGstSales: ["day", "bill_type", "gst_percentage", *GST_TOTALS]
+        }
+        
+        counts = {}
+        for model, query in selects.items():
+            clear = delete(model)
+            if from_day:
+                clear = clear.where(model.day >= from_day)
+                query = query.where(Bill.created_at >= from_day)
+            self.db.execute(clear)
+            counts[model.__tablename__] = self.db.execute(
+                insert(model).from_select(columns[model], query)
+            ).rowcount
+        self.db.commit()
+        report_cache.clear()
+        return counts
+    
+    @staticmethod
+    def ensure_rollups(engine: Engine) -> None:
+        """Build the rollups once when bills exist that were never rolled up"""
+        with Session(engine) as db:
+            if db.query(DailyPaymentSales.day).first() is None and db.query(Bill.id).first() is not None:
+                SalesRollupService(db).rebuild()
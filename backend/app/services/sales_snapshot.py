@@ -0,0 +1,481 @@
+# backend/app/services/sales_snapshot.py
+import itertools
+import json
+import os
+import shutil
+import threading
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import case, cast, func, select, Integer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime
+
+from app.config import settings
+from app.models import Bill, BillItem, Category, Item
+
+# Bill types as stored in the bill_type column of segments
+BILL_TYPE_CODES = {"sale_challan": 0, "gst_invoice": 1, "quotation": 2, "purchase": 3}
+SALE_CODES = (0, 1)
+PURCHASE_CODES = (3,)
+
+# Segment columns in export order, with their on-disk types
+SEGMENT_COLUMNS = (
+    ("bill_id", np.int64),
+    ("bill_type", np.int8),
+    ("day", np.int32),
+    ("weekday", np.int8),
+    ("hour", np.int8),
+    ("item", np.int32),
+    ("quantity", np.float64),
+    ("rate", np.float64),
+    ("gst_amount", np.float64),
+    ("total_amount", np.float64)
+)
+
+EPOCH = date(1970, 1, 1)
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+class SnapshotView:
+    """One manifest version of the snapshot: memory-mapped segments plus its dictionary"""
+    
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        self.manifest = manifest
+        self.segments = [
+            (
+                segment,
+                {
+                    name: np.load(os.path.join(directory, segment["name"], f"{name}.npy"), mmap_mode="r")
+                    for name, _ in SEGMENT_COLUMNS
+                }
+            )
+            for segment in manifest["segments"]
+        ]
+        dictionary = os.path.join(directory, manifest["dictionary"])
+        self.item_ids = np.load(os.path.join(dictionary, "item_ids.npy"))
+        self.item_categories = np.load(os.path.join(dictionary, "item_categories.npy"))
+        self.item_costs = np.load(os.path.join(dictionary, "item_costs.npy"))
+        with open(os.path.join(dictionary, "labels.json")) as f:
+            labels = json.load(f)
+        self.item_codes = labels["item_codes"]
+        self.item_names = labels["item_names"]
+        self.category_ids = labels["category_ids"]
+        self.category_names = labels["category_names"]
+
+class SalesSnapshot:
+    """Columnar copy of bill lines on disk for long-range analytics.
+    
+    Each export appends the lines past the bill_items.id watermark as a new
+    segment of .npy columns. Items and categories are dictionary-encoded
+    into dense codes, so aggregations are np.bincount calls over
+    memory-mapped arrays and never query the billing database. Bill lines
+    are never edited, so segments stay valid once written; item labels,
+    categories and purchase prices are refreshed in the dictionary on every
+    export. Days are UTC days like the rollups and SQL reports use, so both
+    paths total a date range alike; the heatmap's weekday and hour are store
+    time, STORE_UTC_OFFSET_MINUTES ahead of UTC. Exports should run in one
+    process only.
+    """
+    
+    # Bumped when segment columns change; older snapshots are exported again
+    FORMAT = 2
+    SEGMENT_ROWS = 500000
+    # Merge the trailing small segments once this many have piled up
+    COMPACT_SEGMENTS = 16
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._export_lock = threading.Lock()
+        self._view_lock = threading.Lock()
+        self._view: Optional[SnapshotView] = None
+    
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+    
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Publish a new manifest atomically; readers switch to it on their next query"""
+        manifest["version"] += 1
+        manifest["exported_at"] = datetime.utcnow().isoformat()
+        temp_path = f"{self._manifest_path()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self._manifest_path())
+    
+    def _write_columns(self, name: str, columns: Dict[str, np.ndarray]) -> None:
+        path = os.path.join(self.directory, name)
+        os.makedirs(path, exist_ok=True)
+        for column, dtype in SEGMENT_COLUMNS:
+            np.save(os.path.join(path, f"{column}.npy"), np.ascontiguousarray(columns[column], dtype=dtype))
+    
+    def _remove_unreferenced(self, manifest: Dict[str, Any]) -> None:
+        """Delete segment and dictionary directories the manifest does not point to.
+        
+        Run before an export writes anything, so the directories of the
+        manifest it replaces stay until the next export for readers that
+        loaded it, while ones left by a crash or older manifests go.
+        """
+        referenced = {segment["name"] for segment in manifest["segments"]} | {manifest["dictionary"]}
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path) and name not in referenced:
+                shutil.rmtree(path, ignore_errors=True)
+    
+    def _fetch_lines(self, db: Session, after_id: int, utc_offset_minutes: int) -> Tuple[int, np.ndarray]:
+        """Read up to SEGMENT_ROWS lines past a line id as one float array, with the last id read"""
+        bills = Bill.__table__
+        lines = BillItem.__table__
+        day = cast(func.julianday(func.date(bills.c.created_at)) - func.julianday(EPOCH.isoformat()), Integer)
+        store_time = func.datetime(bills.c.created_at, f"{utc_offset_minutes:+d} minutes")
+        stmt = select(
+            lines.c.id,
+            bills.c.id,
+            case(BILL_TYPE_CODES, value=bills.c.bill_type, else_=-1),
+            day,
+            # %w counts from Sunday; weekday 0 is Monday
+            (cast(func.strftime("%w", store_time), Integer) + 6) % 7,
+            cast(func.strftime("%H", store_time), Integer),
+            lines.c.item_id,
+            func.coalesce(lines.c.quantity, 0),
+            func.coalesce(lines.c.rate, 0),
+            func.coalesce(lines.c.gst_amount, 0),
+            func.coalesce(lines.c.total_amount, 0)
+        ).join_from(
+            lines, bills, lines.c.bill_id == bills.c.id
+        ).where(lines.c.id > after_id).order_by(lines.c.id).limit(self.SEGMENT_ROWS)
+        
+        result = db.connection().execute(stmt)
+        data = np.fromiter(itertools.chain.from_iterable(result), dtype=np.float64).reshape(-1, 11)
+        return (int(data[-1, 0]) if len(data) else after_id), data
+    
+    def _encode_items(self, item_ids: np.ndarray, codes: Dict[int, int]) -> np.ndarray:
+        """Map item ids to dense codes, giving unseen items the next codes"""
+        unique, inverse = np.unique(item_ids, return_inverse=True)
+        for item_id in unique.tolist():
+            if item_id not in codes:
+                codes[item_id] = len(codes)
+        return np.array([codes[item_id] for item_id in unique.tolist()], dtype=np.int32)[inverse.ravel()]
+    
+    def _write_dictionary(self, db: Session, name: str, codes: Dict[int, int], previous: Optional[SnapshotView]) -> None:
+        """Write item and category dictionaries for every encoded item, with current labels and prices"""
+        count = len(codes)
+        item_ids = np.zeros(count, dtype=np.int64)
+        for item_id, code in codes.items():
+            item_ids[code] = item_id
+        
+        # Start from the previous labels so items deleted since keep theirs
+        item_codes = [""] * count
+        item_names = [""] * count
+        item_costs = np.zeros(count, dtype=np.float64)
+        item_category_ids = [None] * count
+        if previous is not None:
+            known = len(previous.item_ids)
+            item_codes[:known] = previous.item_codes
+            item_names[:known] = previous.item_names
+            item_costs[:known] = previous.item_costs
+            item_category_ids[:known] = [
+                previous.category_ids[code] if code >= 0 else None for code in previous.item_categories.tolist()
+            ]
+        
+        rows = db.connection().execute(
+            select(Item.id, Item.item_code, Item.name, Item.category_id, func.coalesce(Item.purchase_price, 0))
+        )
+        for item_id, item_code, item_name, category_id, purchase_price in rows:
+            code = codes.get(item_id)
+            if code is not None:
+                item_codes[code] = item_code
+                item_names[code] = item_name
+                item_costs[code] = purchase_price
+                item_category_ids[code] = category_id
+        
+        categories = db.connection().execute(select(Category.id, Category.name).order_by(Category.id)).all()
+        category_codes = {category_id: code for code, (category_id, _) in enumerate(categories)}
+        item_categories = np.array(
+            [category_codes.get(category_id, -1) for category_id in item_category_ids], dtype=np.int32
+        )
+        
+        path = os.path.join(self.directory, name)
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "item_ids.npy"), item_ids)
+        np.save(os.path.join(path, "item_categories.npy"), item_categories)
+        np.save(os.path.join(path, "item_costs.npy"), item_costs)
+        with open(os.path.join(path, "labels.json"), "w") as f:
+            json.dump({
+                "item_codes": item_codes,
+                "item_names": item_names,
+                "category_ids": [category_id for category_id, _ in categories],
+                "category_names": [category_name for _, category_name in categories]
+            }, f)
+    
+    def _compact(self, manifest: Dict[str, Any]) -> None:
+        """Merge the trailing run of small segments into segments of up to SEGMENT_ROWS lines"""
+        small = list(itertools.takewhile(
+            lambda segment: segment["rows"] < self.SEGMENT_ROWS, reversed(manifest["segments"])
+        ))[::-1]
+        if len(small) < self.COMPACT_SEGMENTS:
+            return
+        
+        groups = [[]]
+        for segment in small:
+            if groups[-1] and sum(member["rows"] for member in groups[-1]) + segment["rows"] > self.SEGMENT_ROWS:
+                groups.append([])
+            groups[-1].append(segment)
+        
+        merged = []
+        for group in groups:
+            if len(group) == 1:
+                merged.extend(group)
+                continue
+            name = self._next_name(manifest, "segment")
+            self._write_columns(name, {
+                column: np.concatenate([
+                    np.load(os.path.join(self.directory, segment["name"], f"{column}.npy"), mmap_mode="r")
+                    for segment in group
+                ])
+                for column, _ in SEGMENT_COLUMNS
+            })
+            merged.append({
+                "name": name,
+                "rows": sum(segment["rows"] for segment in group),
+                "first_line_id": group[0]["first_line_id"],
+                "last_line_id": group[-1]["last_line_id"],
+                "min_day": min(segment["min_day"] for segment in group),
+                "max_day": max(segment["max_day"] for segment in group)
+            })
+        manifest["segments"] = manifest["segments"][:-len(small)] + merged
+    
+    @staticmethod
+    def _next_name(manifest: Dict[str, Any], prefix: str) -> str:
+        manifest["sequence"] += 1
+        return f"{prefix}_{manifest['sequence']:06d}"
+    
+    def export(self, db: Session) -> Dict[str, Any]:
+        """Append bill lines added since the last export and refresh the dictionary"""
+        with self._export_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            utc_offset_minutes = settings.STORE_UTC_OFFSET_MINUTES
+            manifest = self.read_manifest() or {"version": 0, "sequence": 0, "dictionary": None}
+            if manifest["dictionary"]:
+                self._remove_unreferenced(manifest)
+            # Segments of an older layout or another store time zone are exported again
+            if (manifest.get("format"), manifest.get("utc_offset_minutes")) != (self.FORMAT, utc_offset_minutes):
+                manifest.update(
+                    format=self.FORMAT, utc_offset_minutes=utc_offset_minutes,
+                    watermark=0, segments=[], dictionary=None
+                )
+            previous = self.load() if manifest["dictionary"] else None
+            codes = {item_id: code for code, item_id in enumerate(previous.item_ids.tolist())} if previous else {}
+            
+            rows_added = 0
+            segments_added = 0
+            while True:
+                last_id, data = self._fetch_lines(db, manifest["watermark"], utc_offset_minutes)
+                if not len(data):
+                    break
+                name = self._next_name(manifest, "segment")
+                self._write_columns(name, {
+                    "bill_id": data[:, 1],
+                    "bill_type": data[:, 2],
+                    "day": data[:, 3],
+                    "weekday": data[:, 4],
+                    "hour": data[:, 5],
+                    "item": self._encode_items(data[:, 6].astype(np.int64), codes),
+                    "quantity": data[:, 7],
+                    "rate": data[:, 8],
+                    "gst_amount": data[:, 9],
+                    "total_amount": data[:, 10]
+                })
+                manifest["segments"].append({
+                    "name": name,
+                    "rows": len(data),
+                    "first_line_id": int(data[0, 0]),
+                    "last_line_id": last_id,
+                    "min_day": int(data[:, 3].min()),
+                    "max_day": int(data[:, 3].max())
+                })
+                manifest["watermark"] = last_id
+                rows_added += len(data)
+                segments_added += 1
+            
+            self._compact(manifest)
+            manifest["dictionary"] = self._next_name(manifest, "dictionary")
+            self._write_dictionary(db, manifest["dictionary"], codes, previous)
+            self._write_manifest(manifest)
+            
+            status = self.status()
+            status.update(rows_added=rows_added, segments_added=segments_added)
+            return status
+    
+    def status(self) -> Dict[str, Any]:
+        manifest = self.read_manifest()
+        if manifest is None:
+            return {"exported": False}
+        return {
+            "exported": True,
+            "exported_at": manifest["exported_at"],
+            "watermark": manifest["watermark"],
+            "segments": len(manifest["segments"]),
+            "rows": sum(segment["rows"] for segment in manifest["segments"])
+        }
+    
+    def load(self) -> SnapshotView:
+        """Return the view of the current manifest, reopening segments when it changed"""
+        manifest = self.read_manifest()
+        if manifest is None:
+            raise ValueError("No analytics snapshot has been exported yet")
+        with self._view_lock:
+            if self._view is None or self._view.manifest["version"] != manifest["version"]:
+                self._view = SnapshotView(self.directory, manifest)
+            return self._view
+    
+    @staticmethod
+    def _scan(
+        view: SnapshotView, from_date: date, to_date: date, bill_types: Tuple[int, ...], columns: Tuple[str, ...]
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield the given columns of lines of these bill types between two days, one segment at a time"""
+        first_day = (from_date - EPOCH).days
+        last_day = (to_date - EPOCH).days
+        for segment, arrays in view.segments:
+            if segment["max_day"] < first_day or segment["min_day"] > last_day:
+                continue
+            day = arrays["day"]
+            mask = (day >= first_day) & (day <= last_day) & np.isin(arrays["bill_type"], bill_types)
+            if mask.all():
+                yield {column: arrays[column] for column in columns}
+            else:
+                yield {column: arrays[column][mask] for column in columns}
+    
+    def _item_totals(self, view: SnapshotView, from_date: date, to_date: date) -> Dict[str, np.ndarray]:
+        """Sum sale lines per encoded item"""
+        count = len(view.item_ids)
+        totals = {
+            "quantity": np.zeros(count),
+            "total_amount": np.zeros(count),
+            "gst_amount": np.zeros(count),
+            "line_count": np.zeros(count)
+        }
+        for lines in self._scan(view, from_date, to_date, SALE_CODES, ("item", "quantity", "total_amount", "gst_amount")):
+            item = lines["item"]
+            totals["quantity"] += np.bincount(item, weights=lines["quantity"], minlength=count)
+            totals["total_amount"] += np.bincount(item, weights=lines["total_amount"], minlength=count)
+            totals["gst_amount"] += np.bincount(item, weights=lines["gst_amount"], minlength=count)
+            totals["line_count"] += np.bincount(item, minlength=count)
+        return totals
+    
+    def get_item_wise(
+        self, from_date: date, to_date: date, category_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Item-wise sales, in the shape of the item-wise report"""
+        view = self.load()
+        totals = self._item_totals(view, from_date, to_date)
+        selected = totals["line_count"] > 0
+        if category_id is not None:
+            code = view.category_ids.index(category_id) if category_id in view.category_ids else -2
+            selected &= view.item_categories == code
+        
+        selected = np.flatnonzero(selected)
+        selected = selected[np.argsort(-totals["total_amount"][selected], kind="stable")][:limit]
+        columns = {name: values[selected].tolist() for name, values in totals.items()}
+        rows = []
+        for index, code in enumerate(selected.tolist()):
+            category_code = int(view.item_categories[code])
+            taxable = columns["total_amount"][index] - columns["gst_amount"][index]
+            line_count = int(columns["line_count"][index])
+            rows.append({
+                "item_code": view.item_codes[code],
+                "name": view.item_names[code],
+                "category": view.category_names[category_code] if category_code >= 0 else None,
+                "quantity_sold": columns["quantity"][index],
+                "total_amount": taxable,
+                "gst_amount": columns["gst_amount"][index],
+                "transaction_count": line_count,
+                "average_per_transaction": taxable / line_count
+            })
+        return rows
+    
+    def get_category_wise(self, from_date: date, to_date: date) -> List[Dict[str, Any]]:
+        """Sales per category, summed from the per item totals"""
+        view = self.load()
+        totals = self._item_totals(view, from_date, to_date)
+        count = len(view.category_ids) + 1
+        # Items without a category go in the last slot
+        category = np.where(view.item_categories >= 0, view.item_categories, count - 1)
+        
+        sums = {name: np.bincount(category, weights=values, minlength=count) for name, values in totals.items()}
+        items_sold = np.bincount(category, weights=(totals["line_count"] > 0).astype(np.float64), minlength=count)
+        names = view.category_names + [None]
+        rows = [
+            {
+                "category_id": view.category_ids[code] if code < count - 1 else None,
+                "category": names[code] or None,
+                "items_sold": int(items_sold[code]),
+                "quantity_sold": float(sums["quantity"][code]),
+                "total_amount": float(sums["total_amount"][code] - sums["gst_amount"][code]),
+                "gst_amount": float(sums["gst_amount"][code]),
+                "transaction_count": int(sums["line_count"][code])
+            }
+            for code in np.flatnonzero(sums["line_count"]).tolist()
+        ]
+        return sorted(rows, key=lambda row: -row["total_amount"])
+    
+    def get_hourly_heatmap(self, from_date: date, to_date: date) -> Dict[str, Any]:
+        """Sales amount and bill count per store time weekday and hour, for bills of these UTC days"""
+        view = self.load()
+        amount = np.zeros(7 * 24)
+        bill_ids = []
+        bill_cells = []
+        for lines in self._scan(view, from_date, to_date, SALE_CODES, ("bill_id", "weekday", "hour", "total_amount")):
+            cell = lines["weekday"].astype(np.int64) * 24 + lines["hour"]
+            amount += np.bincount(cell, weights=lines["total_amount"], minlength=7 * 24)
+            bill_ids.append(lines["bill_id"])
+            bill_cells.append(cell)
+        
+        # A bill's lines can straddle two segments, so bills are counted once over all of them
+        bill_count = np.zeros(7 * 24)
+        if bill_ids:
+            _, first = np.unique(np.concatenate(bill_ids), return_index=True)
+            bill_count = np.bincount(np.concatenate(bill_cells)[first], minlength=7 * 24)
+        
+        return {
+            "period": {"from": from_date.isoformat(), "to": to_date.isoformat()},
+            "utc_offset_minutes": view.manifest["utc_offset_minutes"],
+            "weekdays": WEEKDAYS,
+            "hours": list(range(24)),
+            "amount": np.round(amount, 2).reshape(7, 24).tolist(),
+            "bill_count": bill_count.astype(np.int64).reshape(7, 24).tolist()
+        }
+    
+    def get_profit_loss(self, from_date: date, to_date: date) -> Dict[str, Any]:
+        """Profit and loss in the shape of the P&L report; purchases are line totals before bill discounts"""
+        view = self.load()
+        sales_amount = 0.0
+        cost_of_goods = 0.0
+        for lines in self._scan(view, from_date, to_date, SALE_CODES, ("item", "quantity", "rate")):
+            sales_amount += float(np.dot(lines["quantity"], lines["rate"]))
+            cost_of_goods += float(np.dot(lines["quantity"], view.item_costs[lines["item"]]))
+        purchases = sum(
+            float(lines["total_amount"].sum())
+            for lines in self._scan(view, from_date, to_date, PURCHASE_CODES, ("total_amount",))
+        )
+        
+        gross_profit = sales_amount - cost_of_goods
+        return {
+            "period": {"from": from_date.isoformat(), "to": to_date.isoformat()},
+            "revenue": {
+                "total_sales": sales_amount,
+                "cost_of_goods_sold": cost_of_goods,
+                "gross_profit": gross_profit,
+                "gross_profit_margin": (gross_profit / sales_amount * 100) if sales_amount > 0 else 0
+            },
+            "expenses": {
+                "purchases": purchases
+            },
+            "net_profit": gross_profit
+        }
+
+sales_snapshot = SalesSnapshot(settings.ANALYTICS_SNAPSHOT_DIR)
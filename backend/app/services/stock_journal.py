@@ -0,0 +1,153 @@
+# backend/app/services/stock_journal.py
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, func, insert, literal, select, update
+from sqlalchemy.engine import Engine
+from typing import Dict, List, Optional
+from datetime import date, datetime, time
+
+from app.models import Item, StockMovement, StockCheckpoint
+from app.services.catalog_cache import catalog_cache
+from app.services.stock_valuation_service import StockValuationService
+from app.services.low_stock_watchlist import LowStockWatchlist
+from app.services.lot_service import LotService
+
+class StockJournal:
+    """Append-only log of stock movements.
+    
+    items.current_stock is a cached balance: the latest checkpoint of an
+    item plus every movement journaled after it.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @staticmethod
+    def movement(
+        item_id: int,
+        quantity_change: float,
+        balance_after: Optional[float],
+        reason: str,
+        bill_id: Optional[int] = None,
+        created_by: Optional[int] = None,
+        created_at: Optional[datetime] = None
+    ) -> dict:
+        """Build a journal row"""
+        return {
+            "item_id": item_id,
+            "quantity_change": quantity_change,
+            "balance_after": balance_after,
+            "reason": reason,
+            "bill_id": bill_id,
+            "created_by": created_by,
+            "created_at": created_at or datetime.utcnow()
+        }
+    
+    def record(self, movements: List[dict]) -> None:
+        """Append movements with a single executemany insert"""
+        if movements:
+            self.db.execute(insert(StockMovement), movements)
+    
+    def get_history(
+        self,
+        item_id: int,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[StockMovement]:
+        """Get an item's movements, newest first"""
+        query = self.db.query(StockMovement).filter(StockMovement.item_id == item_id)
+        if from_date:
+            query = query.filter(StockMovement.created_at >= datetime.combine(from_date, time.min))
+        if to_date:
+            query = query.filter(StockMovement.created_at <= datetime.combine(to_date, time.max))
+        
+        return query.order_by(
+            StockMovement.created_at.desc(), StockMovement.id.desc()
+        ).offset(offset).limit(limit).all()
+    
+    def create_checkpoints(self, unjournaled_only: bool = False) -> int:
+        """Snapshot every item's stock against the last journaled movement.
+        
+        With unjournaled_only, only items with neither a checkpoint nor a
+        movement are snapshotted, e.g. rows inserted by scripts.
+        """
+        last_movement_id = self.db.query(func.coalesce(func.max(StockMovement.id), 0)).scalar()
+        items = select(
+            Item.id,
+            func.coalesce(Item.current_stock, 0),
+            literal(last_movement_id),
+            literal(datetime.utcnow())
+        )
+        if unjournaled_only:
+            items = items.where(
+                ~select(StockCheckpoint.id).where(StockCheckpoint.item_id == Item.id).exists(),
+                ~select(StockMovement.id).where(StockMovement.item_id == Item.id).exists()
+            )
+        result = self.db.execute(
+            insert(StockCheckpoint).from_select(["item_id", "stock", "movement_id", "created_at"], items)
+        )
+        self.db.commit()
+        return result.rowcount
+    
+    def compute_stock(self) -> Dict[int, float]:
+        """Replay the journal on top of each item's latest checkpoint"""
+        latest_ids = select(func.max(StockCheckpoint.id)).group_by(StockCheckpoint.item_id)
+        checkpoints = (
+            select(StockCheckpoint.item_id, StockCheckpoint.stock, StockCheckpoint.movement_id)
+            .where(StockCheckpoint.id.in_(latest_ids))
+            .subquery()
+        )
+        
+        stock = {
+            row.item_id: row.stock
+            for row in self.db.execute(select(checkpoints.c.item_id, checkpoints.c.stock))
+        }
+        replayed = self.db.execute(
+            select(StockMovement.item_id, func.sum(StockMovement.quantity_change))
+            .outerjoin(checkpoints, checkpoints.c.item_id == StockMovement.item_id)
+            .where(StockMovement.id > func.coalesce(checkpoints.c.movement_id, 0))
+            .group_by(StockMovement.item_id)
+        )
+        for item_id, quantity_change in replayed:
+            stock[item_id] = stock.get(item_id, 0) + quantity_change
+        return stock
+    
+    def rebuild(self) -> Dict[int, Dict[str, float]]:
+        """Reset current_stock from the journal, returning the items that drifted.
+        
+        Items with neither a checkpoint nor a movement have no journal
+        balance to compare against and are left as they are.
+        """
+        stock = self.compute_stock()
+        drifted = {}
+        for item_id, current_stock in self.db.query(Item.id, Item.current_stock):
+            if item_id not in stock:
+                continue
+            expected = round(stock[item_id], 3)
+            if round(current_stock or 0, 3) != expected:
+                drifted[item_id] = {"current_stock": current_stock, "journal_stock": expected}
+        
+        if drifted:
+            items = Item.__table__
+            self.db.execute(
+                update(items)
+                .where(items.c.id == bindparam("drifted_id"))
+                .values(current_stock=bindparam("journal_stock"), updated_at=datetime.utcnow()),
+                [
+                    {"drifted_id": item_id, "journal_stock": values["journal_stock"]}
+                    for item_id, values in drifted.items()
+                ]
+            )
+            catalog_cache.invalidate_stock_on_commit(self.db, drifted)
+            LowStockWatchlist(self.db).refresh(drifted)
+            StockValuationService(self.db).recompute()
+            LotService(self.db).trim_to_stock(drifted)
+        self.db.commit()
+        return drifted
+    
+    @staticmethod
+    def ensure_opening_balances(engine: Engine) -> None:
+        """Checkpoint the stock of items the journal has never seen, e.g. ones that predate it"""
+        with Session(engine) as db:
+            StockJournal(db).create_checkpoints(unjournaled_only=True)
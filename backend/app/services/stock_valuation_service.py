@@ -0,0 +1,171 @@
+# backend/app/services/stock_valuation_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.models import Category, Item
+from app.services.category_service import CategoryService
+
+# Running totals kept per category, and the item columns they depend on
+TOTALS = ("item_count", "stock_quantity", "purchase_value", "selling_value")
+VALUED_COLUMNS = ("category", "is_active", "current_stock", "purchase_price", "selling_price")
+
+class StockValuationService:
+    """Running stock value totals, kept on each category row.
+    
+    Every stock, price, category or activation change of an item adds its
+    change in value here in the same transaction, so reading totals never
+    scans the catalog. recompute() rebuilds the totals from items.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @staticmethod
+    def category_key(category: Optional[str]) -> str:
+        return category or ""
+    
+    @staticmethod
+    def contribution(item: Any) -> Dict[str, float]:
+        """What an item (row, entry or ORM object) adds to its category's totals"""
+        if not item.is_active:
+            return dict.fromkeys(TOTALS, 0)
+        stock = item.current_stock or 0
+        return {
+            "item_count": 1,
+            "stock_quantity": stock,
+            "purchase_value": stock * (item.purchase_price or 0),
+            "selling_value": stock * (item.selling_price or 0)
+        }
+    
+    @staticmethod
+    def snapshot(item: Item) -> SimpleNamespace:
+        """Copy the columns that value an item, before changing it"""
+        return SimpleNamespace(**{name: getattr(item, name) for name in VALUED_COLUMNS})
+    
+    def apply(self, deltas: Dict[str, Dict[str, float]]) -> None:
+        """Add per-category deltas with one upsert statement"""
+        now = datetime.utcnow()
+        rows = [
+            dict(values, name=category, created_at=now, updated_at=now)
+            for category, values in deltas.items()
+            if any(values.values())
+        ]
+        if not rows:
+            return
+        
+        stmt = sqlite_insert(Category)
+        self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[Category.name],
+                set_={
+                    **{name: getattr(Category, name) + getattr(stmt.excluded, name) for name in TOTALS},
+                    "updated_at": stmt.excluded.updated_at
+                }
+            ),
+            rows
+        )
+    
+    def stock_moved(self, rows: Iterable[Any], changes: Dict[int, float]) -> None:
+        """Account for stock deltas of updated item rows (id, category, prices, is_active)"""
+        deltas = {}
+        for row in rows:
+            if not row.is_active:
+                continue
+            quantity_change = changes[row.id]
+            totals = deltas.setdefault(self.category_key(row.category), dict.fromkeys(TOTALS, 0))
+            totals["stock_quantity"] += quantity_change
+            totals["purchase_value"] += quantity_change * (row.purchase_price or 0)
+            totals["selling_value"] += quantity_change * (row.selling_price or 0)
+        self.apply(deltas)
+    
+    def item_changed(self, before: Optional[Any], after: Optional[Any]) -> None:
+        """Move an item's contribution from its old state to its new one"""
+        self.items_changed([(before, after)])
+    
+    def items_changed(self, changes: Iterable[Tuple[Optional[Any], Optional[Any]]]) -> None:
+        """Move the contributions of many (before, after) item states in one upsert"""
+        deltas = {}
+        for before, after in changes:
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None:
+                    continue
+                totals = deltas.setdefault(self.category_key(state.category), dict.fromkeys(TOTALS, 0))
+                for name, value in self.contribution(state).items():
+                    totals[name] += sign * value
+        self.apply(deltas)
+    
+    def get_totals(self, category_id: Optional[int] = None) -> Dict[str, Any]:
+        """Read overall totals and the per-category breakdown"""
+        query = self.db.query(Category).filter(Category.item_count > 0)
+        if category_id is not None:
+            query = query.filter(Category.id == category_id)
+        rows = query.order_by(Category.name).all()
+        
+        total_purchase_value = round(sum(row.purchase_value for row in rows), 2)
+        total_selling_value = round(sum(row.selling_value for row in rows), 2)
+        return {
+            "total_items": sum(row.item_count for row in rows),
+            "total_purchase_value": total_purchase_value,
+            "total_selling_value": total_selling_value,
+            "potential_profit": round(total_selling_value - total_purchase_value, 2),
+            "categories": [
+                {
+                    "category_id": row.id,
+                    "category": row.name or None,
+                    "item_count": row.item_count,
+                    "stock_quantity": round(row.stock_quantity, 3),
+                    "purchase_value": round(row.purchase_value, 2),
+                    "selling_value": round(row.selling_value, 2)
+                }
+                for row in rows
+            ]
+        }
+    
+    def recompute(self) -> List[Dict[str, Any]]:
+        """Relink items to their categories and rebuild the totals, returning categories whose totals were off"""
+        previous = {
+            row.name: {name: getattr(row, name) for name in TOTALS}
+            for row in self.db.query(Category)
+        }
+        CategoryService(self.db).link_items()
+        
+        stock = func.coalesce(Item.current_stock, 0)
+        totals = self.db.query(
+            Item.category_id.label("id"),
+            func.count(Item.id).label("item_count"),
+            func.sum(stock).label("stock_quantity"),
+            func.sum(stock * func.coalesce(Item.purchase_price, 0)).label("purchase_value"),
+            func.sum(stock * func.coalesce(Item.selling_price, 0)).label("selling_value")
+        ).filter(Item.is_active == True).group_by(Item.category_id).all()
+        
+        now = datetime.utcnow()
+        self.db.execute(update(Category).values(**dict.fromkeys(TOTALS, 0), updated_at=now))
+        if totals:
+            self.db.execute(update(Category), [dict(row._mapping, updated_at=now) for row in totals])
+        current = {
+            row.name: {name: getattr(row, name) for name in TOTALS}
+            for row in self.db.query(Category)
+        }
+        self.db.commit()
+        
+        empty = dict.fromkeys(TOTALS, 0)
+        return [
+            {"category": key or None, "stored": previous.get(key, empty), "recomputed": current.get(key, empty)}
+            for key in sorted(set(previous) | set(current))
+            if any(
+                abs(previous.get(key, empty)[name] - current.get(key, empty)[name]) > 0.005
+                for name in TOTALS
+            )
+        ]
+    
+    @staticmethod
+    def ensure_totals(engine: Engine) -> None:
+        """Rebuild the totals when items exist that were never linked to a category"""
+        with Session(engine) as db:
+            if db.query(Item.id).filter(Item.category_id.is_(None)).first() is not None:
+                StockValuationService(db).recompute()
@@ -0,0 +1,62 @@
+# backend/tests/conftest.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_db
+from app.main import app
+from app.models import Customer, Item, Supplier, User
+from app.models.user import UserRole
+from app.services.bill_search_index import BillSearchIndex
+from app.services.catalog_cache import catalog_cache
+from app.services.item_search_index import item_search_index
+from app.services.report_cache import report_cache
+from app.utils.security import get_current_active_user
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    BillSearchIndex.ensure_schema(engine)
+    yield engine
+    # The caches outlive a test's database, whose ids the next test reuses
+    catalog_cache.clear()
+    item_search_index.clear()
+    report_cache.clear()
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def store(db):
+    """A user, a customer, a supplier and items ST01-ST03 with 100 in stock"""
+    db.add(User(username="admin", password_hash="x", role=UserRole.admin, is_active=True))
+    db.add(Customer(name="Sharma"))
+    db.add(Supplier(name="Metro"))
+    for number in range(1, 4):
+        db.add(Item(
+            item_code=f"ST{number:02d}", name=f"Item {number}", selling_price=10.0 * number,
+            mrp=12.0 * number, purchase_price=8.0 * number, gst_percentage=5, current_stock=100,
+            min_stock_alert=10, is_active=True
+        ))
+    db.commit()
+    return db
+
+@pytest.fixture
+def client(engine, store, monkeypatch):
+    def override_get_db():
+        with Session(engine) as session:
+            yield session
+    
+    # Streamed downloads open their own sessions
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    for module in ("app.services.report_service", "app.services.item_transfer_service"):
+        monkeypatch.setattr(f"{module}.SessionLocal", session_factory)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: store.query(User).first()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
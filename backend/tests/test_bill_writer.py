@@ -0,0 +1,59 @@
+# backend/tests/test_bill_writer.py
+import pytest
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app.models import Bill, Item
+from app.schemas import BillCreate
+from app.services.bill_search_index import BillSearchIndex
+from app.services.bill_writer import BillWriteQueue
+from app.services.inventory_service import InsufficientStockError
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    # The writer opens its own connection, so the store lives in a file
+    url = f"sqlite:///{tmp_path / 'writer.db'}"
+    monkeypatch.setattr("app.services.bill_writer.settings.DATABASE_URL", url)
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    BillSearchIndex.ensure_schema(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def writer():
+    # A long wait so bills submitted together land in one group
+    writer = BillWriteQueue(batch_size=10, max_wait_ms=200)
+    yield writer
+    writer.stop()
+
+def sale(item_code, quantity):
+    return BillCreate(bill_type="sale_challan", customer_id=1, items=[{"item_code": item_code, "quantity": quantity, "rate": 0}])
+
+def stock(db):
+    db.expire_all()
+    return dict(db.query(Item.item_code, Item.current_stock).order_by(Item.id).all())
+
+def test_failed_bill_does_not_sink_its_group(store, writer):
+    futures = [writer.submit(sale("ST01", 2), 1), writer.submit(sale("ST02", 500), 1), writer.submit(sale("ST03", 3), 1)]
+    
+    first = futures[0].result(timeout=5)
+    with pytest.raises(InsufficientStockError):
+        futures[1].result(timeout=5)
+    third = futures[2].result(timeout=5)
+    
+    assert [bill.id for bill in store.query(Bill).order_by(Bill.id)] == [first.id, third.id]
+    assert first.bill_number != third.bill_number
+    assert stock(store) == {"ST01": 98, "ST02": 100, "ST03": 97}
+
+def test_retry_in_the_same_group_replays(store, writer):
+    futures = [writer.submit(sale("ST01", 2), 1, "writer-1") for _ in range(2)]
+    futures.append(writer.submit(sale("ST01", 2), 1))
+    bills = [future.result(timeout=5) for future in futures]
+    
+    assert bills[0].id == bills[1].id != bills[2].id
+    assert store.query(Bill).count() == 2
+    assert stock(store)["ST01"] == 96
+    # A later retry is answered without writing again
+    assert writer.submit(sale("ST01", 2), 1, "writer-1").result(timeout=5).id == bills[0].id
+    assert store.query(Bill).count() == 2
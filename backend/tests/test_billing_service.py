@@ -0,0 +1,108 @@
+# backend/tests/test_billing_service.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import Bill, BillSeries, Item, StockMovement
+from app.schemas import BillBulkEntry, BillCreate, BillSeriesConfig
+from app.services.billing_service import BillingService
+from app.services.idempotency_cache import idempotency_cache
+
+def sale(item_code, quantity, **bill):
+    return BillBulkEntry(
+        bill_type="sale_challan", customer_id=1, items=[{"item_code": item_code, "quantity": quantity, "rate": 0}], **bill
+    )
+
+def purchase(item_code, quantity, **bill):
+    return BillBulkEntry(
+        bill_type="purchase", supplier_id=1, items=[{"item_code": item_code, "quantity": quantity, "rate": 5}], **bill
+    )
+
+def stock(db, item_code):
+    return db.query(Item.current_stock).filter(Item.item_code == item_code).scalar()
+
+def test_bulk_batch_netting_out_an_item(store):
+    results = BillingService(store).create_bills_bulk([sale("ST01", 4), purchase("ST01", 4)], user_id=1)
+    
+    assert [result.success for result in results] == [True, True]
+    assert stock(store, "ST01") == 100
+    balances = [row.balance_after for row in store.query(StockMovement).order_by(StockMovement.id)]
+    assert balances == [96, 100]
+
+def test_create_bill_replays_idempotency_key(store):
+    billing = BillingService(store)
+    bill = BillCreate(bill_type="sale_challan", customer_id=1, items=[{"item_code": "ST01", "quantity": 2, "rate": 0}])
+    
+    first = billing.create_bill(bill, user_id=1, idempotency_key="create-1")
+    cached = billing.create_bill(bill, user_id=1, idempotency_key="create-1")
+    # An evicted key is still answered from the bills table
+    idempotency_cache.discard("create-1")
+    stored = billing.create_bill(bill, user_id=1, idempotency_key="create-1")
+    
+    assert cached.id == stored.id == first.id
+    assert store.query(Bill).count() == 1
+    assert stock(store, "ST01") == 98
+
+def test_bulk_replays_idempotency_keys(store):
+    billing = BillingService(store)
+    batch = [sale("ST01", 2, idempotency_key="bulk-1"), sale("ST01", 2, idempotency_key="bulk-1")]
+    
+    first = billing.create_bills_bulk(batch, user_id=1)
+    resent = billing.create_bills_bulk(batch, user_id=1)
+    
+    assert all(result.success for result in first + resent)
+    assert {result.bill_id for result in first + resent} == {first[0].bill_id}
+    assert stock(store, "ST01") == 98
+
+def test_bulk_bill_times(store):
+    now = datetime.utcnow()
+    results = BillingService(store).create_bills_bulk([
+        sale("ST01", 1, created_at=datetime(2026, 1, 15, 10, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))),
+        sale("ST01", 1, created_at=(now + timedelta(hours=1)).replace(tzinfo=timezone.utc)),
+    ], user_id=1)
+    
+    assert results[0].success
+    assert store.get(Bill, results[0].bill_id).created_at == datetime(2026, 1, 15, 5, 0)
+    assert not results[1].success
+    assert "in the future" in results[1].error
+    assert stock(store, "ST01") == 99
+
+def test_allocate_consecutive_bill_numbers(store):
+    billing = BillingService(store)
+    year = billing.get_financial_year()[2:4]
+    
+    block = billing.allocate_bill_numbers("sale_challan", 3)
+    
+    assert block == [f"SC{year}{number:05d}" for number in (1, 2, 3)]
+    assert billing.generate_bill_number("sale_challan") == f"SC{year}00004"
+    assert billing.generate_bill_number("purchase") == f"PUR{year}00001"
+
+def test_series_update_never_reissues_numbers(store):
+    billing = BillingService(store)
+    billing.create_bill(
+        BillCreate(bill_type="sale_challan", customer_id=1, items=[{"item_code": "ST01", "quantity": 1, "rate": 0}]),
+        user_id=1
+    )
+    
+    with pytest.raises(ValueError, match="must be above 1"):
+        billing.update_bill_series(BillSeriesConfig(series={"sale_challan": {"next_number": 1}}))
+    store.rollback()
+    billing.update_bill_series(BillSeriesConfig(series={"sale_challan": {"prefix": "CS", "next_number": 1}}))
+    # Switching back to the used prefix is checked against its bills too
+    with pytest.raises(ValueError, match="must be above 1"):
+        billing.update_bill_series(BillSeriesConfig(series={"sale_challan": {"prefix": "SC"}}))
+    store.rollback()
+    
+    assert billing.get_bill_series()["sale_challan"]["prefix"] == "CS"
+
+def test_new_financial_year_keeps_prefix(store):
+    billing = BillingService(store)
+    financial_year = billing.get_financial_year()
+    start_year = int(financial_year[:4]) - 1
+    store.add(BillSeries(
+        bill_type="sale_challan", financial_year=f"{start_year}-{(start_year + 1) % 100:02d}",
+        prefix="CS", next_number=812
+    ))
+    store.commit()
+    
+    assert billing.generate_bill_number("sale_challan") == f"CS{financial_year[2:4]}00001"
@@ -0,0 +1,57 @@
+# backend/tests/test_carts.py
+from app.models import Bill, Item
+from app.schemas import CartCreate
+from app.services.cart_store import cart_store
+
+API = "/api/v1/carts"
+
+def open_cart(client, **cart):
+    cart_id = client.post(API, json=cart).json()["id"]
+    assert client.post(f"{API}/{cart_id}/lines", json={"item_code": "ST01", "quantity": 2}).status_code == 200
+    return cart_id
+
+def test_finalize_creates_bill_and_replays_it(client, db):
+    cart_id = open_cart(client, customer_id=1)
+    
+    first = client.post(f"{API}/{cart_id}/finalize", json={"payment_method": "cash"})
+    retry = client.post(f"{API}/{cart_id}/finalize", json={"payment_method": "cash"})
+    
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert db.query(Bill).count() == 1
+    assert db.query(Item.current_stock).filter(Item.item_code == "ST01").scalar() == 98
+
+def test_failed_finalize_restores_cart(client, db):
+    cart_id = open_cart(client, customer_id=1)
+    client.post(f"{API}/{cart_id}/lines", json={"item_code": "ST02", "quantity": 500})
+    
+    response = client.post(f"{API}/{cart_id}/finalize", json={})
+    
+    assert response.status_code == 400
+    assert "Insufficient stock" in response.json()["detail"]
+    assert client.get(f"{API}/{cart_id}").status_code == 200
+    assert db.query(Bill).count() == 0
+
+def test_invalid_bill_restores_cart(client):
+    # A cart opened before supplier checks existed, e.g. restored from a snapshot
+    cart = cart_store.create(CartCreate(), user_id=1)
+    cart.bill_type = "purchase"
+    client.post(f"{API}/{cart.id}/lines", json={"item_code": "ST01", "quantity": 1})
+    
+    response = client.post(f"{API}/{cart.id}/finalize", json={})
+    
+    assert response.status_code == 400
+    assert client.get(f"{API}/{cart.id}").status_code == 200
+
+def test_purchase_cart_needs_supplier(client):
+    assert client.post(API, json={"bill_type": "purchase"}).status_code == 422
+    assert client.post(API, json={"bill_type": "purchase", "supplier_id": 1}).status_code == 200
+
+def test_merged_line_takes_new_prices(client):
+    cart_id = open_cart(client)
+    
+    cart = client.post(f"{API}/{cart_id}/lines", json={"item_code": "ST01", "quantity": 1, "rate": 9, "mrp": 11}).json()
+    
+    assert [(line["quantity"], line["rate"], line["mrp"]) for line in cart["lines"]] == [(3, 9, 11)]
+    assert cart["total_amount"] == 27
@@ -0,0 +1,29 @@
+# backend/tests/test_inventory_service.py
+import pytest
+
+from app.models import Item
+from app.services.inventory_service import InsufficientStockError, InventoryService
+
+def stock(db):
+    return dict(db.query(Item.item_code, Item.current_stock).order_by(Item.id).all())
+
+def test_apply_stock_changes_returns_balances(store):
+    balances = InventoryService(store).apply_stock_changes({1: -5, 2: 3, 3: 0})
+    store.commit()
+    
+    assert balances == {1: 95, 2: 103}
+    assert stock(store) == {"ST01": 95, "ST02": 103, "ST03": 100}
+
+def test_insufficient_stock_lists_failed_items(store):
+    with pytest.raises(InsufficientStockError) as error:
+        InventoryService(store).apply_stock_changes({1: -5, 2: -150, 999: -1})
+    store.rollback()
+    
+    assert error.value.items == [{"item_id": 2, "item_code": "ST02", "available": 100, "quantity_change": -150}]
+    assert error.value.missing == [999]
+    assert "Insufficient stock for ST02. Available: 100" in str(error.value)
+    # The conditional UPDATE left ST02 alone; rolling back undoes ST01
+    assert stock(store) == {"ST01": 100, "ST02": 100, "ST03": 100}
+
+def test_stock_can_reach_zero(store):
+    assert InventoryService(store).apply_stock_changes({1: -100}) == {1: 0}
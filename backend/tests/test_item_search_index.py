@@ -0,0 +1,35 @@
+# backend/tests/test_item_search_index.py
+from app.models import Item
+from app.services.item_search_index import ItemSearchIndex
+
+def codes(db, item_ids):
+    return [db.get(Item, item_id).item_code for item_id in item_ids]
+
+def add_items(db):
+    db.add_all([
+        Item(item_code="ATT250", name="Aashirvaad Atta", barcode="8901725121013", selling_price=1, is_active=True),
+        Item(item_code="RIC10", name="Basmati Rice 25kg", selling_price=1, is_active=True),
+        Item(item_code="SOAP1", name="Dove Soap", selling_price=1, is_active=True)
+    ])
+    db.commit()
+
+def test_full_build_matches_incremental_updates(store):
+    add_items(store)
+    built = ItemSearchIndex()
+    built.search(store, "x")
+    updated = ItemSearchIndex()
+    updated.search(store, "x")
+    updated.mark_dirty(item.id for item in store.query(Item))
+    updated.search(store, "x")
+    
+    assert built._words == sorted(built._words)
+    assert built._words == updated._words
+
+def test_short_queries_match_substrings(store):
+    add_items(store)
+    index = ItemSearchIndex()
+    
+    # Word prefixes rank first, then substrings of code, name or barcode
+    assert set(codes(store, index.search(store, "25"))) == {"ATT250", "RIC10"}
+    assert codes(store, index.search(store, "25"))[0] == "RIC10"
+    assert codes(store, index.search(store, "so")) == ["SOAP1"]
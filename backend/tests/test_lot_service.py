@@ -0,0 +1,51 @@
+# backend/tests/test_lot_service.py
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import Item, ItemLot
+from app.services.inventory_service import InventoryService
+from app.services.lot_service import LotService
+
+@pytest.fixture
+def item(db):
+    item = Item(item_code="LOT01", name="Milk", selling_price=30, mrp=32, purchase_price=25, current_stock=10, is_active=True)
+    db.add(item)
+    db.flush()
+    today = date.today()
+    LotService(db).receive([
+        {"item_id": item.id, "quantity": 4, "batch_no": "B1", "expiry_date": today + timedelta(days=5)},
+        {"item_id": item.id, "quantity": 6, "batch_no": "B2", "expiry_date": today + timedelta(days=60)}
+    ])
+    db.commit()
+    return item
+
+def open_lots(db, item_id):
+    return [(lot.batch_no, lot.quantity) for lot in LotService(db).get_lots(item_id)]
+
+def test_adjustment_draws_lots_first_expiry_first(db, item):
+    assert InventoryService(db).update_stock(item.id, -5, "Damaged") == 5
+
+    assert open_lots(db, item.id) == [("B2", 5)]
+    assert LotService(db).get_expiring(days_ahead=30) == []
+
+def test_adjustment_up_leaves_lots(db, item):
+    InventoryService(db).update_stock(item.id, 3, "Found in store")
+
+    assert open_lots(db, item.id) == [("B1", 4), ("B2", 6)]
+
+def test_trim_to_stock_caps_lots(db, item):
+    db.query(Item).filter(Item.id == item.id).update({"current_stock": 2})
+
+    assert LotService(db).trim_to_stock([item.id]) == {item.id: 8}
+    assert open_lots(db, item.id) == [("B2", 2)]
+    assert db.query(ItemLot).count() == 2
+
+def test_expiry_alerts_keep_item_fields(client, db, item):
+    rows = client.get("/api/v1/inventory/expiry-alerts", params={"days_ahead": 30}).json()
+    
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row["id"], row["item_code"], row["name"], row["current_stock"]) == (item.id, "LOT01", "Milk", 10)
+    assert (row["batch_no"], row["quantity"]) == ("B1", 4)
+    assert row["expiry_date"] == str(date.today() + timedelta(days=5))
@@ -0,0 +1,34 @@
+# backend/tests/test_low_stock_watchlist.py
+from app.models import Item, LowStockEvent, LowStockItem
+from app.services.inventory_service import InventoryService
+from app.services.low_stock_watchlist import LowStockWatchlist
+
+def events(db):
+    return [(row.item_id, row.event, row.current_stock) for row in db.query(LowStockEvent).order_by(LowStockEvent.id)]
+
+def test_feed_records_only_threshold_crossings(store):
+    inventory = InventoryService(store)
+    
+    inventory.update_stock(1, -92, "Sale")
+    inventory.update_stock(1, -3, "Sale")
+    inventory.update_stock(1, 50, "Purchase")
+    
+    assert events(store) == [(1, "entered", 8), (1, "left", 55)]
+
+def test_watchlist_row_follows_stock_of_low_item(store):
+    inventory = InventoryService(store)
+    
+    inventory.update_stock(2, -95, "Sale")
+    inventory.update_stock(2, -2, "Sale")
+    
+    assert store.query(LowStockItem.current_stock).filter(LowStockItem.item_id == 2).scalar() == 3
+    assert len(events(store)) == 1
+
+def test_low_stock_alerts_report_total(client, store):
+    store.query(Item).update({"current_stock": 5})
+    LowStockWatchlist(store).rebuild()
+    
+    response = client.get("/api/v1/inventory/low-stock-alerts", params={"limit": 1})
+    
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "3"
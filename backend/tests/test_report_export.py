@@ -0,0 +1,38 @@
+# backend/tests/test_report_export.py
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+from app.models import Customer
+from app.services.billing_service import BillingService
+from app.schemas import BillCreate
+
+API = "/api/v1/reports"
+
+@pytest.fixture
+def sales(store):
+    store.add(Customer(name="Gupta"))
+    store.commit()
+    billing = BillingService(store)
+    # Item and customer totals rank in the opposite order of their ids
+    for customer_id, item_code, quantity in [(1, "ST01", 1), (2, "ST02", 2), (2, "ST03", 3)]:
+        billing.create_bill(BillCreate(
+            bill_type="sale_challan", customer_id=customer_id,
+            items=[{"item_code": item_code, "quantity": quantity, "rate": 0}]
+        ), user_id=1)
+    return store
+
+@pytest.mark.parametrize("report, key", [("item-wise", "item_code"), ("customer-wise", "customer_id")])
+def test_export_keeps_report_order(client, sales, report, key):
+    period = {"from_date": str(date.today()), "to_date": str(date.today())}
+    
+    rows = client.get(f"{API}/{report}", params=period).json()
+    ndjson = client.get(f"{API}/{report}", params={**period, "format": "ndjson"}).text
+    exported_csv = client.get(f"{API}/{report}", params={**period, "format": "csv"}).text
+    
+    assert [json.loads(line) for line in ndjson.splitlines()] == rows
+    assert [row[key] for row in csv.DictReader(io.StringIO(exported_csv))] == [str(row[key]) for row in rows]
+    assert [row["total_amount"] for row in rows] == sorted((row["total_amount"] for row in rows), reverse=True)
@@ -0,0 +1,47 @@
+# backend/tests/test_report_period.py
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.schemas import BillBulkEntry
+from app.services.billing_service import BillingService
+from app.services.report_service import ReportService
+
+DAY = date.today() - timedelta(days=3)
+
+def test_period_includes_the_whole_end_day():
+    assert ReportService.get_period(DAY, DAY + timedelta(days=1)) == (
+        datetime.combine(DAY, datetime.min.time()), datetime.combine(DAY + timedelta(days=2), datetime.min.time())
+    )
+
+def test_period_takes_datetimes_as_given():
+    start, end = datetime(2026, 1, 1, 9), datetime(2026, 1, 1, 18)
+    
+    assert ReportService.get_period(start, end) == (start, end)
+
+@pytest.fixture
+def bills(store):
+    # One unit of ST01 at each time; ST01 sells at 10 plus 5% GST
+    times = [
+        datetime.combine(DAY, datetime.min.time()) - timedelta(seconds=1),
+        datetime.combine(DAY, datetime.min.time()),
+        datetime.combine(DAY, datetime.max.time()),
+        datetime.combine(DAY + timedelta(days=1), datetime.min.time())
+    ]
+    entries = [
+        BillBulkEntry(bill_type="sale_challan", customer_id=1, created_at=f"{created_at.isoformat()}+00:00",
+                      items=[{"item_code": "ST01", "quantity": 1, "rate": 0}])
+        for created_at in times
+    ]
+    assert all(result.success for result in BillingService(store).create_bills_bulk(entries, user_id=1))
+    return store
+
+@pytest.mark.parametrize("rollups", [True, False])
+def test_report_counts_bills_of_the_end_day_only(bills, monkeypatch, rollups):
+    monkeypatch.setattr(settings, "REPORT_ROLLUPS_ENABLED", rollups)
+    
+    rows = ReportService(bills).get_item_wise_report(DAY, DAY)
+    
+    assert [(row["item_code"], row["quantity_sold"]) for row in rows] == [("ST01", 2)]
+    assert ReportService(bills).get_daily_sales_report(DAY)["summary"]["total_bills"] == 2
@@ -0,0 +1,62 @@
+# backend/tests/test_sales_snapshot.py
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.schemas import BillBulkEntry
+from app.services.billing_service import BillingService
+from app.services.report_service import ReportService
+from app.services.sales_snapshot import SalesSnapshot
+
+DAY = date.today() - timedelta(days=3)
+
+def at(day: date, hour: int, minute: int = 0) -> str:
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc).isoformat()
+
+@pytest.fixture
+def snapshot(store, tmp_path):
+    # Bills on both sides of UTC and store (IST) midnight
+    times = [at(DAY, 0, 10), at(DAY, 20), at(DAY, 22, 45), at(DAY + timedelta(days=1), 1), at(DAY - timedelta(days=1), 23)]
+    entries = [
+        BillBulkEntry(
+            bill_type="gst_invoice" if index % 2 else "sale_challan", customer_id=1, created_at=created_at,
+            items=[{"item_code": f"ST0{index % 3 + 1}", "quantity": index + 1, "rate": 0}]
+        )
+        for index, created_at in enumerate(times)
+    ]
+    entries.append(BillBulkEntry(
+        bill_type="purchase", supplier_id=1, created_at=at(DAY, 23, 30),
+        items=[{"item_code": "ST01", "quantity": 5, "rate": 7}]
+    ))
+    assert all(result.success for result in BillingService(store).create_bills_bulk(entries, user_id=1))
+    snapshot = SalesSnapshot(str(tmp_path))
+    snapshot.export(store)
+    return snapshot
+
+@pytest.mark.parametrize("from_day, to_day", [(DAY, DAY), (DAY - timedelta(days=1), DAY), (DAY, DAY + timedelta(days=1))])
+def test_snapshot_matches_sql_reports(store, snapshot, from_day, to_day):
+    reports = ReportService(store)
+    
+    sql_items = reports.get_item_wise_report(from_day, to_day)
+    snapshot_items = snapshot.get_item_wise(from_day, to_day)
+    assert {row["item_code"]: pytest.approx(row) for row in sql_items} == {row["item_code"]: row for row in snapshot_items}
+    
+    sql_pl = reports.get_profit_loss_report(from_day, to_day)
+    snapshot_pl = snapshot.get_profit_loss(from_day, to_day)
+    assert snapshot_pl["revenue"] == pytest.approx(sql_pl["revenue"])
+    assert snapshot_pl["expenses"]["purchases"] == pytest.approx(sql_pl["expenses"]["purchases"])
+    
+    categories = snapshot.get_category_wise(from_day, to_day)
+    assert sum(row["total_amount"] for row in categories) == pytest.approx(sum(row["total_amount"] for row in sql_items))
+
+def test_heatmap_uses_store_time(snapshot):
+    heatmap = snapshot.get_hourly_heatmap(DAY, DAY)
+    
+    # 20:00 and 22:45 UTC are 01:30 and 04:15 IST on the next weekday
+    next_weekday = (DAY + timedelta(days=1)).weekday()
+    cells = {
+        (weekday, hour): count
+        for weekday, hours in enumerate(heatmap["bill_count"]) for hour, count in enumerate(hours) if count
+    }
+    assert cells == {(DAY.weekday(), 5): 1, (next_weekday, 1): 1, (next_weekday, 4): 1}
+    assert heatmap["utc_offset_minutes"] == 330
@@ -0,0 +1,39 @@
+# backend/tests/test_stock_journal.py
+from app.models import Item, StockCheckpoint
+from app.services.inventory_service import InventoryService
+from app.services.stock_journal import StockJournal
+
+def stock(db, item_id):
+    return db.query(Item.current_stock).filter(Item.id == item_id).scalar()
+
+def test_rebuild_replays_movements_over_checkpoint(store):
+    journal = StockJournal(store)
+    journal.create_checkpoints()
+    InventoryService(store).update_stock(1, -30, "Sale")
+    store.query(Item).filter(Item.id == 1).update({"current_stock": 5})
+    store.commit()
+    
+    drifted = journal.rebuild()
+    
+    assert drifted == {1: {"current_stock": 5, "journal_stock": 70}}
+    assert stock(store, 1) == 70
+
+def test_rebuild_leaves_items_without_journal_basis(store):
+    # The store's items were inserted directly, with no opening movement or checkpoint
+    InventoryService(store).update_stock(2, -10, "Sale")
+    
+    drifted = StockJournal(store).rebuild()
+    
+    assert 1 not in drifted and 3 not in drifted
+    assert stock(store, 1) == 100
+
+def test_opening_balances_checkpoint_unjournaled_items(store, engine):
+    # Items loaded by a script before startup
+    StockJournal.ensure_opening_balances(engine)
+    StockJournal.ensure_opening_balances(engine)
+    InventoryService(store).update_stock(2, -10, "Sale")
+    
+    checkpoints = store.query(StockCheckpoint.item_id, StockCheckpoint.stock).order_by(StockCheckpoint.item_id).all()
+    assert checkpoints == [(1, 100), (2, 100), (3, 100)]
+    assert StockJournal(store).rebuild() == {}
+    assert stock(store, 2) == 90
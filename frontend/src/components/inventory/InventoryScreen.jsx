@@ -18,7 +18,7 @@ const InventoryScreen = () => {
       setLoading(true);
       const params = {
         limit: 100,
-        category: selectedCategory || undefined
+        category_id: selectedCategory || undefined
       };
       const data = await inventoryService.getItems(params);
       setItems(data);
@@ -73,7 +73,7 @@ const InventoryScreen = () => {
         >
           <option value="">All Categories</option>
           {categories.map(cat => (
-            <option key={cat} value={cat}>{cat}</option>
+            <option key={cat.id} value={cat.id}>{cat.name}</option>
           ))}
         </select>
       </div>
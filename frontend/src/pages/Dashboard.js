@@ -23,14 +23,15 @@ const fetchDashboardData = async () => {
     // Fetch today's sales report
     const [salesResponse, lowStockResponse] = await Promise.all([
       api.get('/reports/daily-sales').catch(() => ({ data: { summary: {} } })),
-      api.get('/inventory/low-stock-alerts').catch(() => ({ data: [] }))
+      // Only the count is shown; the endpoint pages items and reports the total in X-Total-Count
+      api.get('/inventory/low-stock-alerts', { params: { limit: 1 } }).catch(() => ({ data: [], headers: {} }))
     ]);
     
     setTodaysSummary(salesResponse.data);
     setStats({
       todaySales: salesResponse.data.summary?.net_amount || 0,
       totalBills: salesResponse.data.summary?.total_bills || 0,
-      lowStockItems: lowStockResponse.data?.length || 0,
+      lowStockItems: Number(lowStockResponse.headers?.['x-total-count']) || 0,
       pendingPayments: 0
     });
   } catch (error) {
@@ -22,11 +22,30 @@ export const inventoryService = {
     return response.data;
   },
 
+  importItems: async (file) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await api.post('/inventory/items/import', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' }
+    });
+    return response.data;
+  },
+
+  exportItems: async (params) => {
+    const response = await api.get('/inventory/items/export', { params, responseType: 'blob' });
+    return response.data;
+  },
+
   searchItems: async (searchData) => {
     const response = await api.post('/inventory/items/search', searchData);
     return response.data;
   },
 
+  scanBarcode: async (barcode) => {
+    const response = await api.get(`/inventory/barcode/${encodeURIComponent(barcode)}`);
+    return response.data;
+  },
+
   updateStock: async (itemId, quantityChange, reason) => {
     const response = await api.put('/inventory/stock/update', {
       item_id: itemId,
@@ -0,0 +1,33 @@
+# scripts/rebuild_sales_rollups.py
+"""
+Script to rebuild the daily sales rollups from bills
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.database import SessionLocal
+from app.services.sales_rollup_service import SalesRollupService
+
+def rebuild_sales_rollups(from_day=None):
+    db = SessionLocal()
+    try:
+        counts = SalesRollupService(db).rebuild(from_day)
+    finally:
+        db.close()
+
+    scope = f"from {from_day}" if from_day else "for all days"
+    print(f"Sales rollups rebuilt {scope}:")
+    for table, rows in counts.items():
+        print(f"  {table}: {rows} rows")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily sales rollups from bills")
+    parser.add_argument("--from", dest="from_day", type=date.fromisoformat, help="first day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+    rebuild_sales_rollups(args.from_day)